@@ -15,7 +15,15 @@ from fastapi.staticfiles import StaticFiles
 
 from src.config.logging_config import get_logger, log_request, log_shutdown, log_startup
 from src.config.settings import settings
+from src.core.llm_clients import get_async_llm_clients
+from src.core.llm_health import get_llm_health_monitor
+from src.core.warmup import QueryLog, get_cache_warmer, load_cache_snapshot, save_cache_snapshot
 from src.models.schemas import ErrorResponse
+from src.services.chatbot_service import (
+    close_chatbot_service,
+    get_chatbot_service,
+    get_response_cache,
+)
 
 
 logger = get_logger(__name__)
@@ -32,8 +40,20 @@ async def lifespan(app: FastAPI):
     log_startup()
     logger.info("Initializing services...")
 
-    # Initialize services here if needed
-    # await initialize_services()
+    # Restore the response cache from the last shutdown
+    if settings.CACHE_SNAPSHOT_FILE:
+        load_cache_snapshot(get_response_cache(), settings.CACHE_SNAPSHOT_FILE)
+
+    # Replay frequent queries; readiness reports not ready until done
+    if settings.QUERY_LOG_ENABLED and settings.CACHE_WARMUP_TOP_N > 0:
+        get_cache_warmer().start(
+            lambda query: get_chatbot_service().replay_query(query),
+            QueryLog(settings.QUERY_LOG_FILE, settings.QUERY_LOG_MAX_ENTRIES),
+            settings.CACHE_WARMUP_TOP_N,
+        )
+
+    # Re-probe LLM providers in the background (no-op if a service already started it)
+    get_llm_health_monitor().start()
 
     logger.info("Application ready")
 
@@ -43,8 +63,15 @@ async def lifespan(app: FastAPI):
     log_shutdown()
     logger.info("Cleaning up resources...")
 
-    # Cleanup here if needed
-    # await cleanup_services()
+    # Persist the response cache for the next startup
+    if settings.CACHE_SNAPSHOT_FILE:
+        save_cache_snapshot(get_response_cache(), settings.CACHE_SNAPSHOT_FILE)
+
+    get_llm_health_monitor().stop()
+    close_chatbot_service()
+
+    # Close pooled LLM connections
+    await get_async_llm_clients().aclose()
 
     logger.info("Cleanup complete")
 
@@ -115,7 +142,7 @@ async def error_handler(request: Request, call_next):
             content=ErrorResponse(
                 error="Internal Server Error",
                 detail=str(e) if settings.DEBUG else "An unexpected error occurred",
-            ).dict(),
+            ).model_dump(mode="json"),
         )
 
 
@@ -130,7 +157,8 @@ async def http_exception_handler(request: Request, exc: HTTPException):
         content=ErrorResponse(
             error=exc.detail,
             code=f"HTTP_{exc.status_code}",
-        ).dict(),
+        ).model_dump(mode="json"),
+        headers=exc.headers,
     )
 
 
@@ -143,7 +171,7 @@ async def value_error_handler(request: Request, exc: ValueError):
             error="Validation Error",
             detail=str(exc),
             code="VALIDATION_ERROR",
-        ).dict(),
+        ).model_dump(mode="json"),
     )
 
 
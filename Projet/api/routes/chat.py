@@ -3,9 +3,17 @@ Chat API Routes - Professional Reddit RAG Chatbot
 REST endpoints for chat functionality
 """
 
+import json
+from collections.abc import Iterator
+
+import anyio
 from fastapi import APIRouter, HTTPException, status
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.types import Receive, Scope, Send
 
 from src.config.logging_config import get_logger
+from src.core.llm_dispatcher import LLMOverloaded
 from src.models.schemas import ChatRequest, ChatResponse, ErrorResponse
 from src.services.chatbot_service import get_chatbot_service
 
@@ -34,6 +42,7 @@ router = APIRouter()
         200: {"description": "Successful response"},
         400: {"model": ErrorResponse, "description": "Invalid request"},
         500: {"model": ErrorResponse, "description": "Server error"},
+        503: {"model": ErrorResponse, "description": "LLM overloaded (LLM_OVERLOAD_FALLBACK off)"},
     },
 )
 async def chat(request: ChatRequest) -> ChatResponse:
@@ -55,8 +64,10 @@ async def chat(request: ChatRequest) -> ChatResponse:
         # Get chatbot service
         chatbot = get_chatbot_service()
 
-        # Process request with session_id for conversation continuity
-        response = chatbot.chat(request, session_id=request.session_id)
+        # Process request with session_id for conversation continuity. The
+        # pipeline is blocking: run it in the threadpool so concurrent requests
+        # overlap (and can share reranker batches) instead of queuing on the loop
+        response = await run_in_threadpool(chatbot.chat, request, session_id=request.session_id)
 
         logger.info(f"Chat response generated ({len(response.message)} chars)")
         return response
@@ -64,6 +75,13 @@ async def chat(request: ChatRequest) -> ChatResponse:
     except ValueError as e:
         logger.warning(f"Invalid request: {e!s}")
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except LLMOverloaded as e:
+        logger.warning(f"LLM overloaded: {e!s}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="The LLM is busy, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
     except Exception as e:
         logger.error(f"Chat failed: {e!s}")
         raise HTTPException(
@@ -72,6 +90,111 @@ async def chat(request: ChatRequest) -> ChatResponse:
         )
 
 
+@router.post(
+    "/stream",
+    summary="Send a chat message (streamed)",
+    description="""
+    Same as `POST /chat/`, but the response is streamed as Server-Sent Events.
+
+    **Events:**
+    - `sources`: retrieved sources, sent before generation starts
+    - `preview`: in LLM mode, the best retrieved answer, shown until the first token replaces it
+    - `token`: a chunk of the response text
+    - `done`: full message and metadata
+    - `error`: generation failed after the stream started
+    """,
+    responses={
+        200: {"content": {"text/event-stream": {}}, "description": "Event stream"},
+        400: {"model": ErrorResponse, "description": "Invalid request"},
+        500: {"model": ErrorResponse, "description": "Server error"},
+    },
+)
+async def chat_stream(request: ChatRequest) -> StreamingResponse:
+    """
+    Streaming chat endpoint
+
+    Args:
+        request: Chat request with message and parameters
+
+    Returns:
+        StreamingResponse of Server-Sent Events
+
+    Raises:
+        HTTPException: If the request is invalid or the session cannot be set up
+    """
+    try:
+        logger.info(f"Streaming chat request received: {request.message[:50]}...")
+
+        chatbot = get_chatbot_service()
+        events = await run_in_threadpool(
+            chatbot.chat_stream, request, session_id=request.session_id
+        )
+
+    except ValueError as e:
+        logger.warning(f"Invalid request: {e!s}")
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        logger.error(f"Chat stream failed: {e!s}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to process chat request",
+        )
+
+    # A sync iterator: Starlette pulls it from the threadpool, so blocking
+    # retrieval and LLM calls stay off the event loop
+    return ClosingStreamingResponse(
+        _sse_stream(events),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+class ClosingStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that closes its generator when the response ends.
+
+    Starlette stops iterating when the client disconnects but leaves the
+    generator suspended until it is garbage-collected; closing it runs its
+    cleanup at once, e.g. releasing the LLM concurrency slot of the stream.
+    """
+
+    def __init__(self, content: Iterator[str], **kwargs):
+        super().__init__(content, **kwargs)
+        self._content = content
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            # Cancelled on disconnect: shield the cleanup. The threadpool
+            # waits for a running next(), so the generator is suspended here.
+            with anyio.CancelScope(shield=True):
+                await run_in_threadpool(self._content.close)
+
+
+def _sse_stream(events: Iterator[dict]) -> Iterator[str]:
+    """Encode chatbot events as SSE, ending with an error event if generation fails."""
+    try:
+        for event in events:
+            yield format_sse(event["event"], event["data"])
+    except LLMOverloaded as e:
+        logger.warning(f"LLM overloaded: {e!s}")
+        yield format_sse("error", {"detail": "The LLM is busy, please retry shortly"})
+    except Exception as e:
+        logger.error(f"Chat stream failed: {e!s}")
+        yield format_sse("error", {"detail": "Failed to process chat request"})
+    finally:
+        # Closing this generator does not close the one it iterates
+        close = getattr(events, "close", None)
+        if close is not None:
+            close()
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
 @router.get(
     "/stats",
     summary="Get chatbot statistics",
@@ -9,6 +9,8 @@ from fastapi import APIRouter, status
 
 from src.config.logging_config import get_logger
 from src.config.settings import settings
+from src.core.llm_health import get_llm_health_monitor
+from src.core.warmup import get_cache_warmer
 from src.models.schemas import HealthCheck, HealthStatus
 from src.services.chatbot_service import get_chatbot_service
 
@@ -55,6 +57,10 @@ async def health_check() -> HealthCheck:
             name: {"status": status_str, "message": _get_component_message(name, status_str)}
             for name, status_str in component_health.items()
         }
+        if "llm_service" in components:
+            # Cached by the health monitor: no provider is called here
+            llm_health = get_llm_health_monitor().get_stats()
+            components["llm_service"]["providers"] = llm_health["providers"]
 
         return HealthCheck(
             status=overall_status,
@@ -87,6 +93,9 @@ async def readiness_check():
         Simple ready/not ready status
     """
     try:
+        if not get_cache_warmer().is_ready():
+            return {"ready": False, "reason": "Cache warm-up in progress"}
+
         chatbot = get_chatbot_service()
         health = chatbot.health_check()
 
@@ -100,28 +100,14 @@ async function sendMessage() {
             requestBody.session_id = sessionId;
         }
 
-        const response = await fetch(`${API_BASE_URL}/chat/`, {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/json',
-            },
-            body: JSON.stringify(requestBody)
-        });
-
-        if (!response.ok) {
-            throw new Error(`HTTP error! status: ${response.status}`);
-        }
-
-        const data = await response.json();
+        // Stream the answer: sources arrive first, then response tokens
+        const data = await streamChat(requestBody);
 
         // Persist session_id from the response for future messages
         if (data.metadata && data.metadata.session_id) {
             sessionId = data.metadata.session_id;
         }
 
-        // Add bot response with sources and metadata
-        addMessageToUI('assistant', data.message, data.sources, data.metadata);
-
         conversationHistory.push(
             { role: 'user', content: message },
             { role: 'assistant', content: data.message }
@@ -137,7 +123,100 @@ async function sendMessage() {
     }
 }
 
+async function streamChat(requestBody) {
+    const response = await fetch(`${API_BASE_URL}/chat/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            'Accept': 'text/event-stream',
+        },
+        body: JSON.stringify(requestBody)
+    });
+
+    if (!response.ok) {
+        throw new Error(`HTTP error! status: ${response.status}`);
+    }
+
+    // The bubble is filled as tokens arrive, then re-rendered with metadata
+    let messageDiv = null;
+    let sources = [];
+    let text = '';
+    let result = null;
+
+    await readEventStream(response, (event, data) => {
+        if (event === 'sources') {
+            sources = data.sources;
+            // Hide the overlay but keep input locked until the stream ends
+            loadingOverlay.classList.add('hidden');
+            setStatus('Generating...');
+            messageDiv = addMessageToUI('assistant', '', sources);
+        } else if (event === 'preview') {
+            // Best retrieved answer, replaced by the LLM answer as it arrives
+            const content = messageDiv.querySelector('.message-content');
+            content.classList.add('preview');
+            content.innerHTML = formatMessage(data.text);
+            messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        } else if (event === 'token') {
+            text += data.text;
+            const content = messageDiv.querySelector('.message-content');
+            content.classList.remove('preview');
+            content.innerHTML = formatMessage(text);
+            messagesContainer.scrollTop = messagesContainer.scrollHeight;
+        } else if (event === 'done') {
+            result = data;
+            messageDiv.replaceWith(buildMessageElement('assistant', data.message, sources, data.metadata));
+        } else if (event === 'error') {
+            throw new Error(data.detail);
+        }
+    });
+
+    if (!result) {
+        throw new Error('Stream ended before the response was complete');
+    }
+    return result;
+}
+
+async function readEventStream(response, onEvent) {
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+        const { done, value } = await reader.read();
+        if (done) break;
+
+        buffer += decoder.decode(value, { stream: true });
+
+        // Events are separated by a blank line
+        let boundary;
+        while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+            const raw = buffer.slice(0, boundary);
+            buffer = buffer.slice(boundary + 2);
+
+            let event = 'message';
+            const dataLines = [];
+            for (const line of raw.split('\n')) {
+                if (line.startsWith('event:')) {
+                    event = line.slice(6).trim();
+                } else if (line.startsWith('data:')) {
+                    dataLines.push(line.slice(5).trim());
+                }
+            }
+            if (dataLines.length > 0) {
+                onEvent(event, JSON.parse(dataLines.join('\n')));
+            }
+        }
+    }
+}
+
 function addMessageToUI(role, content, sources, metadata) {
+    const messageDiv = buildMessageElement(role, content, sources, metadata);
+    messagesContainer.appendChild(messageDiv);
+    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+    return messageDiv;
+}
+
+function buildMessageElement(role, content, sources, metadata) {
     const messageDiv = document.createElement('div');
     messageDiv.className = `message ${role}`;
 
@@ -194,8 +273,7 @@ function addMessageToUI(role, content, sources, metadata) {
         </div>
     `;
 
-    messagesContainer.appendChild(messageDiv);
-    messagesContainer.scrollTop = messagesContainer.scrollHeight;
+    return messageDiv;
 }
 
 function formatMessage(content) {
@@ -3,9 +3,11 @@ Benchmark Script - Reddit RAG Chatbot
 Performance testing and benchmarking
 """
 
+import argparse
 import statistics
 import sys
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 
@@ -13,6 +15,7 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config.logging_config import get_logger, log_startup
+from src.config.settings import settings
 from src.models.schemas import ChatRequest
 from src.services.chatbot_service import get_chatbot_service
 
@@ -95,6 +98,39 @@ class Benchmark:
 
         return all_durations
 
+    def run_concurrent(
+        self, queries: list[str], use_llm: bool = False, concurrency: int = 8, total: int = 100
+    ) -> list[float]:
+        """
+        Run queries from concurrent clients and report throughput
+
+        Args:
+            queries: List of queries (cycled)
+            use_llm: Whether to use LLM
+            concurrency: Number of concurrent clients
+            total: Total number of requests
+
+        Returns:
+            Per-request durations in ms
+        """
+        logger.info(f"\n{'=' * 60}")
+        logger.info(f"Concurrent benchmark: {'LLM Mode' if use_llm else 'Simple Mode'}")
+        logger.info(f"Clients: {concurrency}, Requests: {total}")
+        logger.info(f"{'=' * 60}\n")
+
+        start_time = time.time()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(
+                pool.map(
+                    lambda i: self.run_single_query(queries[i % len(queries)], use_llm),
+                    range(total),
+                )
+            )
+        elapsed = time.time() - start_time
+
+        logger.info(f"Throughput: {total / elapsed:.2f} req/s ({elapsed:.2f}s total)")
+        return [result["duration_ms"] for result in results]
+
     def print_summary(self, durations: list[float], mode: str):
         """Print benchmark summary"""
         logger.info(f"\n{'=' * 60}")
@@ -121,6 +157,22 @@ class Benchmark:
 
 def main():
     """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark the chatbot pipeline")
+    parser.add_argument("--llm", action="store_true", help="Also benchmark LLM mode")
+    parser.add_argument(
+        "--provider",
+        help="LLM provider override (e.g. mock, to benchmark LLM mode offline)",
+    )
+    parser.add_argument("--iterations", type=int, default=3, help="Iterations per query")
+    parser.add_argument(
+        "--concurrency", type=int, default=0, help="Also run N concurrent clients (0 = skip)"
+    )
+    parser.add_argument("--requests", type=int, default=100, help="Requests of the concurrent run")
+    args = parser.parse_args()
+
+    if args.provider:
+        settings.LLM_PROVIDER = args.provider
+
     log_startup()
 
     logger.info("Starting Performance Benchmark")
@@ -138,18 +190,31 @@ def main():
 
     # Benchmark simple mode
     logger.info("\nBenchmarking SIMPLE mode...")
-    simple_durations = benchmark.run_batch(test_queries, use_llm=False, iterations=3)
+    simple_durations = benchmark.run_batch(test_queries, use_llm=False, iterations=args.iterations)
     benchmark.print_summary(simple_durations, "Simple Mode")
 
-    # Benchmark LLM mode (if available)
-    if benchmark.chatbot.llm_service.is_available():
-        logger.info("\nBenchmarking LLM mode...")
-        response = input("This will be slower. Continue? (yes/no): ")
-        if response.lower() == "yes":
-            llm_durations = benchmark.run_batch(test_queries, use_llm=True, iterations=2)
+    modes = [False]
+
+    # Benchmark LLM mode (if requested and available)
+    if args.llm:
+        if benchmark.chatbot.llm_service.is_available():
+            logger.info(f"\nBenchmarking LLM mode ({settings.LLM_PROVIDER})...")
+            llm_durations = benchmark.run_batch(
+                test_queries, use_llm=True, iterations=args.iterations
+            )
             benchmark.print_summary(llm_durations, "LLM Mode")
-    else:
-        logger.warning("LLM not available, skipping LLM benchmark")
+            modes.append(True)
+        else:
+            logger.warning("LLM not available, skipping LLM benchmark")
+
+    if args.concurrency > 0:
+        for use_llm in modes:
+            durations = benchmark.run_concurrent(
+                test_queries, use_llm=use_llm, concurrency=args.concurrency, total=args.requests
+            )
+            benchmark.print_summary(
+                durations, f"{'LLM' if use_llm else 'Simple'} Mode, {args.concurrency} clients"
+            )
 
     logger.info("\nBenchmark complete!")
 
@@ -0,0 +1,105 @@
+"""
+Cache Backend Benchmark - Reddit RAG Chatbot
+Compare read/write latency of the memory, SQLite and Redis cache backends
+"""
+
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config.logging_config import get_logger
+from src.config.settings import settings
+from src.core.cache import CacheBackend, InMemoryCache, RedisCache, SQLiteCache
+
+
+logger = get_logger(__name__)
+
+
+def sample_response(i: int) -> dict:
+    """Payload shaped like a cached ChatResponse."""
+    return {
+        "message": f"Cached answer number {i}. " * 8,
+        "sources": [
+            {
+                "conversation": {
+                    "id": i * 10 + j,
+                    "context": "What phone should I buy? " * 4,
+                    "response": "I recommend a Pixel, the camera is great. " * 4,
+                },
+                "score": 0.9 - j * 0.1,
+                "rank": j + 1,
+            }
+            for j in range(3)
+        ],
+        "metadata": {"method": "simple", "n_sources": 3, "reranked": True},
+    }
+
+
+def time_ops(fn, keys: list[str]) -> list[float]:
+    """Run fn on every key and return per-call latencies in microseconds."""
+    durations = []
+    for key in keys:
+        start = time.perf_counter()
+        fn(key)
+        durations.append((time.perf_counter() - start) * 1e6)
+    return durations
+
+
+def summarize(name: str, op: str, durations: list[float]) -> None:
+    """Log latency percentiles for one backend operation."""
+    ordered = sorted(durations)
+    p50 = ordered[len(ordered) // 2]
+    p99 = ordered[int(len(ordered) * 0.99)]
+    logger.info(
+        f"{name:<8} {op:<5} mean={statistics.mean(durations):8.1f}us "
+        f"p50={p50:8.1f}us p99={p99:8.1f}us"
+    )
+
+
+def bench_backend(name: str, backend: CacheBackend, n: int) -> None:
+    """Benchmark set, hit and miss latencies for a backend."""
+    keys = [f"bench:{i}" for i in range(n)]
+    payloads = {key: sample_response(i) for i, key in enumerate(keys)}
+
+    backend.clear()
+    summarize(name, "set", time_ops(lambda k: backend.set(k, payloads[k], 600), keys))
+    summarize(name, "get", time_ops(backend.get, keys))
+    summarize(name, "miss", time_ops(lambda k: backend.get(f"{k}:missing"), keys))
+    backend.clear()
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark cache backends")
+    parser.add_argument("-n", type=int, default=2000, help="Operations per benchmark")
+    parser.add_argument("--redis-url", default=settings.REDIS_URL)
+    args = parser.parse_args()
+
+    logger.info(f"Cache backend benchmark ({args.n} ops each)")
+
+    bench_backend("memory", InMemoryCache(max_size=args.n * 2), args.n)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sqlite_cache = SQLiteCache(path=Path(tmp_dir) / "cache.sqlite3", max_size=args.n * 2)
+        bench_backend("sqlite", sqlite_cache, args.n)
+
+    redis_cache = RedisCache(url=args.redis_url, prefix="rag:bench:")
+    if redis_cache.is_connected():
+        bench_backend("redis", redis_cache, args.n)
+    else:
+        logger.warning(f"Redis not reachable at {args.redis_url}, skipping")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("\n\nBenchmark interrupted")
+        sys.exit(1)
@@ -0,0 +1,238 @@
+"""
+Prompt Prefix Cache Benchmark - Reddit RAG Chatbot
+Measure LLM prefill latency of multi-turn sessions with and without prompt
+prefix reuse, against a local stand-in Ollama server (or a real one)
+"""
+
+import argparse
+import json
+import random
+import re
+import statistics
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from ollama import Client
+
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config.logging_config import get_logger
+from src.config.settings import settings
+from src.core.llm_handler import LLMService
+from src.models.schemas import ChatMessage
+
+
+logger = get_logger(__name__)
+
+SAMPLES_PATH = Path(__file__).parent.parent / "tests" / "fixtures" / "sample_conversations.json"
+
+_DURATION_RE = re.compile(r"^(-?\d+(?:\.\d+)?)([smh]?)$")
+_DURATION_UNITS = {"": 1, "s": 1, "m": 60, "h": 3600}
+
+
+def parse_keep_alive(value) -> float:
+    """Ollama keep_alive ("30m", "10s", 0, -1) in seconds (negative = forever)."""
+    if value is None:
+        return 300.0
+    if isinstance(value, int | float):
+        return float(value)
+    match = _DURATION_RE.match(str(value).strip())
+    if not match:
+        return 300.0
+    return float(match.group(1)) * _DURATION_UNITS[match.group(2)]
+
+
+class StandInOllama(ThreadingHTTPServer):
+    """
+    Local stand-in for Ollama's /api/chat with a single KV-cache slot.
+
+    Prefill time is proportional to the prompt tokens after the longest
+    prefix shared with the previous request. Like Ollama, the cache is lost
+    when the model unloads (keep_alive expired) or num_ctx changes.
+    """
+
+    def __init__(self, prefill_us_per_token: float = 200.0, load_ms: float = 500.0):
+        super().__init__(("127.0.0.1", 0), _StandInHandler)
+        self.prefill_us_per_token = prefill_us_per_token
+        self.load_ms = load_ms
+        self.lock = threading.Lock()
+        self.cached_tokens: list[str] = []
+        self.num_ctx: int | None = None
+        self.expires_at = 0.0
+
+    @property
+    def url(self) -> str:
+        """Base URL of the server."""
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def chat(self, body: dict) -> dict:
+        """Simulate one non-streaming chat request."""
+        start = time.perf_counter()
+        tokens = "".join(f"<{m['role']}>{m['content']}" for m in body["messages"]).split()
+        num_ctx = (body.get("options") or {}).get("num_ctx")
+
+        # One slot: requests are processed one at a time, like a single Ollama runner
+        with self.lock:
+            now = time.monotonic()
+            load_start = time.perf_counter()
+            if num_ctx != self.num_ctx or (self.expires_at >= 0 and now > self.expires_at):
+                time.sleep(self.load_ms / 1000)
+                self.cached_tokens, self.num_ctx = [], num_ctx
+            load_duration = time.perf_counter() - load_start
+
+            reused = 0
+            for cached, token in zip(self.cached_tokens, tokens, strict=False):
+                if cached != token:
+                    break
+                reused += 1
+
+            prefill_start = time.perf_counter()
+            time.sleep((len(tokens) - reused) * self.prefill_us_per_token / 1e6)
+            prefill_duration = time.perf_counter() - prefill_start
+
+            keep_alive = parse_keep_alive(body.get("keep_alive"))
+            self.cached_tokens = tokens
+            self.expires_at = -1.0 if keep_alive < 0 else time.monotonic() + keep_alive
+
+        return {
+            "model": body.get("model", ""),
+            "created_at": "1970-01-01T00:00:00Z",
+            "message": {"role": "assistant", "content": "Sure, here is what people said."},
+            "done": True,
+            "done_reason": "stop",
+            "total_duration": int((time.perf_counter() - start) * 1e9),
+            "load_duration": int(load_duration * 1e9),
+            "prompt_eval_count": len(tokens) - reused,
+            "prompt_eval_duration": int(prefill_duration * 1e9),
+            "eval_count": 1,
+            "eval_duration": 0,
+        }
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """HTTP handler of the stand-in server."""
+
+    server: StandInOllama
+
+    def do_POST(self):
+        if self.path != "/api/chat":
+            self.send_error(404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        payload = json.dumps(self.server.chat(body)).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_context(samples: list[dict], rng: random.Random) -> str:
+    """Retrieved-examples context shaped like ChatbotService's."""
+    return "\n\n".join(
+        f"Example {i} (relevance: {rng.randint(60, 95)}%):\nQ: {conv['context']}\nA: {conv['response']}"
+        for i, conv in enumerate(rng.sample(samples, 3), 1)
+    )
+
+
+def run_sessions(
+    client, service: LLMService, *, sessions: int, turns: int, reuse: bool, seed: int = 42
+) -> tuple[list[float], list[float]]:
+    """Run multi-turn sessions; return prefill and request latencies in ms."""
+    rng = random.Random(seed)
+    samples = json.loads(SAMPLES_PATH.read_text(encoding="utf-8"))
+    prefill_ms, request_ms = [], []
+
+    for _ in range(sessions):
+        history: list[ChatMessage] = []
+        for _ in range(turns):
+            query = rng.choice(samples)["context"]
+            request = service._ollama_request(query, make_context(samples, rng), history, 0.7, 1)
+            if not reuse:
+                # A per-request marker at the very start leaves no prefix to reuse
+                system = request["messages"][0]
+                system["content"] = f"[{uuid.uuid4().hex}] {system['content']}"
+
+            start = time.perf_counter()
+            response = client.chat(**request)
+            request_ms.append((time.perf_counter() - start) * 1000)
+            prefill_ms.append((response.prompt_eval_duration or 0) / 1e6)
+
+            history += [
+                ChatMessage(role="user", content=query),
+                ChatMessage(role="assistant", content=response.message.content),
+            ]
+
+    return prefill_ms, request_ms
+
+
+def summarize(name: str, prefill_ms: list[float], request_ms: list[float]) -> None:
+    """Log prefill and request latency percentiles."""
+    ordered = sorted(prefill_ms)
+    logger.info(
+        f"{name:<9} prefill mean={statistics.mean(prefill_ms):7.1f}ms "
+        f"p50={ordered[len(ordered) // 2]:7.1f}ms "
+        f"p95={ordered[int(len(ordered) * 0.95)]:7.1f}ms | "
+        f"request mean={statistics.mean(request_ms):7.1f}ms"
+    )
+
+
+def main():
+    """Main benchmark function"""
+    parser = argparse.ArgumentParser(description="Benchmark prompt prefix reuse")
+    parser.add_argument("--host", help="Ollama URL (default: start a local stand-in server)")
+    parser.add_argument("--model", default=settings.LLM_MODEL)
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--turns", type=int, default=6, help="Requests per session")
+    parser.add_argument("--prefill-us", type=float, default=200.0, help="Stand-in cost per token")
+    parser.add_argument("--load-ms", type=float, default=500.0, help="Stand-in model load time")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    server = None
+    host = args.host
+    if host is None:
+        server = StandInOllama(prefill_us_per_token=args.prefill_us, load_ms=args.load_ms)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        host = server.url
+        logger.info(f"Stand-in Ollama server at {host}")
+
+    service = LLMService(provider="ollama", model=args.model)
+    client = Client(host=host)
+    logger.info(
+        f"Prefix cache benchmark: {args.sessions} sessions x {args.turns} turns, "
+        f"keep_alive={settings.OLLAMA_KEEP_ALIVE}, num_ctx={settings.OLLAMA_NUM_CTX}"
+    )
+
+    try:
+        # Warm-up request, so neither run pays the model load
+        run_sessions(client, service, sessions=1, turns=1, reuse=True)
+
+        runs = {"sessions": args.sessions, "turns": args.turns, "seed": args.seed}
+        no_reuse = run_sessions(client, service, reuse=False, **runs)
+        reuse = run_sessions(client, service, reuse=True, **runs)
+    finally:
+        if server is not None:
+            server.shutdown()
+
+    summarize("no reuse", *no_reuse)
+    summarize("reuse", *reuse)
+    speedup = statistics.mean(no_reuse[0]) / max(statistics.mean(reuse[0]), 1e-6)
+    logger.info(f"Prefill speedup with a stable prefix: {speedup:.2f}x")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("\n\nBenchmark interrupted")
+        sys.exit(1)
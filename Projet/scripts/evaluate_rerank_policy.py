@@ -0,0 +1,116 @@
+"""
+Rerank Policy Evaluation - Reddit RAG Chatbot
+Compare adaptive reranking with always reranking: NDCG@k and cross-encoder work saved
+"""
+
+import argparse
+import random
+import statistics
+import sys
+from collections import Counter
+from pathlib import Path
+
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config.logging_config import get_logger, log_startup
+from src.config.settings import settings
+from src.core.embeddings import get_embedding_service
+from src.core.reranker import RerankPolicy, get_reranker
+from src.core.vector_store import get_vector_store_service
+from src.utils.data_loader import load_conversations
+from src.utils.ranking_metrics import ndcg_at_k
+
+
+logger = get_logger(__name__)
+
+
+def main():
+    """Main evaluation function"""
+    parser = argparse.ArgumentParser(description="Evaluate the adaptive rerank policy")
+    parser.add_argument("--queries", type=int, default=200, help="Sampled queries")
+    parser.add_argument("--candidates", type=int, default=15, help="Dense candidates per query")
+    parser.add_argument("-k", type=int, default=settings.RERANKER_TOP_K, help="NDCG cut-off")
+    parser.add_argument("--skip-margin", type=float, default=settings.RERANKER_SKIP_MARGIN)
+    parser.add_argument("--max-entropy", type=float, default=settings.RERANKER_SKIP_MAX_ENTROPY)
+    parser.add_argument("--score-window", type=float, default=settings.RERANKER_SCORE_WINDOW)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    log_startup()
+
+    logger.info("=" * 60)
+    logger.info("RERANK POLICY EVALUATION - Reddit RAG Chatbot")
+    logger.info("=" * 60)
+
+    embedding_service = get_embedding_service()
+    vector_store = get_vector_store_service()
+    reranker = get_reranker(
+        model_name=settings.RERANKER_MODEL,
+        device=settings.RERANKER_DEVICE,
+        max_length=settings.RERANKER_MAX_LENGTH,
+    )
+    policy = RerankPolicy(
+        min_score=settings.MIN_SIMILARITY_SCORE,
+        skip_margin=args.skip_margin,
+        max_skip_entropy=args.max_entropy,
+        score_window=args.score_window,
+    )
+
+    conversations = random.Random(args.seed).sample(load_conversations(), args.queries)
+
+    ndcgs, pairs_full, pairs_policy = [], 0, 0
+    actions: Counter = Counter()
+
+    for conv in conversations:
+        query = conv.context
+        candidates = vector_store.search(
+            embedding_service.embed_text(query),
+            n_results=args.candidates,
+            min_score=settings.MIN_SIMILARITY_SCORE,
+        )
+        if len(candidates) < 2:
+            continue
+
+        # Reference: cross-encoder over every candidate
+        reference = reranker.rerank(query, candidates)
+        relevance = {r.conversation.id: len(reference) - r.rank for r in reference}
+
+        decision = policy.decide([c.score for c in candidates], top_k=args.k)
+        actions[decision.action] += 1
+        pairs_full += len(candidates)
+        pairs_policy += decision.n_candidates
+
+        if decision.action == "skip":
+            served = candidates[: args.k]
+        else:
+            served = reranker.rerank(query, candidates[: decision.n_candidates], top_k=args.k)
+
+        served_ids = [r.conversation.id for r in served]
+        ids = [c.conversation.id for c in candidates]
+        ndcgs.append(
+            ndcg_at_k(
+                [relevance[i] for i in ids],
+                [args.k - served_ids.index(i) if i in served_ids else -1 for i in ids],
+                args.k,
+            )
+        )
+
+    if not ndcgs:
+        logger.error("No candidates found (index the conversations first)")
+        sys.exit(1)
+
+    logger.info(f"\nQueries evaluated: {len(ndcgs)}")
+    logger.info(f"Decisions: {dict(actions)}")
+    logger.info(f"NDCG@{args.k} vs always reranking: {statistics.mean(ndcgs):.4f}")
+    logger.info(f"Cross-encoder pairs: {pairs_policy} / {pairs_full}")
+    logger.info(f"Rerank work saved: {1 - pairs_policy / pairs_full:.1%}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("\n\nEvaluation interrupted")
+        sys.exit(1)
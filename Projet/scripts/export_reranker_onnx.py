@@ -0,0 +1,134 @@
+"""
+Reranker ONNX Export - Reddit RAG Chatbot
+Export the cross-encoder to int8 ONNX and report its ranking agreement
+with the torch model
+"""
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+from sentence_transformers import CrossEncoder
+
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config.logging_config import get_logger, log_startup
+from src.config.settings import settings
+from src.core.embeddings import get_embedding_service
+from src.core.onnx_reranker import OnnxCrossEncoder, export_onnx
+from src.core.vector_store import get_vector_store_service
+from src.utils.data_loader import load_conversations
+from src.utils.ranking_metrics import kendall_tau, ndcg_at_k
+
+
+logger = get_logger(__name__)
+
+
+def sample_rerank_inputs(n_queries: int, n_candidates: int, seed: int) -> list[list[list[str]]]:
+    """Build (query, document) pair lists the way the chatbot does: dense search candidates."""
+    conversations = load_conversations()
+    queries = [conv.context for conv in random.Random(seed).sample(conversations, n_queries)]
+
+    embedding_service = get_embedding_service()
+    vector_store = get_vector_store_service()
+
+    inputs = []
+    for query in queries:
+        results = vector_store.search(embedding_service.embed_text(query), n_results=n_candidates)
+        if len(results) > 1:
+            inputs.append([[query, result.conversation.context] for result in results])
+    return inputs
+
+
+def timed_predict(model, pairs: list[list[str]]) -> tuple[list[float], float]:
+    """Score pairs, returning scores and latency in ms."""
+    start = time.perf_counter()
+    scores = [float(s) for s in model.predict(pairs, batch_size=32)]
+    return scores, (time.perf_counter() - start) * 1000
+
+
+def agreement_report(onnx_model, torch_model, inputs: list[list[list[str]]], k: int) -> dict:
+    """Compare ONNX and torch rankings over the sampled candidate lists."""
+    taus, ndcgs, top1, onnx_ms, torch_ms = [], [], [], [], []
+
+    for pairs in inputs:
+        reference, torch_duration = timed_predict(torch_model, pairs)
+        candidate, onnx_duration = timed_predict(onnx_model, pairs)
+
+        taus.append(kendall_tau(reference, candidate))
+        ndcgs.append(ndcg_at_k(reference, candidate, k))
+        top1.append(reference.index(max(reference)) == candidate.index(max(candidate)))
+        torch_ms.append(torch_duration)
+        onnx_ms.append(onnx_duration)
+
+    return {
+        "queries": len(inputs),
+        "kendall_tau_mean": statistics.mean(taus),
+        "kendall_tau_min": min(taus),
+        f"ndcg@{k}_mean": statistics.mean(ndcgs),
+        "top1_agreement": sum(top1) / len(top1),
+        "torch_ms_p50": statistics.median(torch_ms),
+        "onnx_ms_p50": statistics.median(onnx_ms),
+    }
+
+
+def main():
+    """Main export function"""
+    parser = argparse.ArgumentParser(description="Export the reranker to int8 ONNX")
+    parser.add_argument("--model", default=settings.RERANKER_MODEL, help="Cross-encoder model")
+    parser.add_argument("--output", default=settings.RERANKER_ONNX_PATH, help="Output directory")
+    parser.add_argument("--no-quantize", action="store_true", help="Keep the fp32 model only")
+    parser.add_argument("--queries", type=int, default=100, help="Queries for the report")
+    parser.add_argument("--candidates", type=int, default=15, help="Candidates per query")
+    parser.add_argument("-k", type=int, default=settings.RERANKER_TOP_K, help="NDCG cut-off")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-report", action="store_true", help="Export only")
+    args = parser.parse_args()
+
+    log_startup()
+
+    logger.info("=" * 60)
+    logger.info("RERANKER ONNX EXPORT - Reddit RAG Chatbot")
+    logger.info("=" * 60)
+
+    model_path = export_onnx(args.model, args.output, quantize=not args.no_quantize)
+    logger.info(f"✓ Model ready at {model_path}")
+
+    if args.skip_report:
+        return
+
+    logger.info("\n Ranking agreement vs torch...")
+    torch_model = CrossEncoder(args.model, device="cpu")
+    onnx_model = OnnxCrossEncoder(args.output, quantized=not args.no_quantize)
+
+    inputs = sample_rerank_inputs(args.queries, args.candidates, args.seed)
+    if not inputs:
+        logger.error("No candidates found (index the conversations first)")
+        sys.exit(1)
+
+    report = agreement_report(onnx_model, torch_model, inputs, args.k)
+    for name, value in report.items():
+        logger.info(
+            f"  {name:<20} {value:.3f}" if isinstance(value, float) else f"  {name:<20} {value}"
+        )
+
+    logger.info(f"\nEnable with RERANKER_BACKEND=onnx RERANKER_ONNX_PATH={args.output}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("\n\nExport interrupted")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Export failed: {e!s}")
+        import traceback
+
+        traceback.print_exc()
+        sys.exit(1)
@@ -12,7 +12,9 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config.logging_config import get_logger, log_startup
 from src.config.settings import settings
+from src.core.cache import IndexEpoch
 from src.core.embeddings import get_embedding_service
+from src.core.sparse_index import BM25Index
 from src.core.vector_store import get_vector_store_service
 from src.utils.data_loader import load_conversations
 
@@ -92,6 +94,16 @@ def main():
     else:
         logger.warning(f"  Mismatch: {len(conversations)} loaded, {final_count} indexed")
 
+    # Sparse (BM25) index over contexts, for hybrid search
+    logger.info("\n Building BM25 index...")
+    bm25_index = BM25Index.build((conv.id, conv.context) for conv in conversations)
+    bm25_index.save(settings.SPARSE_INDEX_DIR)
+    logger.info(f"✓ BM25 index: {bm25_index.get_stats()}")
+
+    # New index version: cached responses built on the old index stop matching
+    epoch = IndexEpoch(settings.INDEX_EPOCH_FILE).bump()
+    logger.info(f"✓ Index epoch is now {epoch} (caches invalidated)")
+
     # Test search
     logger.info("\n Testing search...")
     test_query = "What phone should I buy?"
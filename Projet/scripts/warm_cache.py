@@ -0,0 +1,65 @@
+"""
+Cache Warm-up Script - Reddit RAG Chatbot
+Replay the most frequent logged queries and snapshot the response cache
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.config.logging_config import get_logger, log_startup
+from src.config.settings import settings
+from src.core.warmup import QueryLog, get_cache_warmer, save_cache_snapshot
+from src.services.chatbot_service import get_chatbot_service
+
+
+logger = get_logger(__name__)
+
+
+def main():
+    """Main warm-up function"""
+    parser = argparse.ArgumentParser(description="Warm the response cache from the query log")
+    parser.add_argument("--query-log", default=settings.QUERY_LOG_FILE, help="Query log file")
+    parser.add_argument("--top-n", type=int, default=settings.CACHE_WARMUP_TOP_N)
+    parser.add_argument(
+        "--snapshot", default=settings.CACHE_SNAPSHOT_FILE, help="Snapshot file to write"
+    )
+    args = parser.parse_args()
+
+    log_startup()
+
+    if not args.query_log:
+        logger.error("No query log configured (set QUERY_LOG_FILE or pass --query-log)")
+        sys.exit(1)
+
+    logger.info("=" * 60)
+    logger.info("CACHE WARM-UP - Reddit RAG Chatbot")
+    logger.info("=" * 60)
+
+    chatbot = get_chatbot_service()
+    warmed = get_cache_warmer().replay(chatbot.replay_query, QueryLog(args.query_log), args.top_n)
+    logger.info(f"✓ Replayed {warmed} queries")
+
+    if args.snapshot:
+        saved = save_cache_snapshot(chatbot.cache, args.snapshot)
+        logger.info(f"✓ Snapshot with {saved} entries written to {args.snapshot}")
+
+    logger.info(f"Cache stats: {chatbot.cache.get_stats()}")
+
+
+if __name__ == "__main__":
+    try:
+        main()
+    except KeyboardInterrupt:
+        logger.info("\n\nWarm-up interrupted")
+        sys.exit(1)
+    except Exception as e:
+        logger.error(f"Warm-up failed: {e!s}")
+        import traceback
+
+        traceback.print_exc()
+        sys.exit(1)
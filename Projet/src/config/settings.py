@@ -43,30 +43,93 @@ class Settings(BaseSettings):
     VECTOR_STORE_TYPE: str = "chromadb"  # chromadb, pinecone, qdrant
     CHROMA_COLLECTION_NAME: str = "reddit_conversations_pro"
     CHROMA_PERSIST_DIRECTORY: str = str(VECTOR_DB_DIR / "chroma_db")
+    SPARSE_INDEX_DIR: str = str(VECTOR_DB_DIR / "bm25")  # BM25 index built by index_conversations
+    # Bumped on re-index (cache namespace)
+    INDEX_EPOCH_FILE: str = str(VECTOR_DB_DIR / "index_epoch")
 
     # ==================== LLM ====================
-    LLM_PROVIDER: str = "ollama"  # ollama, openai, anthropic, groq
+    LLM_PROVIDER: str = "ollama"  # ollama, openai, anthropic, groq, mock (offline tests/benchmarks)
     LLM_MODEL: str = "llama3.1:8b"  # Meta Llama 3.1 8B - optimal pour 16GB RAM
     LLM_TEMPERATURE: float = 0.7
     LLM_MAX_TOKENS: int = 500
     LLM_TIMEOUT: int = 60  # seconds (increased for larger model)
+    LLM_MAX_CONNECTIONS: int = 100  # Async client connection pool size, per provider
+    LLM_MAX_KEEPALIVE_CONNECTIONS: int = 20  # Idle connections kept open, per provider
+    LLM_FALLBACK_PROVIDERS: list = []  # Fallbacks after LLM_PROVIDER, "provider/model" (e.g. ["ollama/llama3.1:8b"])
+    LLM_BREAKER_FAILURES: int = 3  # Consecutive failures before a provider is skipped
+    LLM_BREAKER_RESET_TIMEOUT: float = 30.0  # seconds before a skipped provider is probed again
+    LLM_HEDGING_ENABLED: bool = False  # Send a backup request to the next provider when slow
+    LLM_HEDGE_PERCENTILE: float = 95.0  # Provider latency percentile after which to hedge
+    LLM_HEDGE_MIN_SAMPLES: int = 20  # Latencies observed before hedging a provider
+    LLM_MAX_CONCURRENT: dict = {"ollama": 2}  # LLM calls in flight, per provider
+    LLM_MAX_CONCURRENT_DEFAULT: int = 16  # Limit for providers missing from LLM_MAX_CONCURRENT
+    LLM_QUEUE_SIZE: int = 32  # LLM calls waiting for a slot, per provider (more are rejected)
+    LLM_QUEUE_TIMEOUT: float = 10.0  # seconds an LLM call may wait for a slot
+    LLM_OVERLOAD_FALLBACK: bool = True  # Best-match answer when the LLM is overloaded (else 503)
+    LLM_HEALTH_CHECK_INTERVAL: float = 30.0  # seconds between background LLM probes (0 = off)
+    STREAM_PREVIEW_ENABLED: bool = True  # Stream the best match as a preview before LLM tokens
     OLLAMA_BASE_URL: str = "http://localhost:11434"  # Ollama server URL
+    OLLAMA_KEEP_ALIVE: str = "30m"  # How long Ollama keeps the model (and its prompt cache) loaded
+    OLLAMA_NUM_CTX: int = 4096  # Ollama context window, fixed so requests never reload the model
+    MOCK_LLM_TTFT_MS: float = 200.0  # Mock provider: delay before the first token
+    MOCK_LLM_TOKENS_PER_SEC: float = 50.0  # Mock provider: decode speed (0 = instant)
+    MOCK_LLM_ERROR_RATE: float = 0.0  # Mock provider: fraction of failed calls
+    MOCK_LLM_RESPONSE_TOKENS: int = 60  # Mock provider: tokens per answer
+    MOCK_LLM_SEED: int = 0  # Mock provider: seed of the failure draws
     GROQ_API_KEY: str | None = None  # Groq API key (free at console.groq.com)
 
     # ==================== RERANKER ====================
     RERANKER_ENABLED: bool = True
     RERANKER_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
     RERANKER_DEVICE: str = "cpu"
+    RERANKER_BACKEND: str = "torch"  # torch, onnx (int8, see scripts/export_reranker_onnx.py)
+    RERANKER_ONNX_PATH: str = str(DATA_DIR / "models" / "reranker_onnx")
     RERANKER_TOP_K: int = 3  # Final number of results after reranking
+    RERANKER_BATCH_SIZE: int = 32
+    RERANKER_MAX_LENGTH: int = 256  # Token budget per (query, document) pair
+    RERANKER_MICRO_BATCHING: bool = False  # Share forward passes across concurrent requests
+    RERANKER_BATCH_WINDOW_MS: float = 2.0  # Wait for more requests before a forward pass
+    RERANKER_MAX_QUEUE: int = 64  # Requests waiting for a batch (beyond it, score inline)
+    # Cheap first stage prunes a wide pool before the cross-encoder
+    RERANKER_CASCADE_ENABLED: bool = False
+    RERANKER_CASCADE_POOL: int = 100  # Dense candidates fed to the first stage
+    RERANKER_CASCADE_KEEP: int = 20  # Candidates kept for the cross-encoder
+    RERANKER_CASCADE_DENSE_WEIGHT: float = 0.5  # First stage: dense score vs query-term coverage
+    RERANKER_DEADLINE_MS: float = 0  # Rerank budget per request, dense order past it (0 = off)
+    RERANKER_SCORE_CACHE_SIZE: int = 50000  # Cached (query, conversation) scores (0 = off)
+    RERANKER_SCORE_CACHE_TTL: int = 3600  # seconds
+    RERANKER_ADAPTIVE: bool = False  # Skip/shrink reranking on decisive dense scores (eval first)
+    RERANKER_SKIP_MARGIN: float = 0.1  # Min top-1 minus top-2 dense score gap to skip
+    RERANKER_SKIP_MAX_ENTROPY: float = 0.5  # Max normalized entropy (0-1) of dense scores to skip
+    RERANKER_SCORE_WINDOW: float = 0.1  # Rerank only candidates this close to the top score
 
     # ==================== CHATBOT ====================
     DEFAULT_N_RESULTS: int = 5
     MIN_SIMILARITY_SCORE: float = 0.5
+    # LLM prompt input-token budget (system, query, examples, memory, history)
     MAX_CONTEXT_LENGTH: int = 2000
+    PROMPT_TOKENIZER: str | None = None  # HF tokenizer for prompt budgets (None = ~3.5 chars/token)
+    HYBRID_SEARCH_ENABLED: bool = False  # Fuse dense and BM25 results (reciprocal rank fusion)
+    HYBRID_DENSE_WEIGHT: float = 0.5
+    HYBRID_SPARSE_WEIGHT: float = 0.5
+    HYBRID_SEARCH_WORKERS: int = 4  # Threads running BM25 lookups alongside dense search
     ENABLE_CACHING: bool = True
-    CACHE_BACKEND: str = "memory"  # memory or redis
-    CACHE_TTL: int = 3600  # seconds
+    CACHE_BACKEND: str = "memory"  # memory, sqlite (shared by workers on one host) or redis
+    CACHE_MAX_SIZE: int = 10000  # entries (memory and sqlite backends)
+    CACHE_SQLITE_PATH: str = str(DATA_DIR / "cache.sqlite3")
+    CACHE_TTL: int = 3600  # seconds (soft TTL: fresh until then)
+    CACHE_STALE_TTL: int = 900  # seconds past CACHE_TTL served stale while refreshing (0 = off)
+    CACHE_SINGLE_FLIGHT: bool = True  # Coalesce concurrent misses for the same query
+    CACHE_LOCK_TIMEOUT: int = 30  # seconds to wait on another worker's computation
     REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_SNAPSHOT_FILE: str | None = None  # Persist in-memory cache across restarts
+    QUERY_LOG_ENABLED: bool = False  # Record served queries for warm-up (writes user text to disk)
+    QUERY_LOG_FILE: str = str(DATA_DIR / "query_log.jsonl")  # Query log read by cache warm-up
+    QUERY_LOG_MAX_ENTRIES: int = 1000  # Distinct queries kept when the log is compacted
+    CACHE_WARMUP_TOP_N: int = 100  # Most frequent logged queries replayed at startup
+    STAGE_CACHE_ENABLED: bool = True  # Per-stage caches (query embedding, retrieval candidates)
+    STAGE_CACHE_MAX_SIZE: int = 10000  # entries per stage
+    STAGE_CACHE_TTL: int = 3600  # seconds
 
     # ==================== CONVERSATION MEMORY ====================
     MEMORY_MAX_SESSIONS: int = 1000
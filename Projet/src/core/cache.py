@@ -1,14 +1,23 @@
 """
 Caching Module for improved performance.
-Supports in-memory and Redis caching.
+Supports in-memory, SQLite (local disk) and Redis caching.
 """
 
+import contextlib
 import hashlib
 import json
+import re
+import sqlite3
+import threading
 import time
+import unicodedata
 from abc import ABC, abstractmethod
-from collections.abc import Callable
+from collections import OrderedDict
+from collections.abc import Callable, Iterator
+from concurrent.futures import CancelledError, Future
+from pathlib import Path
 from typing import Any
+from uuid import uuid4
 
 from loguru import logger
 
@@ -41,11 +50,32 @@ class CacheBackend(ABC):
         """Clear all cache entries."""
         pass
 
+    def acquire_lock(self, key: str, ttl: float = 30.0) -> str | None:
+        """
+        Try to take the computation lock for a key across processes.
+
+        Backends that are local to a single process have nothing to
+        coordinate with, so the lock is always granted.
+
+        Args:
+            key: Cache key being computed.
+            ttl: Lock expiry in seconds (protects against crashed holders).
+
+        Returns:
+            Lock token if acquired, None if another process holds it.
+        """
+        return "local"
+
+    def release_lock(self, key: str, token: str) -> None:
+        """Release a lock previously returned by acquire_lock."""
+        return None
+
 
 class InMemoryCache(CacheBackend):
     """
     Simple in-memory cache with TTL support.
-    Suitable for single-instance deployments.
+    Suitable for single-instance deployments. Thread-safe: requests served
+    from the thread pool share it.
     """
 
     def __init__(self, max_size: int = 10000, default_ttl: int = 3600):
@@ -59,43 +89,51 @@ class InMemoryCache(CacheBackend):
         self.max_size = max_size
         self.default_ttl = default_ttl
         self._cache: dict[str, tuple[Any, float]] = {}
-        self._access_times: dict[str, float] = {}
+        # Ordered from least to most recently used
+        self._access_times: OrderedDict[str, float] = OrderedDict()
+        # Guards both dicts: OrderedDict reordering is not atomic
+        self._lock = threading.RLock()
 
     def get(self, key: str) -> Any | None:
         """Get value from cache if not expired."""
-        if key not in self._cache:
-            return None
+        with self._lock:
+            if key not in self._cache:
+                return None
 
-        value, expiry = self._cache[key]
+            value, expiry = self._cache[key]
 
-        if expiry and time.time() > expiry:
-            self.delete(key)
-            return None
+            if expiry and time.time() > expiry:
+                self.delete(key)
+                return None
 
-        self._access_times[key] = time.time()
-        return value
+            self._access_times[key] = time.time()
+            self._access_times.move_to_end(key)
+            return value
 
     def set(self, key: str, value: Any, ttl: int | None = None) -> bool:
         """Set value in cache with optional TTL."""
-        # Evict old entries if at capacity
-        if len(self._cache) >= self.max_size and key not in self._cache:
-            self._evict_lru()
-
         ttl = ttl or self.default_ttl
         expiry = time.time() + ttl if ttl else None
 
-        self._cache[key] = (value, expiry)
-        self._access_times[key] = time.time()
+        with self._lock:
+            # Evict old entries if at capacity
+            if len(self._cache) >= self.max_size and key not in self._cache:
+                self._evict_lru()
+
+            self._cache[key] = (value, expiry)
+            self._access_times[key] = time.time()
+            self._access_times.move_to_end(key)
 
         return True
 
     def delete(self, key: str) -> bool:
         """Delete value from cache."""
-        if key in self._cache:
-            del self._cache[key]
-            self._access_times.pop(key, None)
-            return True
-        return False
+        with self._lock:
+            if key in self._cache:
+                del self._cache[key]
+                self._access_times.pop(key, None)
+                return True
+            return False
 
     def exists(self, key: str) -> bool:
         """Check if key exists and is not expired."""
@@ -103,17 +141,95 @@ class InMemoryCache(CacheBackend):
 
     def clear(self) -> None:
         """Clear all cache entries."""
-        self._cache.clear()
-        self._access_times.clear()
+        with self._lock:
+            self._cache.clear()
+            self._access_times.clear()
 
     def _evict_lru(self) -> None:
-        """Evict least recently used entry."""
+        """Evict least recently used entry (caller holds the lock)."""
         if not self._access_times:
             return
 
-        lru_key = min(self._access_times, key=self._access_times.get)
+        lru_key = next(iter(self._access_times))
         self.delete(lru_key)
 
+    def save_snapshot(self, path: str | Path) -> int:
+        """
+        Persist live entries to a JSON file (written atomically).
+
+        Entries whose values are not JSON-serializable are skipped.
+
+        Args:
+            path: Snapshot file path.
+
+        Returns:
+            Number of entries written.
+        """
+        now = time.time()
+        entries = []
+
+        # Least recently used first, so reloading preserves recency order
+        with self._lock:
+            items = [(key, self._cache.get(key)) for key in self._access_times]
+
+        for key, item in items:
+            if item is None:
+                continue
+            value, expiry = item
+            if expiry and expiry <= now:
+                continue
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            entries.append([key, value, expiry])
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(path.suffix + ".tmp")
+        tmp_path.write_text(json.dumps({"saved_at": now, "entries": entries}), encoding="utf-8")
+        tmp_path.replace(path)
+
+        logger.info(f"Saved {len(entries)} cache entries to {path}")
+        return len(entries)
+
+    def load_snapshot(self, path: str | Path) -> int:
+        """
+        Load entries from a snapshot file, skipping expired ones.
+
+        Args:
+            path: Snapshot file path.
+
+        Returns:
+            Number of entries loaded.
+        """
+        path = Path(path)
+        if not path.exists():
+            return 0
+
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read cache snapshot {path}: {e}")
+            return 0
+
+        now = time.time()
+        loaded = 0
+
+        with self._lock:
+            for key, value, expiry in data.get("entries", [])[-self.max_size :]:
+                if expiry and expiry <= now:
+                    continue
+                if len(self._cache) >= self.max_size and key not in self._cache:
+                    self._evict_lru()
+                self._cache[key] = (value, expiry)
+                self._access_times[key] = now
+                self._access_times.move_to_end(key)
+                loaded += 1
+
+        logger.info(f"Loaded {loaded} cache entries from {path}")
+        return loaded
+
     def get_stats(self) -> dict:
         """Get cache statistics."""
         return {
@@ -123,6 +239,201 @@ class InMemoryCache(CacheBackend):
         }
 
 
+class SQLiteCache(CacheBackend):
+    """
+    SQLite-backed cache on local disk, shared by all worker processes of a host.
+    Uses WAL mode so readers never block on the single writer.
+    """
+
+    _EVICT_EVERY = 100  # writes between size checks
+
+    def __init__(
+        self,
+        path: str | Path = "data/cache.sqlite3",
+        max_size: int = 10000,
+        default_ttl: int = 3600,
+    ):
+        """
+        Initialize SQLite cache.
+
+        Args:
+            path: Database file path.
+            max_size: Maximum number of entries (least recently used evicted first).
+            default_ttl: Default TTL in seconds.
+        """
+        self.path = Path(path)
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+
+        self._local = threading.local()
+        self._writes = 0
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._conn()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                expires_at REAL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_accessed ON cache (accessed_at);
+            CREATE TABLE IF NOT EXISTS locks (
+                key TEXT PRIMARY KEY,
+                token TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        """Get this thread's connection (sqlite3 connections are not thread-safe)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=5000")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key: str) -> Any | None:
+        """Get value from disk if not expired."""
+        try:
+            row = (
+                self._conn()
+                .execute("SELECT value, expires_at, accessed_at FROM cache WHERE key = ?", (key,))
+                .fetchone()
+            )
+            if row is None:
+                return None
+
+            value, expires_at, accessed_at = row
+            now = time.time()
+            if expires_at and now > expires_at:
+                self.delete(key)
+                return None
+
+            # Coarse recency tracking keeps hot reads from turning into writes
+            if now - accessed_at > 1.0:
+                self._conn().execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, key))
+            return json.loads(value)
+        except sqlite3.Error as e:
+            logger.error(f"SQLite get error: {e}")
+            return None
+
+    def set(self, key: str, value: Any, ttl: int | None = None) -> bool:
+        """Set value on disk with optional TTL."""
+        ttl = ttl or self.default_ttl
+        now = time.time()
+        expires_at = now + ttl if ttl else None
+
+        try:
+            self._conn().execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value), expires_at, now),
+            )
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f"SQLite set error: {e}")
+            return False
+
+        self._writes += 1
+        if self._writes % self._EVICT_EVERY == 0:
+            self._evict()
+        return True
+
+    def delete(self, key: str) -> bool:
+        """Delete value from disk."""
+        try:
+            cursor = self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+            return cursor.rowcount > 0
+        except sqlite3.Error as e:
+            logger.error(f"SQLite delete error: {e}")
+            return False
+
+    def exists(self, key: str) -> bool:
+        """Check if key exists and is not expired."""
+        return self.get(key) is not None
+
+    def clear(self) -> None:
+        """Clear all cache entries."""
+        try:
+            self._conn().execute("DELETE FROM cache")
+        except sqlite3.Error as e:
+            logger.error(f"SQLite clear error: {e}")
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones beyond max_size."""
+        try:
+            conn = self._conn()
+            conn.execute(
+                "DELETE FROM cache WHERE expires_at IS NOT NULL AND expires_at < ?", (time.time(),)
+            )
+            (size,) = conn.execute("SELECT COUNT(*) FROM cache").fetchone()
+            if size > self.max_size:
+                conn.execute(
+                    "DELETE FROM cache WHERE key IN "
+                    "(SELECT key FROM cache ORDER BY accessed_at LIMIT ?)",
+                    (size - self.max_size,),
+                )
+        except sqlite3.Error as e:
+            logger.error(f"SQLite eviction error: {e}")
+
+    def acquire_lock(self, key: str, ttl: float = 30.0) -> str | None:
+        """Take a host-wide lock shared by all processes using this file."""
+        token = uuid4().hex
+        now = time.time()
+
+        try:
+            conn = self._conn()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.execute("DELETE FROM locks WHERE key = ? AND expires_at < ?", (key, now))
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO locks (key, token, expires_at) VALUES (?, ?, ?)",
+                    (key, token, now + ttl),
+                )
+                conn.execute("COMMIT")
+            except sqlite3.Error:
+                conn.execute("ROLLBACK")
+                raise
+            return token if cursor.rowcount == 1 else None
+        except sqlite3.Error as e:
+            logger.error(f"SQLite lock error: {e}")
+            return token
+
+    def release_lock(self, key: str, token: str) -> None:
+        """Release the lock only if it is still owned by this token."""
+        try:
+            self._conn().execute("DELETE FROM locks WHERE key = ? AND token = ?", (key, token))
+        except sqlite3.Error as e:
+            logger.error(f"SQLite unlock error: {e}")
+
+    def get_stats(self) -> dict:
+        """Get cache statistics."""
+        try:
+            (size,) = self._conn().execute("SELECT COUNT(*) FROM cache").fetchone()
+        except sqlite3.Error:
+            size = None
+        return {
+            "size": size,
+            "max_size": self.max_size,
+            "default_ttl": self.default_ttl,
+            "path": str(self.path),
+        }
+
+
+# Delete the lock key only if it still holds our token (atomic compare-and-delete)
+_RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+end
+return 0
+"""
+
+
 class RedisCache(CacheBackend):
     """
     Redis-based cache for distributed deployments.
@@ -231,6 +542,31 @@ class RedisCache(CacheBackend):
         except Exception as e:
             logger.error(f"Redis clear error: {e}")
 
+    def acquire_lock(self, key: str, ttl: float = 30.0) -> str | None:
+        """Take a cross-worker lock with SET NX PX (fails open if Redis errors)."""
+        token = uuid4().hex
+        if not self._client:
+            return token
+
+        try:
+            acquired = self._client.set(
+                self._make_key(f"lock:{key}"), token, nx=True, px=int(ttl * 1000)
+            )
+            return token if acquired else None
+        except Exception as e:
+            logger.error(f"Redis lock error: {e}")
+            return token
+
+    def release_lock(self, key: str, token: str) -> None:
+        """Release the lock only if it is still owned by this token."""
+        if not self._client:
+            return
+
+        try:
+            self._client.eval(_RELEASE_LOCK_SCRIPT, 1, self._make_key(f"lock:{key}"), token)
+        except Exception as e:
+            logger.error(f"Redis unlock error: {e}")
+
     def is_connected(self) -> bool:
         """Check if connected to Redis."""
         if not self._client:
@@ -242,15 +578,93 @@ class RedisCache(CacheBackend):
             return False
 
 
+# Envelope keys for entries stored with a soft TTL (stale-while-revalidate)
+_SWR_VALUE = "__swr_value__"
+_SWR_FRESH_UNTIL = "__swr_fresh_until__"
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls for the same key into a single computation.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight wait on the same future and receive its result (or error).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> tuple[Any, bool]:
+        """
+        Run fn once per key among concurrent callers.
+
+        Args:
+            key: Deduplication key.
+            fn: Function computing the value.
+
+        Returns:
+            Tuple of (value, shared) where shared is True for waiting callers.
+        """
+        future, leader = self.join(key)
+        if not leader:
+            return future.result(), True
+
+        try:
+            value = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value, False
+        finally:
+            self.leave(key, future)
+
+    def join(self, key: str) -> tuple[Future, bool]:
+        """
+        Get the in-flight future for a key, creating it if there is none.
+
+        Returns:
+            Tuple of (future, leader). A leader must resolve the future and
+            then call leave(); other callers wait on it.
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        return future, leader
+
+    def leave(self, key: str, future: Future) -> None:
+        """End a leader's flight; waiters of an unresolved future get CancelledError."""
+        with self._lock:
+            self._calls.pop(key, None)
+        if not future.done():
+            future.cancel()
+
+    @property
+    def in_flight(self) -> int:
+        """Number of keys currently being computed."""
+        return len(self._calls)
+
+
 class CacheService:
     """
     High-level cache service with support for multiple backends.
+
+    Entries written with a stale_ttl carry a soft expiry: until the soft TTL
+    they are fresh hits, then until the hard TTL (ttl + stale_ttl) they are
+    served stale while a single background task recomputes them.
     """
 
     def __init__(
         self,
         backend: CacheBackend | None = None,
         enabled: bool = True,
+        single_flight: bool = True,
+        lock_timeout: float = 30.0,
     ):
         """
         Initialize cache service.
@@ -258,32 +672,46 @@ class CacheService:
         Args:
             backend: Cache backend to use.
             enabled: Whether caching is enabled.
+            single_flight: Coalesce concurrent misses for the same key.
+            lock_timeout: Max seconds to wait on another worker's computation.
         """
         self.enabled = enabled
         self.backend = backend or InMemoryCache()
+        self.single_flight = single_flight
+        self.lock_timeout = lock_timeout
 
+        self._flight = SingleFlight()
+        self._refresh_lock = threading.Lock()
+        self._refreshing: set[str] = set()
         self._hits = 0
         self._misses = 0
+        self._coalesced = 0
+        self._stale_served = 0
+        self._refreshes = 0
 
     def get(self, key: str) -> Any | None:
-        """Get value from cache."""
+        """Get value from cache (stale values within the hard TTL included)."""
         if not self.enabled:
             return None
 
-        value = self.backend.get(key)
+        entry = self._read(key)
 
-        if value is not None:
+        if entry is not None:
             self._hits += 1
-        else:
-            self._misses += 1
+            return entry[0]
 
-        return value
+        self._misses += 1
+        return None
 
-    def set(self, key: str, value: Any, ttl: int | None = None) -> bool:
-        """Set value in cache."""
+    def set(
+        self, key: str, value: Any, ttl: int | None = None, stale_ttl: int | None = None
+    ) -> bool:
+        """Set value in cache (with a soft expiry when stale_ttl is set, like fetch)."""
         if not self.enabled:
             return False
 
+        if stale_ttl:
+            return self._store(key, value, ttl, stale_ttl)
         return self.backend.set(key, value, ttl)
 
     def delete(self, key: str) -> bool:
@@ -295,32 +723,286 @@ class CacheService:
         self.backend.clear()
         self._hits = 0
         self._misses = 0
+        self._coalesced = 0
+        self._stale_served = 0
+        self._refreshes = 0
 
     def get_or_set(
         self,
         key: str,
         factory: Callable,
         ttl: int | None = None,
+        stale_ttl: int | None = None,
     ) -> Any:
         """
         Get value from cache or compute and cache it.
 
+        Concurrent misses for the same key are coalesced so the factory
+        runs once (see fetch).
+
         Args:
             key: Cache key.
             factory: Function to compute value if not cached.
-            ttl: TTL for cached value.
+            ttl: TTL for cached value (soft TTL when stale_ttl is set).
+            stale_ttl: Extra seconds a stale value may be served while refreshing.
 
         Returns:
             Cached or computed value.
         """
-        value = self.get(key)
-        if value is not None:
-            return value
-
-        value = factory()
-        self.set(key, value, ttl)
+        value, _ = self.fetch(key, factory, ttl, stale_ttl)
         return value
 
+    def fetch(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: int | None = None,
+        stale_ttl: int | None = None,
+    ) -> tuple[Any, str]:
+        """
+        Get value from cache or compute it, reporting where it came from.
+
+        On a miss only one caller per key runs the factory: other callers in
+        this process wait for its result, and callers in other workers wait
+        on the backend lock (Redis) and then read the stored value.
+
+        Args:
+            key: Cache key.
+            factory: Function to compute value if not cached.
+            ttl: TTL for cached value (soft TTL when stale_ttl is set).
+            stale_ttl: Extra seconds a stale value may be served while refreshing.
+
+        Returns:
+            Tuple of (value, status) where status is "hit", "stale" (served
+            while refreshing), "miss" (computed by this caller) or
+            "coalesced" (computed by another caller).
+        """
+        cached = self.peek(key, factory, ttl, stale_ttl)
+        if cached is not None:
+            return cached
+
+        if not self.enabled or not self.single_flight:
+            value = factory()
+            self._store(key, value, ttl, stale_ttl)
+            return value, "miss"
+
+        try:
+            (value, computed), shared = self._flight.do(
+                key, lambda: self._load(key, factory, ttl, stale_ttl)
+            )
+        except CancelledError:
+            # The leader gave up without a value (e.g. a closed stream)
+            return self.fetch(key, factory, ttl, stale_ttl)
+
+        if shared or not computed:
+            self._coalesced += 1
+            return value, "coalesced"
+        return value, "miss"
+
+    def peek(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: int | None = None,
+        stale_ttl: int | None = None,
+    ) -> tuple[Any, str] | None:
+        """
+        Cache lookup of fetch(), without computing on a miss.
+
+        A stale value is returned like in fetch(), and factory is scheduled
+        in the background to refresh it.
+
+        Returns:
+            Tuple of (value, status) with status "hit" or "stale", or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        entry = self._read(key)
+        if entry is None:
+            self._misses += 1
+            return None
+
+        self._hits += 1
+        value, fresh = entry
+        if fresh:
+            return value, "hit"
+        self._stale_served += 1
+        self._schedule_refresh(key, factory, ttl, stale_ttl)
+        return value, "stale"
+
+    @contextlib.contextmanager
+    def claim(
+        self,
+        key: str,
+        ttl: int | None = None,
+        stale_ttl: int | None = None,
+    ) -> Iterator[tuple[Any, Callable[[Any], None]]]:
+        """
+        Miss handling of fetch() for callers that compute the value themselves
+        (e.g. while streaming it to a client).
+
+        Yields (value, store). If another caller was already computing the
+        key, value is its result and store does nothing. Otherwise value is
+        None: the caller computes the value and passes it to store(), which
+        caches it and hands it to the callers waiting on the key. Leaving
+        without storing (error, closed stream) lets the waiters compute it.
+
+        Args:
+            key: Cache key.
+            ttl: TTL for cached value (soft TTL when stale_ttl is set).
+            stale_ttl: Extra seconds a stale value may be served while refreshing.
+        """
+        if not self.enabled or not self.single_flight:
+            yield None, lambda value: self._store(key, value, ttl, stale_ttl)
+            return
+
+        future, leader = self._flight.join(key)
+        while not leader:
+            try:
+                value, _ = future.result()
+            except CancelledError:
+                future, leader = self._flight.join(key)
+                continue
+            self._coalesced += 1
+            yield value, lambda _value: None
+            return
+
+        token = self.backend.acquire_lock(key, ttl=self.lock_timeout)
+        try:
+            # Another worker is computing it, or the value landed since our miss
+            if token is None:
+                value = self._wait_for_value(key)
+            else:
+                entry = self._read(key)
+                value = entry[0] if entry is not None and entry[1] else None
+            if value is not None:
+                future.set_result((value, False))
+                self._coalesced += 1
+                yield value, lambda _value: None
+                return
+
+            def store(value: Any) -> None:
+                self._store(key, value, ttl, stale_ttl)
+                future.set_result((value, True))
+
+            yield None, store
+        finally:
+            if token is not None:
+                self.backend.release_lock(key, token)
+            self._flight.leave(key, future)
+
+    def _read(self, key: str) -> tuple[Any, bool] | None:
+        """Read an entry from the backend as (value, fresh), unwrapping soft-TTL envelopes."""
+        raw = self.backend.get(key)
+        if raw is None:
+            return None
+
+        if isinstance(raw, dict) and _SWR_VALUE in raw:
+            return raw[_SWR_VALUE], time.time() < raw[_SWR_FRESH_UNTIL]
+
+        return raw, True
+
+    def _store(self, key: str, value: Any, ttl: int | None, stale_ttl: int | None) -> bool:
+        """Store a value, wrapping it with its soft expiry when stale_ttl is set."""
+        if value is None:
+            return False
+
+        if not stale_ttl:
+            return self.set(key, value, ttl)
+
+        soft_ttl = ttl or getattr(self.backend, "default_ttl", 3600)
+        envelope = {_SWR_VALUE: value, _SWR_FRESH_UNTIL: time.time() + soft_ttl}
+        return self.set(key, envelope, soft_ttl + stale_ttl)
+
+    def _load(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: int | None,
+        stale_ttl: int | None,
+    ) -> tuple[Any, bool]:
+        """Compute a missing value under the backend lock; returns (value, computed)."""
+        token = self.backend.acquire_lock(key, ttl=self.lock_timeout)
+        if token is None:
+            # Another worker is computing it: wait for the stored value
+            value = self._wait_for_value(key)
+            if value is not None:
+                return value, False
+            logger.warning(f"Timed out waiting for cache key {key[:12]}..., computing locally")
+
+        try:
+            # Re-check: the value may have landed since our miss
+            entry = self._read(key)
+            if entry is not None and entry[1]:
+                return entry[0], False
+
+            value = factory()
+            self._store(key, value, ttl, stale_ttl)
+            return value, True
+        finally:
+            if token is not None:
+                self.backend.release_lock(key, token)
+
+    def _wait_for_value(self, key: str) -> Any | None:
+        """Poll the backend until the lock holder stores the value."""
+        deadline = time.monotonic() + self.lock_timeout
+        delay = 0.01
+
+        while time.monotonic() < deadline:
+            entry = self._read(key)
+            if entry is not None:
+                return entry[0]
+            time.sleep(delay)
+            delay = min(delay * 2, 0.25)
+
+        return None
+
+    def _schedule_refresh(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: int | None,
+        stale_ttl: int | None,
+    ) -> None:
+        """Start one background refresh per stale key (no-op if one is running)."""
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        thread = threading.Thread(
+            target=self._refresh,
+            args=(key, factory, ttl, stale_ttl),
+            name="cache-refresh",
+            daemon=True,
+        )
+        thread.start()
+
+    def _refresh(
+        self,
+        key: str,
+        factory: Callable,
+        ttl: int | None,
+        stale_ttl: int | None,
+    ) -> None:
+        """Recompute a stale entry; skipped if another worker holds the key's lock."""
+        try:
+            token = self.backend.acquire_lock(key, ttl=self.lock_timeout)
+            if token is None:
+                return
+
+            try:
+                self._store(key, factory(), ttl, stale_ttl)
+                self._refreshes += 1
+            finally:
+                self.backend.release_lock(key, token)
+        except Exception as e:
+            logger.warning(f"Background cache refresh failed: {e}")
+        finally:
+            with self._refresh_lock:
+                self._refreshing.discard(key)
+
     @property
     def hit_rate(self) -> float:
         """Calculate cache hit rate."""
@@ -334,22 +1016,109 @@ class CacheService:
             "hits": self._hits,
             "misses": self._misses,
             "hit_rate": f"{self.hit_rate:.2%}",
+            "coalesced": self._coalesced,
+            "stale_served": self._stale_served,
+            "refreshes": self._refreshes,
         }
 
 
-def make_cache_key(*args, **kwargs) -> str:
+def make_cache_key(*args, namespace: str | None = None, **kwargs) -> str:
     """
     Create a cache key from arguments.
 
     Args:
         *args: Positional arguments.
+        namespace: Optional prefix (e.g. index epoch) so whole generations
+            of keys can be invalidated at once.
         **kwargs: Keyword arguments.
 
     Returns:
-        SHA256 hash of arguments.
+        SHA256 hash of arguments, prefixed with the namespace if given.
     """
     key_data = json.dumps({"args": args, "kwargs": kwargs}, sort_keys=True)
-    return hashlib.sha256(key_data.encode()).hexdigest()
+    digest = hashlib.sha256(key_data.encode()).hexdigest()
+    return f"{namespace}:{digest}" if namespace else digest
+
+
+_WHITESPACE_RE = re.compile(r"\s+")
+# Only sentence-ending punctuation: symbols like "C++" or "C#" change the question
+_TRAILING_PUNCT_RE = re.compile(r"[?.!\s]+$")
+
+
+def normalize_query(text: str) -> str:
+    """
+    Canonical form of a query for cache keys.
+
+    Applies NFKC, casefolding, whitespace collapsing and trimming of
+    trailing sentence punctuation (?, ., !), so "What phone?" and
+    " what  PHONE " share a key.
+
+    Args:
+        text: Raw query.
+
+    Returns:
+        Normalized query (falls back to the casefolded text if only
+        punctuation remains).
+    """
+    text = unicodedata.normalize("NFKC", text).casefold()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return _TRAILING_PUNCT_RE.sub("", text) or text
+
+
+class IndexEpoch:
+    """
+    Monotonic index version stored in a file next to the vector store.
+    Re-indexing bumps it; readers pick the change up within check_interval.
+    """
+
+    def __init__(self, path: str | Path, check_interval: float = 1.0):
+        """
+        Initialize index epoch reader.
+
+        Args:
+            path: Epoch file path.
+            check_interval: Min seconds between file checks.
+        """
+        self.path = Path(path)
+        self.check_interval = check_interval
+
+        self._epoch = 0
+        self._mtime: float | None = None
+        self._checked_at = 0.0
+
+    def current(self) -> int:
+        """Get the current epoch (0 if the index was never versioned)."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._epoch
+        self._checked_at = now
+
+        try:
+            mtime = self.path.stat().st_mtime
+            if mtime != self._mtime:
+                self._epoch = int(self.path.read_text().strip() or 0)
+                self._mtime = mtime
+        except FileNotFoundError:
+            self._epoch, self._mtime = 0, None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read index epoch {self.path}: {e}")
+
+        return self._epoch
+
+    def bump(self) -> int:
+        """Increment the epoch, invalidating keys namespaced by the previous one."""
+        self._checked_at = 0.0
+        epoch = self.current() + 1
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(str(epoch))
+        tmp_path.replace(self.path)
+
+        self._epoch = epoch
+        self._mtime = self.path.stat().st_mtime
+        logger.info(f"Index epoch bumped to {epoch}")
+        return epoch
 
 
 # Global cache service instance
@@ -360,14 +1129,23 @@ def get_cache_service(
     backend_type: str = "memory",
     redis_url: str = "redis://localhost:6379/0",
     enabled: bool = True,
+    *,
+    single_flight: bool = True,
+    lock_timeout: float = 30.0,
+    sqlite_path: str = "data/cache.sqlite3",
+    max_size: int = 10000,
 ) -> CacheService:
     """
     Get or create the global cache service.
 
     Args:
-        backend_type: Type of backend ("memory" or "redis").
+        backend_type: Type of backend ("memory", "sqlite" or "redis").
         redis_url: Redis URL if using redis backend.
         enabled: Whether caching is enabled.
+        single_flight: Coalesce concurrent misses for the same key.
+        lock_timeout: Max seconds to wait on another worker's computation.
+        sqlite_path: Database file if using sqlite backend.
+        max_size: Maximum number of entries for memory and sqlite backends.
 
     Returns:
         CacheService instance.
@@ -380,10 +1158,21 @@ def get_cache_service(
             # Fall back to memory if Redis not available
             if not backend.is_connected():
                 logger.warning("Redis not available, falling back to in-memory cache")
-                backend = InMemoryCache()
+                backend = InMemoryCache(max_size=max_size)
+        elif backend_type == "sqlite":
+            try:
+                backend = SQLiteCache(path=sqlite_path, max_size=max_size)
+            except sqlite3.Error as e:
+                logger.warning(f"SQLite cache unavailable ({e}), falling back to in-memory cache")
+                backend = InMemoryCache(max_size=max_size)
         else:
-            backend = InMemoryCache()
-
-        _cache_service = CacheService(backend=backend, enabled=enabled)
+            backend = InMemoryCache(max_size=max_size)
+
+        _cache_service = CacheService(
+            backend=backend,
+            enabled=enabled,
+            single_flight=single_flight,
+            lock_timeout=lock_timeout,
+        )
 
     return _cache_service
@@ -4,6 +4,8 @@ Maintains context across multiple interactions.
 """
 
 import contextlib
+import queue
+import threading
 import time
 from collections import deque
 from collections.abc import Callable
@@ -121,6 +123,15 @@ class ConversationMemory:
 
         self._sessions: dict[str, ConversationContext] = {}
         self._session_order: deque = deque()
+        self._remove_listeners: list[Callable[[str], None]] = []
+
+    def add_remove_listener(self, listener: Callable[[str], None]) -> None:
+        """Call listener(session_id) whenever a session is deleted, expires or is evicted."""
+        self._remove_listeners.append(listener)
+
+    def _notify_removed(self, session_id: str) -> None:
+        for listener in self._remove_listeners:
+            listener(session_id)
 
     def create_session(self, session_id: str | None = None) -> str:
         """
@@ -229,6 +240,7 @@ class ConversationMemory:
             del self._sessions[session_id]
             with contextlib.suppress(ValueError):
                 self._session_order.remove(session_id)
+            self._notify_removed(session_id)
             logger.debug(f"Deleted conversation session: {session_id}")
             return True
         return False
@@ -237,7 +249,8 @@ class ConversationMemory:
         """Evict the oldest session."""
         if self._session_order:
             oldest_id = self._session_order.popleft()
-            self._sessions.pop(oldest_id, None)
+            if self._sessions.pop(oldest_id, None) is not None:
+                self._notify_removed(oldest_id)
             logger.debug(f"Evicted old session: {oldest_id}")
 
     def cleanup_expired(self) -> int:
@@ -277,30 +290,62 @@ class SummarizingMemory:
     """
     Memory that summarizes old messages to maintain context
     while staying within token limits.
+
+    Summaries are built by a background worker, off the request path:
+    get_context returns the summary available now and only queues the
+    session when it has grown past the threshold. Each run folds the
+    messages older than keep_recent into the previous summary. A session
+    whose summary failed is not queued again before an exponential backoff,
+    and its summary is dropped when the base memory removes the session.
     """
 
     def __init__(
         self,
         base_memory: ConversationMemory,
-        summarizer: Callable | None = None,
+        summarizer: Callable[[str, str | None], str | None] | None = None,
         summary_threshold: int = 10,
         keep_recent: int = 5,
+        max_pending: int = 100,
+        *,
+        retry_backoff: float = 30.0,
+        max_retry_backoff: float = 600.0,
     ):
         """
         Initialize summarizing memory.
 
         Args:
             base_memory: Underlying conversation memory.
-            summarizer: Function to summarize messages.
+            summarizer: Function (new messages text, previous summary or None)
+                returning the updated summary, or None on failure.
             summary_threshold: Number of messages before summarizing.
             keep_recent: Number of recent messages to always keep.
+            max_pending: Max sessions waiting for a summary (others retry later).
+            retry_backoff: Seconds before retrying a session after its first failed
+                summary (doubled on each further failure).
+            max_retry_backoff: Upper bound of the retry delay.
         """
         self.base_memory = base_memory
         self.summarizer = summarizer
         self.summary_threshold = summary_threshold
         self.keep_recent = keep_recent
+        self.retry_backoff = retry_backoff
+        self.max_retry_backoff = max_retry_backoff
 
         self._summaries: dict[str, str] = {}
+        # Failed sessions: (consecutive failures, monotonic time of the next attempt)
+        self._retries: dict[str, tuple[int, float]] = {}
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._pending: set[str] = set()
+        self._lock = threading.Lock()
+        self._worker: threading.Thread | None = None
+        self._closed = False
+
+        # Stats
+        self._summarized = 0
+        self._failed = 0
+        self._dropped = 0
+
+        base_memory.add_remove_listener(self._forget)
 
     def get_context(
         self,
@@ -310,6 +355,8 @@ class SummarizingMemory:
         """
         Get conversation context with optional summary.
 
+        Never waits for summarization: the summary is the latest one built.
+
         Args:
             session_id: Session ID.
             include_summary: Whether to include summary of old messages.
@@ -323,13 +370,14 @@ class SummarizingMemory:
 
         # Check if we need to summarize
         if context.message_count > self.summary_threshold and self.summarizer:
-            self._maybe_summarize(session_id, context)
+            self._schedule(session_id)
 
         parts = []
 
         # Add summary if available
-        if include_summary and session_id in self._summaries:
-            parts.append(f"[Previous conversation summary: {self._summaries[session_id]}]")
+        summary = self._summaries.get(session_id)
+        if include_summary and summary:
+            parts.append(f"[Previous conversation summary: {summary}]")
 
         # Add recent messages
         recent = context.get_history(self.keep_recent)
@@ -338,18 +386,57 @@ class SummarizingMemory:
 
         return "\n".join(parts)
 
-    def _maybe_summarize(
-        self,
-        session_id: str,
-        context: ConversationContext,
-    ) -> None:
-        """Summarize old messages if threshold reached."""
-        if not self.summarizer:
+    def _schedule(self, session_id: str) -> None:
+        """Queue a session for summarization, once."""
+        with self._lock:
+            if session_id in self._pending:
+                return
+            retry = self._retries.get(session_id)
+            if retry is not None and time.monotonic() < retry[1]:
+                return
+            try:
+                self._queue.put_nowait(session_id)
+            except queue.Full:
+                self._dropped += 1
+                return
+            self._pending.add(session_id)
+        self._ensure_worker()
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread on first use."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._closed = False
+                self._worker = threading.Thread(
+                    target=self._run, name="memory-summarizer", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        """Worker loop: summarize queued sessions one at a time."""
+        while not self._closed:
+            try:
+                session_id = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if session_id is None:
+                break
+            try:
+                self._summarize(session_id)
+            finally:
+                with self._lock:
+                    self._pending.discard(session_id)
+
+    def _summarize(self, session_id: str) -> None:
+        """Fold the messages older than keep_recent into the session summary."""
+        context = self.base_memory.get_session(session_id)
+        if context is None or not self.summarizer:
             return
 
-        # Get messages to summarize (all except recent)
+        # Snapshot: requests keep appending messages while the summarizer runs
         messages_to_summarize = context.messages[: -self.keep_recent]
-
         if not messages_to_summarize:
             return
 
@@ -357,17 +444,69 @@ class SummarizingMemory:
         text = "\n".join(f"{m.role}: {m.content}" for m in messages_to_summarize)
 
         try:
-            summary = self.summarizer(text)
-            self._summaries[session_id] = summary
-
-            # Remove summarized messages
-            context.messages = context.messages[-self.keep_recent :]
-
-            logger.debug(
-                f"Summarized {len(messages_to_summarize)} messages for session {session_id}"
-            )
+            summary = self.summarizer(text, self._summaries.get(session_id))
         except Exception as e:
+            summary = None
             logger.error(f"Failed to summarize messages: {e}")
+        if not summary:
+            self._failed += 1
+            with self._lock:
+                failures = self._retries.get(session_id, (0, 0.0))[0] + 1
+                delay = min(self.retry_backoff * 2 ** (failures - 1), self.max_retry_backoff)
+                self._retries[session_id] = (failures, time.monotonic() + delay)
+            return
+
+        self._summaries[session_id] = summary
+        with self._lock:
+            self._retries.pop(session_id, None)
+
+        # Remove summarized messages (only those: newer ones may have arrived)
+        summarized = {id(m) for m in messages_to_summarize}
+        while context.messages and id(context.messages[0]) in summarized:
+            context.messages.pop(0)
+
+        self._summarized += 1
+        logger.debug(f"Summarized {len(messages_to_summarize)} messages for session {session_id}")
+
+    def _forget(self, session_id: str) -> None:
+        """Drop the summary and retry state of a removed session."""
+        self._summaries.pop(session_id, None)
+        with self._lock:
+            self._retries.pop(session_id, None)
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Wait until no session is waiting for a summary.
+
+        Args:
+            timeout: Max seconds to wait (None = no limit).
+
+        Returns:
+            True if all queued summaries are done.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        while self._pending:
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def close(self) -> None:
+        """Stop the worker thread."""
+        self._closed = True
+        with contextlib.suppress(queue.Full):
+            self._queue.put_nowait(None)
+
+    def get_stats(self) -> dict:
+        """Get summarization statistics."""
+        return {
+            "summaries": len(self._summaries),
+            "pending": len(self._pending),
+            "summarized": self._summarized,
+            "failed": self._failed,
+            "backing_off": len(self._retries),
+            "dropped": self._dropped,
+        }
 
 
 # Global conversation memory instance
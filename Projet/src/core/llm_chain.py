@@ -0,0 +1,577 @@
+"""
+LLM Provider Chain - Professional Reddit RAG Chatbot
+Ordered fallback across providers (e.g. groq -> ollama) with a circuit
+breaker per provider, optional hedged requests and per-provider metrics
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any
+
+import numpy as np
+
+from src.config.logging_config import get_logger, log_metric
+from src.config.settings import settings
+from src.core.llm_dispatcher import LLMDispatcher, LLMOverloaded, dispatch
+from src.core.llm_handler import LLMService
+from src.models.schemas import ChatMessage
+
+
+logger = get_logger(__name__)
+
+# Latency kinds tracked per provider: full completion, and time to first token
+LATENCY = "latency"
+TTFT = "ttft"
+
+
+class CircuitBreaker:
+    """
+    Per-provider circuit breaker.
+
+    closed: calls go through; after failure_threshold consecutive failures
+    the breaker opens. open: calls are refused until reset_timeout has
+    passed, then it turns half-open. half-open: a single probe call is let
+    through; its success closes the breaker, its failure opens it again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        """
+        Initialize the breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the breaker.
+            reset_timeout: Seconds to stay open before probing.
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        """Current state (open turns half-open once reset_timeout has passed)."""
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probing = False
+        return self._state
+
+    def allow(self) -> bool:
+        """Whether a call may go through (claims the probe slot when half-open)."""
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def record_success(self) -> None:
+        """Close the breaker."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release_probe(self) -> None:
+        """Free the half-open probe slot of a call that ended without an outcome."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        """Count a failure, opening the breaker at the threshold or on a failed probe."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self._trip()
+
+    def trip(self) -> None:
+        """Open the breaker now."""
+        with self._lock:
+            self._trip()
+
+    def _trip(self) -> None:
+        self._state = self.OPEN
+        self._opened_at = time.monotonic()
+        self._probing = False
+
+
+class ProviderStats:
+    """Request, error and latency counters of one provider."""
+
+    def __init__(self, window: int = 200):
+        """
+        Initialize counters.
+
+        Args:
+            window: Recent latencies kept per kind for percentiles.
+        """
+        self.requests = 0
+        self.failures = 0
+        self._latencies = {LATENCY: deque(maxlen=window), TTFT: deque(maxlen=window)}
+
+    def record_success(self, kind: str, latency_ms: float) -> None:
+        """Record a successful call."""
+        self.requests += 1
+        self._latencies[kind].append(latency_ms)
+
+    def record_failure(self) -> None:
+        """Record a failed call."""
+        self.requests += 1
+        self.failures += 1
+
+    def percentile(self, kind: str, q: float, min_samples: int = 1) -> float | None:
+        """Latency percentile in ms (None with fewer than min_samples samples)."""
+        samples = self._latencies[kind]
+        if len(samples) < max(min_samples, 1):
+            return None
+        return float(np.percentile(np.fromiter(samples, dtype=np.float64), q))
+
+    def get_stats(self) -> dict:
+        """Get counters and latency percentiles."""
+        stats = {
+            "requests": self.requests,
+            "failures": self.failures,
+            "error_rate": round(self.failures / self.requests, 4) if self.requests else 0.0,
+        }
+        for kind in (LATENCY, TTFT):
+            for q in (50, 95):
+                value = self.percentile(kind, q)
+                stats[f"{kind}_p{q}_ms"] = round(value, 2) if value is not None else None
+        return stats
+
+
+@dataclass
+class ChainedProvider:
+    """A provider of the chain with its breaker and stats."""
+
+    service: LLMService | LLMDispatcher
+    breaker: CircuitBreaker
+    stats: ProviderStats = field(default_factory=ProviderStats)
+
+    @property
+    def name(self) -> str:
+        return f"{self.service.provider}/{self.service.model}"
+
+
+class LLMProviderChain:
+    """
+    Ordered list of LLM services used as one.
+
+    Each call goes to the first provider whose breaker lets it through and
+    falls back to the next one on error. With hedging on, a backup request
+    is sent to the next provider when the current one has not answered (or
+    produced its first token, when streaming) within a latency percentile
+    of its recent calls; the first answer wins.
+
+    Exposes the LLMService API (is_available, generate, generate_stream,
+    agenerate), so the chatbot can use either.
+    """
+
+    def __init__(
+        self,
+        services: list[LLMService | LLMDispatcher],
+        *,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+        hedging: bool = False,
+        hedge_percentile: float = 95.0,
+        hedge_min_samples: int = 20,
+        max_workers: int = 16,
+        probe_on_request: bool = True,
+    ):
+        """
+        Initialize the chain.
+
+        Args:
+            services: LLM services, in order of preference.
+            failure_threshold: Consecutive failures that open a provider's breaker.
+            reset_timeout: Seconds before an open breaker lets a probe through.
+            hedging: Send backup requests to the next provider when slow.
+            hedge_percentile: Latency percentile of a provider after which to hedge.
+            hedge_min_samples: Latencies needed before hedging a provider.
+            max_workers: Threads running hedged sync calls.
+            probe_on_request: Re-check an unavailable provider when its breaker
+                lets a call through (off when a health monitor refreshes availability).
+        """
+        if not services:
+            raise ValueError("LLMProviderChain needs at least one service")
+
+        self.providers = [
+            ChainedProvider(service, CircuitBreaker(failure_threshold, reset_timeout))
+            for service in services
+        ]
+        self.hedging = hedging
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.probe_on_request = probe_on_request
+        self._pool = (
+            ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-hedge")
+            if hedging
+            else None
+        )
+
+        self._hedges = 0
+        self._hedge_wins = 0
+
+        # Providers down at startup are probed after reset_timeout
+        for provider in self.providers:
+            if not provider.service.is_available():
+                provider.breaker.trip()
+
+        logger.info(f"LLM provider chain: {' -> '.join(p.name for p in self.providers)}")
+
+    @property
+    def provider(self) -> str:
+        """Primary provider."""
+        return self.providers[0].service.provider
+
+    @property
+    def model(self) -> str:
+        """Primary model."""
+        return self.providers[0].service.model
+
+    def is_available(self) -> bool:
+        """Whether any provider may currently be called."""
+        return any(p.breaker.state != CircuitBreaker.OPEN for p in self.providers)
+
+    def generate(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage] | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
+        """Generate with the first provider that answers (see LLMService.generate)."""
+        _, response = self._first(
+            LATENCY,
+            lambda llm: llm.generate(query, context, history, temperature, max_tokens),
+        )
+        return response
+
+    def generate_stream(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage] | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> Iterator[str]:
+        """
+        Stream from the first provider that produces a token.
+
+        Fallback (and hedging) happen before the first token; an error after
+        it is raised to the caller.
+        """
+        provider, (first, stream) = self._first(
+            TTFT,
+            lambda llm: _open_stream(
+                llm.generate_stream(query, context, history, temperature, max_tokens)
+            ),
+        )
+        if first is None:
+            return
+
+        yield first
+        try:
+            yield from stream
+        except Exception:
+            provider.breaker.record_failure()
+            provider.stats.record_failure()
+            raise
+
+    async def agenerate(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage] | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
+        """Async generate with fallback and hedging (see LLMService.agenerate)."""
+        providers = iter(self.providers)
+        pending: dict[asyncio.Task, ChainedProvider] = {}
+        errors: list[tuple[str, Exception]] = []
+
+        def launch() -> ChainedProvider | None:
+            for provider in providers:
+                if self._usable(provider):
+                    coro = self._aattempt(
+                        provider,
+                        lambda llm: llm.agenerate(query, context, history, temperature, max_tokens),
+                    )
+                    pending[asyncio.create_task(coro)] = provider
+                    return provider
+            return None
+
+        primary = launch()
+        hedged = False
+        try:
+            while pending:
+                delay = self._hedge_delay(primary, LATENCY) if self.hedging and not hedged else None
+                done, _ = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+
+                if not done:
+                    hedged = True
+                    if launch() is not None:
+                        self._hedges += 1
+                    continue
+
+                for task in done:
+                    provider = pending.pop(task)
+                    try:
+                        response = task.result()
+                    except Exception as e:
+                        errors.append((provider.name, e))
+                        continue
+
+                    if provider is not primary and hedged:
+                        self._hedge_wins += 1
+                    return response
+
+                if not pending:
+                    primary = launch()
+        finally:
+            # Losers, or every call if this one was cancelled (their probe slots are released)
+            for task in pending:
+                task.cancel()
+
+        raise _all_failed(errors)
+
+    def _first(self, kind: str, call: Callable[[LLMService], Any]) -> tuple[ChainedProvider, Any]:
+        """
+        Run call on providers in order until one succeeds.
+
+        Returns:
+            Tuple of (provider that answered, its result)
+        """
+        providers = iter(self.providers)
+        errors: list[tuple[str, Exception]] = []
+
+        if not self.hedging:
+            for provider in providers:
+                if not self._usable(provider):
+                    continue
+                try:
+                    return provider, self._attempt(provider, kind, call)
+                except Exception as e:
+                    errors.append((provider.name, e))
+            raise _all_failed(errors)
+
+        pending: dict[Future, ChainedProvider] = {}
+
+        def launch() -> ChainedProvider | None:
+            for provider in providers:
+                if self._usable(provider):
+                    # Copy the context so the call keeps its LLM priority
+                    pending[
+                        self._pool.submit(
+                            contextvars.copy_context().run, self._attempt, provider, kind, call
+                        )
+                    ] = provider
+                    return provider
+            return None
+
+        primary = launch()
+        hedged = False
+        while pending:
+            delay = None if hedged else self._hedge_delay(primary, kind)
+            done, _ = wait(pending, timeout=delay, return_when=FIRST_COMPLETED)
+
+            if not done:
+                hedged = True
+                if launch() is not None:
+                    self._hedges += 1
+                    logger.info(f"Hedging {primary.name} after {delay * 1000:.0f}ms")
+                continue
+
+            for future in done:
+                provider = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append((provider.name, e))
+                    continue
+
+                if provider is not primary and hedged:
+                    self._hedge_wins += 1
+                # Sync calls cannot be cancelled: release losing streams once they answer
+                for loser in pending:
+                    loser.add_done_callback(_close_stream)
+                return provider, result
+
+            if not pending:
+                primary = launch()
+
+        raise _all_failed(errors)
+
+    def _usable(self, provider: ChainedProvider) -> bool:
+        """Whether to call a provider now (a half-open probe may re-check availability)."""
+        if not provider.breaker.allow():
+            return False
+        if not provider.service.is_available() and not (
+            self.probe_on_request and provider.service.refresh_availability()
+        ):
+            provider.breaker.record_failure()
+            return False
+        return True
+
+    def _attempt(self, provider: ChainedProvider, kind: str, call: Callable) -> Any:
+        """Call one provider, recording the outcome on its breaker and stats."""
+        start = time.perf_counter()
+        try:
+            result = call(provider.service)
+        except LLMOverloaded:
+            # A full queue is not a provider failure: fall back without tripping the breaker
+            provider.breaker.release_probe()
+            raise
+        except Exception as e:
+            self._record_failure(provider, e)
+            raise
+        except BaseException:
+            provider.breaker.release_probe()
+            raise
+        self._record_success(provider, kind, (time.perf_counter() - start) * 1000)
+        return result
+
+    async def _aattempt(self, provider: ChainedProvider, call: Callable) -> str:
+        """Async counterpart of _attempt."""
+        start = time.perf_counter()
+        try:
+            result = await call(provider.service)
+        except LLMOverloaded:
+            provider.breaker.release_probe()
+            raise
+        except Exception as e:
+            self._record_failure(provider, e)
+            raise
+        except BaseException:
+            # Cancelled (e.g. a hedging loser): no outcome, the next call may probe
+            provider.breaker.release_probe()
+            raise
+        self._record_success(provider, LATENCY, (time.perf_counter() - start) * 1000)
+        return result
+
+    @staticmethod
+    def _record_success(provider: ChainedProvider, kind: str, latency_ms: float) -> None:
+        provider.breaker.record_success()
+        provider.stats.record_success(kind, latency_ms)
+        log_metric(f"llm_{kind}_ms", latency_ms, {"provider": provider.name})
+
+    @staticmethod
+    def _record_failure(provider: ChainedProvider, error: Exception) -> None:
+        provider.breaker.record_failure()
+        provider.stats.record_failure()
+        logger.warning(f"LLM provider {provider.name} failed: {error!s}")
+        log_metric("llm_error", 1, {"provider": provider.name, "error_type": type(error).__name__})
+
+    def _hedge_delay(self, provider: ChainedProvider | None, kind: str) -> float | None:
+        """Seconds to wait on a provider before hedging (None = do not hedge)."""
+        if provider is None:
+            return None
+        latency_ms = provider.stats.percentile(
+            kind, self.hedge_percentile, min_samples=self.hedge_min_samples
+        )
+        return latency_ms / 1000 if latency_ms is not None else None
+
+    def get_stats(self) -> dict:
+        """Get per-provider breaker state, errors and latencies."""
+        return {
+            "providers": {
+                p.name: {"state": p.breaker.state, **p.stats.get_stats()} for p in self.providers
+            },
+            "hedging": self.hedging,
+            "hedges": self._hedges,
+            "hedge_wins": self._hedge_wins,
+        }
+
+
+def _open_stream(stream: Iterator[str]) -> tuple[str | None, Iterator[str]]:
+    """Pull the first chunk of a stream (None if it is empty)."""
+    return next(stream, None), stream
+
+
+def _close_stream(future: Future) -> None:
+    """Close the stream of a hedged call that lost the race."""
+    if future.exception() is None:
+        result = future.result()
+        if isinstance(result, tuple) and hasattr(result[1], "close"):
+            result[1].close()
+
+
+def _all_failed(errors: list[tuple[str, Exception]]) -> Exception:
+    """
+    Error raised when no provider answered.
+
+    LLMOverloaded when every attempt was turned away by a full queue, so
+    callers can still tell overload (503 / best-match fallback) from failure.
+    """
+    detail = "; ".join(f"{name}: {error}" for name, error in errors) or "none available"
+    if errors and all(isinstance(error, LLMOverloaded) for _, error in errors):
+        return LLMOverloaded(f"All LLM providers overloaded: {detail}")
+    return RuntimeError(f"All LLM providers failed: {detail}")
+
+
+def parse_provider_chain(entries: list[str]) -> list[tuple[str, str | None]]:
+    """
+    Parse "provider/model" entries (the model may itself contain slashes).
+
+    Args:
+        entries: e.g. ["ollama/llama3.1:8b", "groq"]
+
+    Returns:
+        (provider, model or None) pairs
+    """
+    chain = []
+    for entry in entries:
+        provider, _, model = entry.strip().partition("/")
+        chain.append((provider, model or None))
+    return chain
+
+
+def create_llm_service() -> LLMDispatcher | LLMProviderChain:
+    """
+    Build the LLM service from settings.
+
+    Returns:
+        LLMService for LLM_PROVIDER, or a chain when LLM_FALLBACK_PROVIDERS is set,
+        with every provider behind its concurrency limiter
+    """
+    if not settings.LLM_FALLBACK_PROVIDERS:
+        return dispatch(LLMService())
+
+    services = [dispatch(LLMService())] + [
+        dispatch(LLMService(provider=provider, model=model))
+        for provider, model in parse_provider_chain(settings.LLM_FALLBACK_PROVIDERS)
+    ]
+    return LLMProviderChain(
+        services,
+        failure_threshold=settings.LLM_BREAKER_FAILURES,
+        reset_timeout=settings.LLM_BREAKER_RESET_TIMEOUT,
+        hedging=settings.LLM_HEDGING_ENABLED,
+        hedge_percentile=settings.LLM_HEDGE_PERCENTILE,
+        hedge_min_samples=settings.LLM_HEDGE_MIN_SAMPLES,
+        # The health monitor keeps availability fresh: requests never probe
+        probe_on_request=settings.LLM_HEALTH_CHECK_INTERVAL <= 0,
+    )
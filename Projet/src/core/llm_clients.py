@@ -0,0 +1,142 @@
+"""
+Async LLM provider clients.
+One long-lived client per provider, each on its own tuned httpx connection
+pool, so keep-alive connections and TLS sessions survive across requests.
+"""
+
+import threading
+from typing import Any
+
+import httpx
+
+from src.config.logging_config import get_logger
+from src.config.settings import settings
+
+
+logger = get_logger(__name__)
+
+
+class AsyncLLMClients:
+    """
+    Registry of async provider clients, created on first use.
+
+    Clients bind to the event loop they first run on: share one registry per
+    loop (the API has a single loop) and close it on shutdown.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 60.0,
+        connect_timeout: float = 5.0,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+    ):
+        """
+        Initialize the registry.
+
+        Args:
+            timeout: Read/write timeout in seconds (a whole completion must fit).
+            connect_timeout: Connection timeout in seconds.
+            max_connections: Max concurrent connections per provider.
+            max_keepalive_connections: Idle connections kept open per provider.
+            keepalive_expiry: Seconds an idle connection is kept.
+        """
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._clients: dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, provider: str) -> Any:
+        """
+        Get the client of a provider, creating it on first use.
+
+        Args:
+            provider: ollama, openai, anthropic or groq.
+
+        Returns:
+            The provider SDK's async client.
+        """
+        client = self._clients.get(provider)
+        if client is None:
+            with self._lock:
+                client = self._clients.get(provider)
+                if client is None:
+                    client = self._create(provider)
+                    self._clients[provider] = client
+                    logger.info(f"Async {provider} client created ({self.limits})")
+        return client
+
+    def _create(self, provider: str) -> Any:
+        """Build a provider client on a dedicated connection pool."""
+        if provider == "ollama":
+            from ollama import AsyncClient
+
+            # Extra kwargs go to the underlying httpx.AsyncClient
+            return AsyncClient(
+                host=settings.OLLAMA_BASE_URL, timeout=self.timeout, limits=self.limits
+            )
+
+        http_client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+
+        if provider == "openai":
+            from openai import AsyncOpenAI
+
+            return AsyncOpenAI(http_client=http_client, timeout=self.timeout)
+
+        if provider == "anthropic":
+            from anthropic import AsyncAnthropic
+
+            return AsyncAnthropic(http_client=http_client, timeout=self.timeout)
+
+        if provider == "groq":
+            from groq import AsyncGroq
+
+            return AsyncGroq(
+                api_key=settings.GROQ_API_KEY, http_client=http_client, timeout=self.timeout
+            )
+
+        raise ValueError(f"Unsupported provider: {provider}")
+
+    async def aclose(self) -> None:
+        """Close all clients and their connection pools."""
+        with self._lock:
+            clients, self._clients = self._clients, {}
+        for provider, client in clients.items():
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"Failed to close async {provider} client: {e}")
+
+    def get_stats(self) -> dict:
+        """Get registry statistics."""
+        return {
+            "clients": sorted(self._clients),
+            "max_connections": self.limits.max_connections,
+            "max_keepalive_connections": self.limits.max_keepalive_connections,
+        }
+
+
+# Global registry instance
+_async_llm_clients: AsyncLLMClients | None = None
+
+
+def get_async_llm_clients() -> AsyncLLMClients:
+    """
+    Get the global async client registry configured from settings.
+
+    Returns:
+        AsyncLLMClients instance
+    """
+    global _async_llm_clients
+    if _async_llm_clients is None:
+        _async_llm_clients = AsyncLLMClients(
+            timeout=settings.LLM_TIMEOUT,
+            max_connections=settings.LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.LLM_MAX_KEEPALIVE_CONNECTIONS,
+        )
+    return _async_llm_clients
@@ -0,0 +1,335 @@
+"""
+LLM Dispatcher - Professional Reddit RAG Chatbot
+Caps concurrent LLM calls per provider behind a bounded priority queue,
+so a burst of requests waits (or is turned away) instead of overloading
+the provider
+"""
+
+import asyncio
+import contextlib
+import contextvars
+import heapq
+import itertools
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from enum import IntEnum
+
+import numpy as np
+
+from src.config.logging_config import get_logger, log_metric
+from src.config.settings import settings
+from src.core.llm_handler import LLMService
+from src.models.schemas import ChatMessage
+
+
+logger = get_logger(__name__)
+
+
+class Priority(IntEnum):
+    """LLM call priority (lower is served first)."""
+
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class LLMOverloaded(RuntimeError):
+    """Raised when an LLM call cannot get a slot (queue full or wait too long)."""
+
+
+# Priority of the LLM calls made in the current context
+_priority: contextvars.ContextVar[Priority] = contextvars.ContextVar(
+    "llm_priority", default=Priority.INTERACTIVE
+)
+
+
+@contextlib.contextmanager
+def llm_priority(priority: Priority):
+    """Run the LLM calls of a block at the given priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class ConcurrencyLimiter:
+    """
+    Priority semaphore for the LLM calls to one provider.
+
+    Up to max_concurrent calls run at once. Others wait in a queue of at
+    most max_queue entries, served by priority then arrival; callers are
+    rejected at once when the queue is full, or after waiting timeout seconds.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrent: int = 4,
+        max_queue: int = 32,
+        timeout: float = 10.0,
+        window: int = 500,
+    ):
+        """
+        Initialize the limiter.
+
+        Args:
+            name: Provider name (for logs and metrics).
+            max_concurrent: Max calls in flight.
+            max_queue: Max calls waiting for a slot.
+            timeout: Max seconds a call waits for a slot.
+            window: Number of recent queue waits kept for percentiles.
+        """
+        self.name = name
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._active = 0
+        self._waiting: list[tuple[int, int, Future]] = []
+        self._sequence = itertools.count()
+
+        # Stats
+        self._waits_ms: deque[float] = deque(maxlen=window)
+        self._calls = 0
+        self._rejected = 0
+        self._timeouts = 0
+
+    def acquire(self, priority: Priority = Priority.INTERACTIVE) -> float:
+        """
+        Wait for a slot.
+
+        Args:
+            priority: Call priority.
+
+        Returns:
+            Seconds spent waiting.
+
+        Raises:
+            LLMOverloaded: If the queue is full or the wait timed out.
+        """
+        start = time.perf_counter()
+        ticket = self._enqueue(priority)
+        if ticket is not None:
+            try:
+                ticket.result(timeout=self.timeout)
+            except FutureTimeoutError:
+                self._expire(ticket)
+        return self._granted(priority, start)
+
+    async def aacquire(self, priority: Priority = Priority.INTERACTIVE) -> float:
+        """Async counterpart of acquire (waits without blocking the event loop)."""
+        start = time.perf_counter()
+        ticket = self._enqueue(priority)
+        if ticket is not None:
+            waiter = asyncio.wrap_future(ticket)
+            try:
+                done, _ = await asyncio.wait({waiter}, timeout=self.timeout)
+            except asyncio.CancelledError:
+                # A slot granted to a cancelled caller goes to the next one
+                if ticket.done() and not ticket.cancelled():
+                    self.release()
+                raise
+            if not done:
+                self._expire(ticket)
+        return self._granted(priority, start)
+
+    def release(self) -> None:
+        """Free a slot, handing it to the first live waiter."""
+        with self._lock:
+            while self._waiting:
+                _, _, ticket = heapq.heappop(self._waiting)
+                # Waiters that gave up are skipped; a running ticket can no longer be cancelled
+                if ticket.set_running_or_notify_cancel():
+                    ticket.set_result(None)
+                    return
+            self._active -= 1
+
+    def _enqueue(self, priority: Priority) -> Future | None:
+        """Take a free slot (None) or a ticket in the queue."""
+        with self._lock:
+            if self._active < self.max_concurrent and not self._waiting:
+                self._active += 1
+                return None
+            if self._queued() >= self.max_queue:
+                self._rejected += 1
+                logger.warning(f"LLM queue for {self.name} is full, rejecting call")
+                log_metric("llm_rejected", 1, {"provider": self.name, "reason": "queue_full"})
+                raise LLMOverloaded(f"LLM queue for {self.name} is full")
+            ticket: Future = Future()
+            heapq.heappush(self._waiting, (int(priority), next(self._sequence), ticket))
+            return ticket
+
+    def _expire(self, ticket: Future) -> None:
+        """Give up waiting, unless the slot was granted in the meantime."""
+        with self._lock:
+            if not ticket.cancel():
+                return
+            self._timeouts += 1
+        log_metric("llm_rejected", 1, {"provider": self.name, "reason": "timeout"})
+        raise LLMOverloaded(f"No LLM slot for {self.name} within {self.timeout}s")
+
+    def _granted(self, priority: Priority, start: float) -> float:
+        """Record the queue wait of a call that got its slot."""
+        waited = time.perf_counter() - start
+        self._calls += 1
+        self._waits_ms.append(waited * 1000)
+        log_metric(
+            "llm_queue_ms", waited * 1000, {"provider": self.name, "priority": priority.name}
+        )
+        return waited
+
+    def _queued(self) -> int:
+        """Number of live waiters."""
+        return sum(not ticket.cancelled() for _, _, ticket in self._waiting)
+
+    def get_stats(self) -> dict:
+        """Get slot usage, rejections and queue wait percentiles."""
+        with self._lock:
+            active, queued = self._active, self._queued()
+        waits = np.asarray(self._waits_ms)
+        return {
+            "active": active,
+            "queued": queued,
+            "max_concurrent": self.max_concurrent,
+            "max_queue": self.max_queue,
+            "calls": self._calls,
+            "rejected": self._rejected,
+            "timeouts": self._timeouts,
+            "queue_p50_ms": round(float(np.percentile(waits, 50)), 2) if len(waits) else None,
+            "queue_p95_ms": round(float(np.percentile(waits, 95)), 2) if len(waits) else None,
+        }
+
+
+class LLMDispatcher:
+    """
+    LLMService wrapper that runs every call through a provider's limiter.
+
+    Exposes the LLMService API, so it can be used alone or inside an
+    LLMProviderChain (which then falls back to the next provider when one
+    is overloaded). Calls run at the priority set with llm_priority.
+    """
+
+    def __init__(self, service: LLMService, limiter: ConcurrencyLimiter):
+        """
+        Initialize the dispatcher.
+
+        Args:
+            service: LLM service to call.
+            limiter: Limiter of the service's provider.
+        """
+        self.service = service
+        self.limiter = limiter
+
+    @property
+    def provider(self) -> str:
+        """Provider of the wrapped service."""
+        return self.service.provider
+
+    @property
+    def model(self) -> str:
+        """Model of the wrapped service."""
+        return self.service.model
+
+    def is_available(self) -> bool:
+        """Whether the wrapped service is available."""
+        return self.service.is_available()
+
+    def refresh_availability(self) -> bool:
+        """Re-check the wrapped service."""
+        return self.service.refresh_availability()
+
+    def generate(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage] | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
+        """Generate once a slot is free (see LLMService.generate)."""
+        self.limiter.acquire(_priority.get())
+        try:
+            return self.service.generate(query, context, history, temperature, max_tokens)
+        finally:
+            self.limiter.release()
+
+    def generate_stream(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage] | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> Iterator[str]:
+        """Stream once a slot is free, holding it until the stream ends."""
+        self.limiter.acquire(_priority.get())
+        try:
+            yield from self.service.generate_stream(
+                query, context, history, temperature, max_tokens
+            )
+        finally:
+            self.limiter.release()
+
+    async def agenerate(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage] | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
+        """Async generate once a slot is free (see LLMService.agenerate)."""
+        await self.limiter.aacquire(_priority.get())
+        try:
+            return await self.service.agenerate(query, context, history, temperature, max_tokens)
+        finally:
+            self.limiter.release()
+
+    def get_stats(self) -> dict:
+        """Get service and limiter statistics."""
+        return {**self.service.get_stats(), "queue": self.limiter.get_stats()}
+
+
+# One limiter per provider, shared by all services of that provider
+_limiters: dict[str, ConcurrencyLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_llm_limiter(provider: str) -> ConcurrencyLimiter:
+    """
+    Get the limiter of a provider configured from settings.
+
+    Args:
+        provider: ollama, openai, anthropic or groq.
+
+    Returns:
+        ConcurrencyLimiter instance
+    """
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ConcurrencyLimiter(
+                provider,
+                max_concurrent=settings.LLM_MAX_CONCURRENT.get(
+                    provider, settings.LLM_MAX_CONCURRENT_DEFAULT
+                ),
+                max_queue=settings.LLM_QUEUE_SIZE,
+                timeout=settings.LLM_QUEUE_TIMEOUT,
+            )
+        return _limiters[provider]
+
+
+def dispatch(service: LLMService) -> LLMDispatcher:
+    """Wrap a service with the limiter of its provider."""
+    return LLMDispatcher(service, get_llm_limiter(service.provider))
+
+
+def get_llm_queue_stats() -> dict:
+    """Get the limiter statistics of every provider used so far."""
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return {limiter.name: limiter.get_stats() for limiter in limiters}
@@ -3,15 +3,41 @@ LLM Handler Service - Professional Reddit RAG Chatbot
 Handles LLM integration (Ollama, OpenAI, Anthropic)
 """
 
+import threading
+from collections.abc import Iterator
 from enum import Enum
+from typing import Any
 
 from src.config.logging_config import get_logger
 from src.config.settings import settings
+from src.core.llm_clients import AsyncLLMClients, get_async_llm_clients
+from src.core.mock_llm import MockLLM
+from src.core.prompt_builder import history_window
 from src.models.schemas import ChatMessage
 
 
 logger = get_logger(__name__)
 
+# History messages passed to the LLM (anchored window, see history_window)
+MAX_HISTORY_MESSAGES = 5
+
+# System prompt for chat models (optimized for Llama 3.1).
+# Prompts are laid out from most to least stable: this constant, then the
+# session history (append-only), then retrieved context and the query. Keep
+# it byte-identical across requests: the LLM server reuses the KV cache of
+# the longest prefix shared with the previous request.
+SYSTEM_PROMPT = (
+    "You are a friendly and helpful conversational AI assistant. "
+    "Your responses are based on real Reddit conversations.\n\n"
+    "CRITICAL RULES:\n"
+    "1. LANGUAGE: Respond in the SAME language as the user's question. "
+    "If they write in French, respond in French. If in English, respond in English.\n"
+    "2. DO NOT add labels like 'French!', 'Translation:', or any meta-commentary.\n"
+    "3. DO NOT translate your response - just give ONE answer in the user's language.\n"
+    "4. Be concise, natural and conversational.\n"
+    "5. Use the provided context to give relevant answers."
+)
+
 
 class LLMProvider(str, Enum):
     """LLM provider enum"""
@@ -20,6 +46,7 @@ class LLMProvider(str, Enum):
     OPENAI = "openai"
     ANTHROPIC = "anthropic"
     GROQ = "groq"
+    MOCK = "mock"
 
 
 class LLMService:
@@ -30,18 +57,44 @@ class LLMService:
     - Ollama (local, free)
     - OpenAI (API)
     - Anthropic (API)
+    - Groq (API)
+    - Mock (offline, deterministic, for tests and benchmarks)
     """
 
-    def __init__(self, provider: str | None = None, model: str | None = None):
+    def __init__(
+        self,
+        provider: str | None = None,
+        model: str | None = None,
+        async_clients: AsyncLLMClients | None = None,
+    ):
         """
         Initialize LLM service
 
         Args:
             provider: LLM provider (ollama/openai/anthropic)
             model: Model name
+            async_clients: Async client registry (default: shared one from settings)
         """
         self.provider = provider or settings.LLM_PROVIDER
         self.model = model or settings.LLM_MODEL
+        self.async_clients = async_clients or get_async_llm_clients()
+
+        # Sync API clients are kept for the life of the service so HTTP
+        # keep-alive and TLS sessions are reused across calls
+        self._clients: dict[str, Any] = {}
+        self._clients_lock = threading.Lock()
+
+        self._mock = (
+            MockLLM(
+                ttft_ms=settings.MOCK_LLM_TTFT_MS,
+                tokens_per_sec=settings.MOCK_LLM_TOKENS_PER_SEC,
+                error_rate=settings.MOCK_LLM_ERROR_RATE,
+                response_tokens=settings.MOCK_LLM_RESPONSE_TOKENS,
+                seed=settings.MOCK_LLM_SEED,
+            )
+            if self.provider == LLMProvider.MOCK
+            else None
+        )
 
         logger.info(f"Initializing LLM service: {self.provider}/{self.model}")
 
@@ -82,7 +135,8 @@ class LLMService:
                 # Check via settings (loaded from .env)
                 return bool(settings.GROQ_API_KEY)
 
-            return False
+            # The mock provider needs nothing to run
+            return self.provider == LLMProvider.MOCK
 
         except Exception as e:
             logger.debug(f"LLM availability check failed: {e!s}")
@@ -92,6 +146,15 @@ class LLMService:
         """Check if LLM is available"""
         return self._available
 
+    def refresh_availability(self) -> bool:
+        """Check the provider again (e.g. it was down at startup)"""
+        self._available = self._check_availability()
+        return self._available
+
+    def get_stats(self) -> dict:
+        """Get provider statistics"""
+        return {"provider": self.provider, "model": self.model, "available": self._available}
+
     def generate(
         self,
         query: str,
@@ -128,6 +191,8 @@ class LLMService:
                 return self._generate_anthropic(query, context, history, temperature, max_tokens)
             elif self.provider == LLMProvider.GROQ:
                 return self._generate_groq(query, context, history, temperature, max_tokens)
+            elif self.provider == LLMProvider.MOCK:
+                return self._mock.generate(query, context, max_tokens)
             else:
                 raise ValueError(f"Unsupported provider: {self.provider}")
 
@@ -135,6 +200,123 @@ class LLMService:
             logger.error(f"LLM generation failed: {e!s}")
             raise
 
+    async def agenerate(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage] | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> str:
+        """
+        Generate response using LLM without blocking the event loop
+
+        Uses the long-lived async client of the provider, so many requests
+        can wait on the LLM concurrently without a thread each.
+
+        Args:
+            query: User query
+            context: Context from retrieved conversations
+            history: Conversation history
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            Generated response
+        """
+        temperature = temperature or settings.LLM_TEMPERATURE
+        max_tokens = max_tokens or settings.LLM_MAX_TOKENS
+
+        if not self._available:
+            raise RuntimeError(f"LLM provider {self.provider} not available")
+
+        try:
+            if self.provider == LLMProvider.MOCK:
+                return await self._mock.agenerate(query, context, max_tokens)
+
+            client = self.async_clients.get(self.provider)
+
+            if self.provider == LLMProvider.OLLAMA:
+                response = await client.chat(
+                    **self._ollama_request(query, context, history, temperature, max_tokens)
+                )
+                return response["message"]["content"]
+
+            elif self.provider == LLMProvider.ANTHROPIC:
+                response = await client.messages.create(
+                    model=self.model,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    messages=[
+                        {"role": "user", "content": self._build_prompt(query, context, history)}
+                    ],
+                )
+                return response.content[0].text
+
+            elif self.provider in (LLMProvider.OPENAI, LLMProvider.GROQ):
+                response = await client.chat.completions.create(
+                    model=self.model,
+                    messages=self._chat_messages(query, context, history),
+                    temperature=temperature,
+                    max_tokens=max_tokens,
+                )
+                return response.choices[0].message.content
+
+            else:
+                raise ValueError(f"Unsupported provider: {self.provider}")
+
+        except Exception as e:
+            logger.error(f"Async LLM generation failed: {e!s}")
+            raise
+
+    def generate_stream(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage] | None = None,
+        temperature: float | None = None,
+        max_tokens: int | None = None,
+    ) -> Iterator[str]:
+        """
+        Generate response using LLM, yielding text chunks as they arrive
+
+        Args:
+            query: User query
+            context: Context from retrieved conversations
+            history: Conversation history
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+
+        Yields:
+            Response text chunks (their concatenation is the full response)
+        """
+        temperature = temperature or settings.LLM_TEMPERATURE
+        max_tokens = max_tokens or settings.LLM_MAX_TOKENS
+
+        if not self._available:
+            raise RuntimeError(f"LLM provider {self.provider} not available")
+
+        if self.provider == LLMProvider.OLLAMA:
+            stream = self._stream_ollama(query, context, history, temperature, max_tokens)
+        elif self.provider == LLMProvider.OPENAI:
+            stream = self._stream_openai(query, context, history, temperature, max_tokens)
+        elif self.provider == LLMProvider.ANTHROPIC:
+            stream = self._stream_anthropic(query, context, history, temperature, max_tokens)
+        elif self.provider == LLMProvider.GROQ:
+            stream = self._stream_groq(query, context, history, temperature, max_tokens)
+        elif self.provider == LLMProvider.MOCK:
+            stream = self._mock.stream(query, context, max_tokens)
+        else:
+            raise ValueError(f"Unsupported provider: {self.provider}")
+
+        try:
+            for chunk in stream:
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            logger.error(f"LLM streaming failed: {e!s}")
+            raise
+
     def _generate_ollama(
         self,
         query: str,
@@ -146,32 +328,59 @@ class LLMService:
         """Generate with Ollama (Meta Llama 3.1)"""
         import ollama
 
-        # Build messages for chat format (better for Llama 3.1)
-        messages = [{"role": "system", "content": self._get_system_prompt()}]
-
-        # Add conversation history if available
-        if history:
-            for msg in history[-5:]:  # Last 5 messages
-                messages.append({"role": msg.role, "content": msg.content})
-
-        # Add context and current query
-        user_content = self._build_user_message(query, context)
-        messages.append({"role": "user", "content": user_content})
-
         # Call Ollama with Llama 3.1
         response = ollama.chat(
-            model=self.model,
-            messages=messages,
-            options={
-                "temperature": temperature,
-                "num_predict": max_tokens,
-                "top_p": 0.9,
-                "repeat_penalty": 1.1,
-            },
+            **self._ollama_request(query, context, history, temperature, max_tokens)
         )
 
         return response["message"]["content"]
 
+    def _stream_ollama(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage],
+        temperature: float,
+        max_tokens: int,
+    ) -> Iterator[str]:
+        """Stream with Ollama"""
+        import ollama
+
+        for chunk in ollama.chat(
+            **self._ollama_request(query, context, history, temperature, max_tokens),
+            stream=True,
+        ):
+            yield chunk["message"]["content"]
+
+    def _ollama_request(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage] | None,
+        temperature: float,
+        max_tokens: int,
+    ) -> dict:
+        """Ollama chat arguments, set up for KV-cache reuse across requests"""
+        return {
+            "model": self.model,
+            "messages": self._chat_messages(query, context, history),
+            "options": self._ollama_options(temperature, max_tokens),
+            # Keep the model, and with it the cached prompt prefix, loaded between requests
+            "keep_alive": settings.OLLAMA_KEEP_ALIVE,
+        }
+
+    @staticmethod
+    def _ollama_options(temperature: float, max_tokens: int) -> dict:
+        """Sampling options for Ollama"""
+        return {
+            "temperature": temperature,
+            "num_predict": max_tokens,
+            "top_p": 0.9,
+            "repeat_penalty": 1.1,
+            # Same context size on every request: a different one reloads the model
+            "num_ctx": settings.OLLAMA_NUM_CTX,
+        }
+
     def _build_user_message(self, query: str, context: str) -> str:
         """Build user message with context for Llama 3.1"""
         if context:
@@ -193,26 +402,36 @@ class LLMService:
         max_tokens: int,
     ) -> str:
         """Generate with OpenAI"""
-        from openai import OpenAI
-
-        client = OpenAI()
-
-        # Build messages
-        messages = [
-            {"role": "system", "content": self._get_system_prompt()},
-            {"role": "user", "content": self._build_prompt(query, context, history)},
-        ]
+        client = self._client(LLMProvider.OPENAI)
 
         # Call OpenAI
         response = client.chat.completions.create(
             model=self.model,
-            messages=messages,
+            messages=self._chat_messages(query, context, history),
             temperature=temperature,
             max_tokens=max_tokens,
         )
 
         return response.choices[0].message.content
 
+    def _stream_openai(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage],
+        temperature: float,
+        max_tokens: int,
+    ) -> Iterator[str]:
+        """Stream with OpenAI"""
+        stream = self._client(LLMProvider.OPENAI).chat.completions.create(
+            model=self.model,
+            messages=self._chat_messages(query, context, history),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        yield from self._chat_completion_deltas(stream)
+
     def _generate_anthropic(
         self,
         query: str,
@@ -222,9 +441,7 @@ class LLMService:
         max_tokens: int,
     ) -> str:
         """Generate with Anthropic"""
-        import anthropic
-
-        client = anthropic.Anthropic()
+        client = self._client(LLMProvider.ANTHROPIC)
 
         # Build prompt
         prompt = self._build_prompt(query, context, history)
@@ -239,6 +456,23 @@ class LLMService:
 
         return response.content[0].text
 
+    def _stream_anthropic(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage],
+        temperature: float,
+        max_tokens: int,
+    ) -> Iterator[str]:
+        """Stream with Anthropic"""
+        with self._client(LLMProvider.ANTHROPIC).messages.stream(
+            model=self.model,
+            max_tokens=max_tokens,
+            temperature=temperature,
+            messages=[{"role": "user", "content": self._build_prompt(query, context, history)}],
+        ) as stream:
+            yield from stream.text_stream
+
     def _generate_groq(
         self,
         query: str,
@@ -248,27 +482,83 @@ class LLMService:
         max_tokens: int,
     ) -> str:
         """Generate with Groq (FREE and FAST!)"""
-
-        from groq import Groq
-
-        client = Groq(api_key=settings.GROQ_API_KEY)
-
-        # Build messages
-        messages = [
-            {"role": "system", "content": self._get_system_prompt()},
-            {"role": "user", "content": self._build_user_message(query, context)},
-        ]
+        client = self._client(LLMProvider.GROQ)
 
         # Call Groq
         response = client.chat.completions.create(
             model=self.model,
-            messages=messages,
+            messages=self._chat_messages(query, context, history),
             temperature=temperature,
             max_tokens=max_tokens,
         )
 
         return response.choices[0].message.content
 
+    def _stream_groq(
+        self,
+        query: str,
+        context: str,
+        history: list[ChatMessage],
+        temperature: float,
+        max_tokens: int,
+    ) -> Iterator[str]:
+        """Stream with Groq"""
+        stream = self._client(LLMProvider.GROQ).chat.completions.create(
+            model=self.model,
+            messages=self._chat_messages(query, context, history),
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True,
+        )
+        yield from self._chat_completion_deltas(stream)
+
+    def _client(self, provider: str) -> Any:
+        """Sync API client of a provider, created on first use"""
+        client = self._clients.get(provider)
+        if client is not None:
+            return client
+
+        with self._clients_lock:
+            if provider not in self._clients:
+                if provider == LLMProvider.OPENAI:
+                    from openai import OpenAI
+
+                    self._clients[provider] = OpenAI(timeout=settings.LLM_TIMEOUT)
+                elif provider == LLMProvider.ANTHROPIC:
+                    import anthropic
+
+                    self._clients[provider] = anthropic.Anthropic(timeout=settings.LLM_TIMEOUT)
+                elif provider == LLMProvider.GROQ:
+                    from groq import Groq
+
+                    self._clients[provider] = Groq(
+                        api_key=settings.GROQ_API_KEY, timeout=settings.LLM_TIMEOUT
+                    )
+                else:
+                    raise ValueError(f"No API client for provider: {provider}")
+            return self._clients[provider]
+
+    def _chat_messages(
+        self, query: str, context: str, history: list[ChatMessage] | None
+    ) -> list[dict]:
+        """Chat messages (Ollama, OpenAI, Groq): system, history, then context and query"""
+        messages = [{"role": "system", "content": self._get_system_prompt()}]
+
+        # History is append-only within a session, so it extends the shared prefix
+        for msg in history_window(history, MAX_HISTORY_MESSAGES):
+            messages.append({"role": msg.role, "content": msg.content})
+
+        # Retrieved context changes on every request: it goes last, with the query
+        messages.append({"role": "user", "content": self._build_user_message(query, context)})
+        return messages
+
+    @staticmethod
+    def _chat_completion_deltas(stream) -> Iterator[str]:
+        """Text deltas of an OpenAI-style chat completion stream (OpenAI, Groq)"""
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
     def _build_prompt(
         self, query: str, context: str, history: list[ChatMessage] | None = None
     ) -> str:
@@ -293,16 +583,16 @@ class LLMService:
             "Keep responses concise and conversational."
         )
 
-        # Add context
-        if context:
-            prompt_parts.append(f"\n\nRelevant examples from Reddit:\n\n{context}")
-
-        # Add history if available
+        # Add history if available (before the context, which changes every request)
         if history:
             prompt_parts.append("\n\nConversation history:")
-            for msg in history[-5:]:  # Last 5 messages
+            for msg in history_window(history, MAX_HISTORY_MESSAGES):
                 prompt_parts.append(f"{msg.role}: {msg.content}")
 
+        # Add context
+        if context:
+            prompt_parts.append(f"\n\nRelevant examples from Reddit:\n\n{context}")
+
         # Add current query
         prompt_parts.append(f"\n\nUser question: {query}")
         prompt_parts.append("\nYour response:")
@@ -311,17 +601,7 @@ class LLMService:
 
     def _get_system_prompt(self) -> str:
         """Get system prompt for chat models (optimized for Llama 3.1)"""
-        return (
-            "You are a friendly and helpful conversational AI assistant. "
-            "Your responses are based on real Reddit conversations.\n\n"
-            "CRITICAL RULES:\n"
-            "1. LANGUAGE: Respond in the SAME language as the user's question. "
-            "If they write in French, respond in French. If in English, respond in English.\n"
-            "2. DO NOT add labels like 'French!', 'Translation:', or any meta-commentary.\n"
-            "3. DO NOT translate your response - just give ONE answer in the user's language.\n"
-            "4. Be concise, natural and conversational.\n"
-            "5. Use the provided context to give relevant answers."
-        )
+        return SYSTEM_PROMPT
 
 
 # Singleton instance
@@ -0,0 +1,201 @@
+"""
+LLM Health Monitor - Professional Reddit RAG Chatbot
+Re-probes LLM providers in the background, so availability checks on the
+request path (routing, /health) read cached state instead of calling out
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any
+
+import numpy as np
+
+from src.config.logging_config import get_logger, log_metric
+from src.config.settings import settings
+from src.core.llm_chain import LLMProviderChain, ProviderStats
+
+
+logger = get_logger(__name__)
+
+
+class ProviderHealth:
+    """Availability probe history of one provider."""
+
+    def __init__(self, window: int = 50):
+        self.latencies_ms: deque[float] = deque(maxlen=window)
+        self.available: bool | None = None
+        self.last_check: float | None = None
+        self.last_error: str | None = None
+        self.consecutive_failures = 0
+
+    def record(self, available: bool, latency_ms: float, error: str | None = None) -> None:
+        """Record a probe outcome."""
+        self.available = available
+        self.last_check = time.time()
+        self.last_error = error
+        if available:
+            self.latencies_ms.append(latency_ms)
+            self.consecutive_failures = 0
+        else:
+            self.consecutive_failures += 1
+
+    def get_stats(self) -> dict:
+        """Get availability and probe latency percentiles."""
+        latencies = np.asarray(self.latencies_ms)
+        return {
+            "available": self.available,
+            "last_check": self.last_check,
+            "last_error": self.last_error,
+            "consecutive_failures": self.consecutive_failures,
+            "probe_p50_ms": round(float(np.percentile(latencies, 50)), 2)
+            if len(latencies)
+            else None,
+            "probe_p95_ms": round(float(np.percentile(latencies, 95)), 2)
+            if len(latencies)
+            else None,
+        }
+
+
+class LLMHealthMonitor:
+    """
+    Background prober of the watched LLM services.
+
+    Every interval, each service's availability is checked again with
+    refresh_availability(), which swaps its cached flag in one assignment:
+    a provider started after the API is picked up, and one that went down
+    is skipped, without any request paying for the check.
+    """
+
+    def __init__(self, interval: float = 30.0):
+        """
+        Initialize the monitor.
+
+        Args:
+            interval: Seconds between two probes of each provider.
+        """
+        self.interval = interval
+        self._services: list[Any] = []
+        self._health: dict[str, ProviderHealth] = {}
+        # Latency of real generations, kept by the provider chain
+        self._generation_stats: dict[str, ProviderStats] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def watch(self, llm_service: Any) -> None:
+        """
+        Set the services to probe and start the monitor if it is not running.
+
+        Args:
+            llm_service: LLM service used by the chatbot (a provider chain
+                is expanded into its providers).
+        """
+        if isinstance(llm_service, LLMProviderChain):
+            services = [provider.service for provider in llm_service.providers]
+            generation_stats = {provider.name: provider.stats for provider in llm_service.providers}
+        else:
+            services = [llm_service]
+            generation_stats = {}
+        with self._lock:
+            self._services = services
+            self._generation_stats = generation_stats
+            self._health = {
+                _name(s): self._health.get(_name(s), ProviderHealth()) for s in services
+            }
+        # Scripts and the CLI never go through the API lifespan
+        self.start()
+
+    def start(self) -> None:
+        """Start probing in a daemon thread (no-op if running or interval <= 0)."""
+        with self._lock:
+            if self.interval <= 0 or (self._thread is not None and self._thread.is_alive()):
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="llm-health", daemon=True)
+            self._thread.start()
+        logger.info(f"LLM health monitor started (every {self.interval:.0f}s)")
+
+    def stop(self) -> None:
+        """Stop the probing thread."""
+        self._stop.set()
+
+    def _run(self) -> None:
+        """Probe loop."""
+        while not self._stop.wait(self.interval):
+            self.probe_all()
+
+    def probe_all(self) -> None:
+        """Probe every watched service once."""
+        with self._lock:
+            services = list(self._services)
+        for service in services:
+            self._probe(service)
+
+    def _probe(self, service: Any) -> None:
+        """Re-check one service and record the outcome."""
+        name = _name(service)
+        was_available = service.is_available()
+        start = time.perf_counter()
+        error = None
+        try:
+            available = bool(service.refresh_availability())
+        except Exception as e:
+            available, error = False, str(e)
+        latency_ms = (time.perf_counter() - start) * 1000
+
+        with self._lock:
+            health = self._health.setdefault(name, ProviderHealth())
+        health.record(available, latency_ms, error)
+        log_metric("llm_probe_ms", latency_ms, {"provider": name, "available": available})
+
+        if available != was_available:
+            if available:
+                logger.info(f"LLM provider {name} is available again")
+            else:
+                logger.warning(f"LLM provider {name} became unavailable")
+
+    def get_stats(self) -> dict:
+        """
+        Get the cached health of every watched provider (no network call).
+
+        probe_* latencies time the availability probes only; "generation"
+        holds the counters and latencies of real calls when the service is
+        a provider chain (None otherwise).
+        """
+        with self._lock:
+            health = dict(self._health)
+            generation_stats = dict(self._generation_stats)
+        providers = {}
+        for name, h in health.items():
+            stats = h.get_stats()
+            generation = generation_stats.get(name)
+            stats["generation"] = generation.get_stats() if generation is not None else None
+            providers[name] = stats
+        return {
+            "interval": self.interval,
+            "running": self._thread is not None and self._thread.is_alive(),
+            "providers": providers,
+        }
+
+
+def _name(service: Any) -> str:
+    """Provider/model name of a service."""
+    return f"{service.provider}/{service.model}"
+
+
+# Global monitor instance
+_llm_health_monitor: LLMHealthMonitor | None = None
+
+
+def get_llm_health_monitor() -> LLMHealthMonitor:
+    """
+    Get the global LLM health monitor configured from settings.
+
+    Returns:
+        LLMHealthMonitor instance
+    """
+    global _llm_health_monitor
+    if _llm_health_monitor is None:
+        _llm_health_monitor = LLMHealthMonitor(interval=settings.LLM_HEALTH_CHECK_INTERVAL)
+    return _llm_health_monitor
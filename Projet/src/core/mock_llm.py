@@ -0,0 +1,106 @@
+"""
+Mock LLM - Professional Reddit RAG Chatbot
+Deterministic offline stand-in for an LLM provider, with a configurable
+latency profile (time to first token, tokens/sec) and error rate, so the
+LLM mode can be benchmarked and tested without Ollama or an API key
+"""
+
+import asyncio
+import itertools
+import random
+import re
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator
+
+
+_WORD_RE = re.compile(r"\S+")
+
+
+class MockLLMError(RuntimeError):
+    """Simulated provider failure."""
+
+
+class MockLLM:
+    """
+    Fake LLM answering from its input.
+
+    The same query and context always give the same text. Failures are drawn
+    from a seeded generator, so a run with a given seed fails on the same calls.
+    """
+
+    def __init__(
+        self,
+        ttft_ms: float = 200.0,
+        tokens_per_sec: float = 50.0,
+        error_rate: float = 0.0,
+        response_tokens: int = 60,
+        seed: int = 0,
+    ):
+        """
+        Initialize the mock.
+
+        Args:
+            ttft_ms: Delay before the first token (prefill).
+            tokens_per_sec: Decode speed after the first token (0 = instant).
+            error_rate: Fraction of calls that fail before the first token.
+            response_tokens: Tokens per answer (capped by max_tokens).
+            seed: Seed of the failure draws.
+        """
+        self.ttft_ms = ttft_ms
+        self.tokens_per_sec = tokens_per_sec
+        self.error_rate = error_rate
+        self.response_tokens = response_tokens
+
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def tokens(self, query: str, context: str, max_tokens: int) -> list[str]:
+        """Deterministic answer tokens for a prompt."""
+        words = _WORD_RE.findall(f"Here is what Reddit users said about: {query}")
+        # Answers quote the context, so longer contexts give other answers
+        words += _WORD_RE.findall(context)
+        n = min(self.response_tokens, max_tokens)
+        tokens = [f"{word} " for word in itertools.islice(itertools.cycle(words), n)]
+        if tokens:
+            tokens[-1] = tokens[-1].rstrip()
+        return tokens
+
+    def stream(self, query: str, context: str, max_tokens: int) -> Iterator[str]:
+        """Yield answer tokens at the configured pace."""
+        fails = self._draw_failure()
+        time.sleep(self.ttft_ms / 1000)
+        if fails:
+            raise MockLLMError("Simulated LLM failure")
+
+        for i, token in enumerate(self.tokens(query, context, max_tokens)):
+            if i and self.tokens_per_sec > 0:
+                time.sleep(1 / self.tokens_per_sec)
+            yield token
+
+    async def astream(self, query: str, context: str, max_tokens: int) -> AsyncIterator[str]:
+        """Async counterpart of stream."""
+        fails = self._draw_failure()
+        await asyncio.sleep(self.ttft_ms / 1000)
+        if fails:
+            raise MockLLMError("Simulated LLM failure")
+
+        for i, token in enumerate(self.tokens(query, context, max_tokens)):
+            if i and self.tokens_per_sec > 0:
+                await asyncio.sleep(1 / self.tokens_per_sec)
+            yield token
+
+    def generate(self, query: str, context: str, max_tokens: int) -> str:
+        """Full answer, after the time the stream would take."""
+        return "".join(self.stream(query, context, max_tokens))
+
+    async def agenerate(self, query: str, context: str, max_tokens: int) -> str:
+        """Async counterpart of generate."""
+        return "".join([token async for token in self.astream(query, context, max_tokens)])
+
+    def _draw_failure(self) -> bool:
+        """Whether the next call fails."""
+        if self.error_rate <= 0:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
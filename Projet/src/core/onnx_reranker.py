@@ -0,0 +1,162 @@
+"""
+ONNX Runtime backend for the cross-encoder reranker.
+Exports the HuggingFace model to ONNX, quantizes it to int8 and serves
+it behind the predict() API of sentence-transformers' CrossEncoder.
+"""
+
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+
+FP32_MODEL_FILE = "model.onnx"
+INT8_MODEL_FILE = "model_int8.onnx"
+
+# Positional order of BERT-style forward() arguments
+_INPUT_NAMES = ("input_ids", "attention_mask", "token_type_ids")
+
+
+class OnnxCrossEncoder:
+    """
+    Cross-encoder running on ONNX Runtime (CPU).
+    Drop-in replacement for CrossEncoder.predict in RerankerService.
+    """
+
+    def __init__(
+        self,
+        model_dir: str | Path,
+        quantized: bool = True,
+        max_length: int = 512,
+        num_threads: int | None = None,
+    ):
+        """
+        Load an exported model.
+
+        Args:
+            model_dir: Directory written by export_onnx (model + tokenizer).
+            quantized: Prefer the int8 model when it exists.
+            max_length: Max tokens per (query, document) pair.
+            num_threads: Intra-op threads (None lets ONNX Runtime decide).
+        """
+        import onnxruntime as ort
+        from transformers import AutoTokenizer
+
+        self.model_dir = Path(model_dir)
+        self.max_length = max_length
+
+        model_path = self.model_dir / INT8_MODEL_FILE
+        if not quantized or not model_path.exists():
+            model_path = self.model_dir / FP32_MODEL_FILE
+        if not model_path.exists():
+            raise FileNotFoundError(f"No ONNX model in {self.model_dir} (run the export first)")
+
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        self.session = ort.InferenceSession(
+            str(model_path), options, providers=["CPUExecutionProvider"]
+        )
+        self.model_path = model_path
+        self._input_names = {i.name for i in self.session.get_inputs()}
+
+        logger.info(f"ONNX reranker loaded: {model_path}")
+
+    def predict(
+        self,
+        pairs: list[list[str]],
+        batch_size: int = 32,
+        **kwargs,
+    ) -> np.ndarray:
+        """
+        Score (query, document) pairs.
+
+        Args:
+            pairs: List of [query, document] pairs.
+            batch_size: Pairs per inference call.
+
+        Returns:
+            Relevance scores (sigmoid of the logit, like CrossEncoder).
+        """
+        scores = []
+        for start in range(0, len(pairs), batch_size):
+            batch = pairs[start : start + batch_size]
+            features = self.tokenizer(
+                [query for query, _ in batch],
+                [document for _, document in batch],
+                padding=True,
+                truncation="longest_first",
+                max_length=self.max_length,
+                return_tensors="np",
+            )
+            inputs = {
+                name: value.astype(np.int64)
+                for name, value in features.items()
+                if name in self._input_names
+            }
+            logits = self.session.run(None, inputs)[0]
+            scores.append(logits[:, 0] if logits.ndim == 2 else logits)
+
+        if not scores:
+            return np.array([], dtype=np.float32)
+        return 1.0 / (1.0 + np.exp(-np.concatenate(scores)))
+
+
+def export_onnx(
+    model_name: str,
+    output_dir: str | Path,
+    quantize: bool = True,
+    opset: int = 17,
+) -> Path:
+    """
+    Export a HuggingFace cross-encoder to ONNX, optionally quantized to int8.
+
+    Args:
+        model_name: HuggingFace model name.
+        output_dir: Directory for the model files and tokenizer.
+        quantize: Also write a dynamically quantized int8 model.
+        opset: ONNX opset version.
+
+    Returns:
+        Path of the model to serve (int8 if quantized).
+    """
+    import torch
+    from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name)
+    model = AutoModelForSequenceClassification.from_pretrained(model_name).eval()
+
+    dummy = tokenizer(["query"], ["document"], return_tensors="pt")
+    input_names = [name for name in _INPUT_NAMES if name in dummy]
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names}
+    dynamic_axes["logits"] = {0: "batch"}
+
+    fp32_path = output_dir / FP32_MODEL_FILE
+    with torch.no_grad():
+        torch.onnx.export(
+            model,
+            tuple(dummy[name] for name in input_names),
+            str(fp32_path),
+            input_names=input_names,
+            output_names=["logits"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset,
+            dynamo=False,
+        )
+    tokenizer.save_pretrained(output_dir)
+    logger.info(f"Exported {model_name} to {fp32_path}")
+
+    if not quantize:
+        return fp32_path
+
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    int8_path = output_dir / INT8_MODEL_FILE
+    quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+    logger.info(f"Quantized model written to {int8_path}")
+    return int8_path
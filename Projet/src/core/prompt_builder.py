@@ -0,0 +1,255 @@
+"""
+Prompt Builder - Professional Reddit RAG Chatbot
+Fits LLM prompt parts into an input-token budget, by priority, cutting
+at sentence boundaries
+"""
+
+import bisect
+import math
+import re
+from dataclasses import dataclass, field
+
+from src.config.logging_config import get_logger
+from src.models.schemas import ChatMessage
+
+
+logger = get_logger(__name__)
+
+# Cut points: after sentence-ending punctuation (and the whitespace following it)
+_SENTENCE_END_RE = re.compile(r"[.!?…]+[\"')\]]*\s+")
+_WORD_END_RE = re.compile(r"\s+")
+
+
+def history_window(history: list[ChatMessage] | None, max_messages: int) -> list[ChatMessage]:
+    """
+    Recent history messages, from a start that moves max_messages at a time.
+
+    A plain last-N window drops its oldest message every turn, so the next
+    prompt shares nothing with the previous one past the system prompt and
+    the LLM server prefills the whole history again. An anchored window keeps
+    the same first message for several turns, at the cost of passing up to
+    2 * max_messages - 1 messages.
+    """
+    history = history or []
+    if max_messages <= 0:
+        return []
+    start = max(0, len(history) - max_messages) // max_messages * max_messages
+    return history[start:]
+
+
+class TokenCounter:
+    """
+    Counts prompt tokens.
+
+    Uses a HuggingFace tokenizer when one is configured and loadable,
+    otherwise a characters-per-token estimate.
+    """
+
+    def __init__(self, tokenizer_name: str | None = None, chars_per_token: float = 3.5):
+        """
+        Initialize the counter.
+
+        Args:
+            tokenizer_name: HuggingFace tokenizer matching the LLM (None = estimate).
+            chars_per_token: Characters per token for the estimate (low = conservative).
+        """
+        self.chars_per_token = chars_per_token
+        self._tokenizer = None
+
+        if tokenizer_name:
+            try:
+                from transformers import AutoTokenizer
+
+                self._tokenizer = AutoTokenizer.from_pretrained(tokenizer_name)
+                logger.info(f"Prompt tokenizer loaded: {tokenizer_name}")
+            except Exception as e:
+                logger.warning(f"Prompt tokenizer {tokenizer_name} unavailable, estimating: {e}")
+
+    @property
+    def exact(self) -> bool:
+        """Whether counts come from a real tokenizer."""
+        return self._tokenizer is not None
+
+    def count(self, text: str) -> int:
+        """Number of tokens in text."""
+        if not text:
+            return 0
+        if self._tokenizer is not None:
+            return len(self._tokenizer.encode(text, add_special_tokens=False))
+        return math.ceil(len(text) / self.chars_per_token)
+
+
+@dataclass
+class BuiltPrompt:
+    """Prompt parts that fit the budget, with their token counts."""
+
+    query: str
+    examples: list[str]
+    memory: str
+    history: list[ChatMessage]
+    tokens: dict[str, int] = field(default_factory=dict)
+    truncated: list[str] = field(default_factory=list)
+
+    def to_dict(self) -> dict:
+        """Token accounting for response metadata."""
+        return {"tokens": dict(self.tokens), "truncated": list(self.truncated)}
+
+
+class PromptBuilder:
+    """
+    Allocates an input-token budget across prompt parts by priority.
+
+    The system prompt is always kept. Then, in order: the query, the best
+    retrieved example, the conversation memory, the other examples, and
+    finally recent history messages. A part that does not fit whole is cut
+    at a sentence boundary (memory keeps its most recent sentences); history
+    messages are kept or dropped whole, newest first, from an anchored
+    window (see history_window).
+    """
+
+    def __init__(
+        self,
+        counter: TokenCounter,
+        max_input_tokens: int = 2000,
+        reserved_tokens: int = 64,
+        max_history: int = 5,
+    ):
+        """
+        Initialize the builder.
+
+        Args:
+            counter: Token counter.
+            max_input_tokens: Budget for the whole prompt.
+            reserved_tokens: Tokens kept for templates and chat formatting.
+            max_history: Max history messages passed to the LLM.
+        """
+        self.counter = counter
+        self.max_input_tokens = max_input_tokens
+        self.reserved_tokens = reserved_tokens
+        self.max_history = max_history
+
+    def build(
+        self,
+        system: str,
+        query: str,
+        examples: list[str],
+        memory: str = "",
+        history: list[ChatMessage] | None = None,
+    ) -> BuiltPrompt:
+        """
+        Fit prompt parts into the budget.
+
+        Args:
+            system: System prompt (never cut).
+            query: User query.
+            examples: Formatted retrieved examples, best first.
+            memory: Conversation memory (summary and recent messages).
+            history: Client-provided history, oldest first.
+
+        Returns:
+            BuiltPrompt with the kept parts and per-part token counts.
+        """
+        count = self.counter.count
+        budget = self.max_input_tokens - self.reserved_tokens
+        tokens = {"system": count(system)}
+        remaining = budget - tokens["system"]
+        truncated: list[str] = []
+
+        def take(name: str, text: str, keep_end: bool = False, words: bool = True) -> str:
+            nonlocal remaining
+            fitted = self.fit(text, remaining, keep_end=keep_end, words=words)
+            if fitted != text:
+                truncated.append(name)
+            used = count(fitted)
+            tokens[name] = tokens.get(name, 0) + used
+            remaining -= used
+            return fitted
+
+        query = take("query", query)
+
+        kept_examples = []
+        memory_text = ""
+        for i, example in enumerate(examples):
+            # A Q/A pair cut mid-sentence is noise: examples are cut between sentences only
+            fitted = take("examples", example, words=False)
+            if fitted:
+                kept_examples.append(fitted)
+            # Memory ranks right after the best example
+            if i == 0:
+                memory_text = take("memory", memory, keep_end=True)
+        if not examples:
+            memory_text = take("memory", memory, keep_end=True)
+
+        kept_history: list[ChatMessage] = []
+        tokens["history"] = 0
+        for message in reversed(history_window(history, self.max_history)):
+            used = count(message.content) + 4  # role and separators
+            if used > remaining:
+                truncated.append("history")
+                break
+            kept_history.insert(0, message)
+            tokens["history"] += used
+            remaining -= used
+
+        tokens.setdefault("examples", 0)
+        tokens["total"] = budget - remaining + self.reserved_tokens
+        tokens["budget"] = self.max_input_tokens
+
+        return BuiltPrompt(
+            query=query,
+            examples=kept_examples,
+            memory=memory_text,
+            history=kept_history,
+            tokens=tokens,
+            truncated=sorted(set(truncated)),
+        )
+
+    def fit(self, text: str, max_tokens: int, keep_end: bool = False, words: bool = True) -> str:
+        """
+        Longest head (or tail) of text within max_tokens, cut between sentences.
+
+        Args:
+            text: Text to fit.
+            max_tokens: Token limit.
+            keep_end: Keep the end of the text instead of its beginning.
+            words: Cut between words when even one sentence is too long.
+
+        Returns:
+            The text itself if it fits, a cut version, or "" if nothing fits.
+        """
+        if not text or max_tokens <= 0:
+            return ""
+        if self.counter.count(text) <= max_tokens:
+            return text
+
+        for pattern in (_SENTENCE_END_RE, _WORD_END_RE) if words else (_SENTENCE_END_RE,):
+            fitted = self._fit_at(text, max_tokens, pattern, keep_end)
+            if fitted:
+                return fitted
+        return ""
+
+    def _fit_at(self, text: str, max_tokens: int, pattern: re.Pattern, keep_end: bool) -> str:
+        """Longest piece cut at pattern matches that fits (binary search on cut points)."""
+        matches = list(pattern.finditer(text))
+        if keep_end:
+            # Tails starting after each separator, shortest first
+            pieces = [text[m.end() :] for m in reversed(matches)]
+        else:
+            # Heads ending at each separator, shortest first
+            pieces = [text[: m.end()].rstrip() for m in matches]
+        pieces = [piece for piece in pieces if piece.strip()]
+        if not pieces:
+            return ""
+
+        # Token counts grow with piece length: find the last piece that fits
+        fits = bisect.bisect_right(
+            range(len(pieces)), 0, key=lambda i: int(self.counter.count(pieces[i]) > max_tokens)
+        )
+        return pieces[fits - 1] if fits else ""
+
+    def get_stats(self) -> dict:
+        """Get builder configuration."""
+        return {
+            "max_input_tokens": self.max_input_tokens,
+            "exact_token_counts": self.counter.exact,
+        }
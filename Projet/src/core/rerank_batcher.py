@@ -0,0 +1,199 @@
+"""
+Cross-request micro-batching for the cross-encoder.
+Gathers (query, document) pairs from concurrent requests for a short window
+and scores them in a single forward pass.
+"""
+
+import contextlib
+import queue
+import threading
+import time
+from collections.abc import Callable
+from concurrent.futures import Future
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from loguru import logger
+
+
+class RerankQueueFull(RuntimeError):
+    """Raised when the batcher queue is at capacity."""
+
+
+class RerankBatcher:
+    """
+    Batching scheduler in front of a predict function.
+
+    Requests submit their pairs and block on a future; a worker thread drains
+    the queue for up to max_wait_ms (or until max_batch_pairs pairs are
+    gathered), runs one predict call and hands each request its own scores.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[list[list[str]]], list[float]],
+        max_batch_pairs: int = 128,
+        max_wait_ms: float = 5.0,
+        max_queue: int = 64,
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            predict_fn: Scores a list of pairs, returning scores in the same order.
+            max_batch_pairs: Max pairs per forward pass.
+            max_wait_ms: How long to wait for more requests once one is queued.
+            max_queue: Max requests waiting (submit fails fast beyond it).
+        """
+        self.predict_fn = predict_fn
+        self.max_batch_pairs = max_batch_pairs
+        self.max_wait = max_wait_ms / 1000
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+
+        self._worker: threading.Thread | None = None
+        self._start_lock = threading.Lock()
+        self._closed = False
+
+        # Stats
+        self._batches = 0
+        self._requests = 0
+        self._pairs = 0
+        self._rejected = 0
+        self._expired = 0
+
+    def submit(
+        self,
+        pairs: list[list[str]],
+        timeout: float | None = None,
+        on_late: Callable[[list[float]], None] | None = None,
+    ) -> list[float]:
+        """
+        Score pairs as part of the next batch.
+
+        Args:
+            pairs: (query, document) pairs of one request.
+            timeout: Seconds this request may wait for its scores (None = no deadline).
+            on_late: Called with the scores when the request timed out while
+                its batch was already being scored (e.g. to cache them).
+
+        Returns:
+            Scores in the order of pairs.
+
+        Raises:
+            RerankQueueFull: If too many requests are already waiting.
+            TimeoutError: If the deadline passed before the scores were ready.
+        """
+        if not pairs:
+            return []
+        self._ensure_worker()
+
+        future: Future = Future()
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        try:
+            self._queue.put_nowait((pairs, future, deadline))
+        except queue.Full:
+            self._rejected += 1
+            raise RerankQueueFull("Rerank queue is full") from None
+
+        try:
+            return future.result(timeout=timeout)
+        except FutureTimeoutError:
+            # A running batch cannot be cancelled: its scores may still be kept
+            if not future.cancel() and on_late is not None:
+                future.add_done_callback(
+                    lambda done: on_late(done.result()) if done.exception() is None else None
+                )
+            raise TimeoutError("Rerank deadline exceeded") from None
+
+    def _ensure_worker(self) -> None:
+        """Start the worker thread on first use."""
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._closed = False
+                self._worker = threading.Thread(
+                    target=self._run, name="rerank-batcher", daemon=True
+                )
+                self._worker.start()
+
+    def _run(self) -> None:
+        """Worker loop: gather a batch, score it, dispatch the results."""
+        while not self._closed:
+            try:
+                first = self._queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if first is None:
+                break
+            self._process(self._gather(first))
+
+    def _gather(self, first: tuple) -> list[tuple]:
+        """Collect requests until the window closes or the batch is full."""
+        batch = [first]
+        n_pairs = len(first[0])
+        window_end = time.monotonic() + self.max_wait
+
+        while n_pairs < self.max_batch_pairs:
+            remaining = window_end - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._closed = True
+                break
+            batch.append(item)
+            n_pairs += len(item[0])
+
+        return batch
+
+    def _process(self, batch: list[tuple]) -> None:
+        """Score live requests of a batch in one call."""
+        now = time.monotonic()
+        live = []
+        for pairs, future, deadline in batch:
+            if deadline is not None and now > deadline:
+                self._expired += 1
+                future.cancel()
+            elif future.set_running_or_notify_cancel():
+                live.append((pairs, future))
+        if not live:
+            return
+
+        all_pairs = [pair for pairs, _ in live for pair in pairs]
+        try:
+            scores = self.predict_fn(all_pairs)
+        except Exception as e:
+            logger.error(f"Batched rerank failed: {e}")
+            for _, future in live:
+                future.set_exception(e)
+            return
+
+        self._batches += 1
+        self._requests += len(live)
+        self._pairs += len(all_pairs)
+
+        offset = 0
+        for pairs, future in live:
+            future.set_result(list(scores[offset : offset + len(pairs)]))
+            offset += len(pairs)
+
+    def close(self) -> None:
+        """Stop the worker thread."""
+        self._closed = True
+        with contextlib.suppress(queue.Full):
+            self._queue.put_nowait(None)
+
+    def get_stats(self) -> dict:
+        """Get batching statistics."""
+        return {
+            "batches": self._batches,
+            "requests": self._requests,
+            "pairs": self._pairs,
+            "requests_per_batch": round(self._requests / self._batches, 2) if self._batches else 0,
+            "queue_depth": self._queue.qsize(),
+            "rejected": self._rejected,
+            "expired": self._expired,
+        }
@@ -3,11 +3,84 @@ Reranking Module for improved search relevance.
 Uses cross-encoder models to rerank search results.
 """
 
+import math
+import re
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+
+import numpy as np
 from loguru import logger
 
+from src.config.logging_config import log_metric
+from src.core.cache import CacheService, InMemoryCache, make_cache_key, normalize_query
+from src.core.rerank_batcher import RerankBatcher, RerankQueueFull
 from src.models.schemas import SearchResult
 
 
+# Upper bound on characters per token, used to cut long documents before
+# tokenization (the tokenizer then truncates to the exact token budget)
+_MAX_CHARS_PER_TOKEN = 8
+
+# Words shorter than this are ignored by the lexical first-stage scorer
+_MIN_TERM_LENGTH = 3
+_TERM_RE = re.compile(r"\w+")
+
+# Reciprocal rank fusion constant
+RRF_K = 60
+
+
+def _terms(text: str) -> set[str]:
+    """Lowercased word set used for lexical overlap."""
+    return {term for term in _TERM_RE.findall(text.casefold()) if len(term) >= _MIN_TERM_LENGTH}
+
+
+class LexicalDenseScorer:
+    """
+    Cheap first-stage scorer for the rerank cascade.
+
+    Blends the min-max normalized dense similarity with the fraction of query
+    terms found in the conversation context. No model call, so it can prune a
+    wide candidate pool before the cross-encoder.
+    """
+
+    def __init__(self, dense_weight: float = 0.5):
+        """
+        Initialize the scorer.
+
+        Args:
+            dense_weight: Weight of the dense score (the rest goes to term coverage).
+        """
+        self.dense_weight = dense_weight
+
+    def score(self, query: str, results: list[SearchResult]) -> list[float]:
+        """
+        Score candidates for pruning.
+
+        Args:
+            query: The search query.
+            results: Dense search results.
+
+        Returns:
+            First-stage scores in the order of results (higher is better).
+        """
+        query_terms = _terms(query)
+        dense = [result.score for result in results]
+        low, high = min(dense), max(dense)
+
+        scores = []
+        for result in results:
+            dense_norm = (result.score - low) / (high - low) if high > low else 0.5
+            coverage = (
+                len(query_terms & _terms(result.conversation.context)) / len(query_terms)
+                if query_terms
+                else 0.0
+            )
+            scores.append(self.dense_weight * dense_norm + (1 - self.dense_weight) * coverage)
+        return scores
+
+
 class RerankerService:
     """
     Service for reranking search results using cross-encoder models.
@@ -21,6 +94,20 @@ class RerankerService:
         model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
         device: str = "cpu",
         batch_size: int = 32,
+        *,
+        score_cache_size: int = 50000,
+        score_cache_ttl: int = 3600,
+        backend: str = "torch",
+        onnx_path: str | None = None,
+        max_length: int = 256,
+        micro_batching: bool = False,
+        batch_window_ms: float = 2.0,
+        max_batch_pairs: int = 128,
+        max_queue: int = 64,
+        queue_timeout: float | None = 2.0,
+        cascade_keep: int = 0,
+        cascade_dense_weight: float = 0.5,
+        deadline_ms: float = 0,
     ):
         """
         Initialize the reranker service.
@@ -29,22 +116,93 @@ class RerankerService:
             model_name: HuggingFace model name for cross-encoder.
             device: Device to run model on (cpu/cuda).
             batch_size: Batch size for inference.
+            score_cache_size: Max cached (query, conversation) scores (0 disables).
+            score_cache_ttl: Score cache TTL in seconds.
+            backend: "torch" (sentence-transformers) or "onnx" (int8 ONNX Runtime).
+            onnx_path: Directory of the exported ONNX model (onnx backend).
+            max_length: Token budget per (query, document) pair.
+            micro_batching: Merge pairs of concurrent requests into shared forward passes.
+            batch_window_ms: How long the batcher waits for more requests.
+            max_batch_pairs: Max pairs per batched forward pass.
+            max_queue: Max requests waiting for the batcher (beyond it, score inline).
+            queue_timeout: Seconds a request waits for batched scores.
+            cascade_keep: Candidates kept by the first-stage scorer for the
+                cross-encoder (0 disables the cascade).
+            cascade_dense_weight: Dense score weight of the first-stage scorer.
+            deadline_ms: Default per-request rerank budget in milliseconds (0 disables).
         """
         self.model_name = model_name
         self.device = device
         self.batch_size = batch_size
+        self.max_length = max_length
+        self.backend = backend
+        self.onnx_path = onnx_path
         self.model = None
 
+        # Raw cross-encoder scores keyed on (normalized query, conversation id),
+        # so popular and near-repeated queries skip most of the model calls
+        self.score_cache = CacheService(
+            backend=InMemoryCache(max_size=max(score_cache_size, 1), default_ttl=score_cache_ttl),
+            enabled=score_cache_size > 0,
+        )
+        self.pairs_scored = 0
+
+        # Model call timings (see get_stats)
+        self._timing_lock = threading.Lock()
+        self._predict_calls = 0
+        self._predict_ms = 0.0
+        self.last_predict: dict = {}
+
+        # Cascade: a cheap first stage prunes wide candidate pools
+        self.cascade_keep = cascade_keep
+        self.first_stage = LexicalDenseScorer(cascade_dense_weight) if cascade_keep else None
+        self.pairs_pruned = 0
+
+        # Latency budget
+        self.deadline_ms = deadline_ms
+        self.deadline_hits = 0
+        self.queue_timeouts = 0
+        self._ms_per_pair: float | None = None  # moving average, sizes batches to the budget
+
+        # Cross-request micro-batching
+        self.queue_timeout = queue_timeout
+        self.batcher = (
+            RerankBatcher(
+                self._predict_now,
+                max_batch_pairs=max_batch_pairs,
+                max_wait_ms=batch_window_ms,
+                max_queue=max_queue,
+            )
+            if micro_batching
+            else None
+        )
+
         self._load_model()
 
     def _load_model(self) -> None:
         """Load the cross-encoder model."""
+        if self.backend == "onnx":
+            try:
+                from src.core.onnx_reranker import OnnxCrossEncoder
+
+                self.model = OnnxCrossEncoder(self.onnx_path, max_length=self.max_length)
+                return
+            except ImportError:
+                logger.warning(
+                    "onnxruntime not installed, falling back to torch reranker. "
+                    "Install with: pip install onnxruntime"
+                )
+            except Exception as e:
+                logger.warning(f"Failed to load ONNX reranker ({e}), falling back to torch")
+            self.backend = "torch"
+
         try:
             from sentence_transformers import CrossEncoder
 
             self.model = CrossEncoder(
                 self.model_name,
                 device=self.device,
+                max_length=self.max_length,
             )
             logger.info(f"Reranker model loaded: {self.model_name}")
         except ImportError:
@@ -74,22 +232,71 @@ class RerankerService:
         Returns:
             Reranked list of search results.
         """
+        reranked, _ = self.rerank_with_info(query, results, top_k=top_k)
+        return reranked
+
+    def rerank_with_info(
+        self,
+        query: str,
+        results: list[SearchResult],
+        top_k: int | None = None,
+        deadline_ms: float | None = None,
+    ) -> tuple[list[SearchResult], dict]:
+        """
+        Rerank search results within a latency budget.
+
+        Args:
+            query: The search query.
+            results: List of search results to rerank.
+            top_k: Number of top results to return (None for all).
+            deadline_ms: Rerank budget in milliseconds (None uses the service
+                default, 0 disables it).
+
+        Returns:
+            Tuple of (results, info). info["outcome"] is "reranked", "deadline"
+            (dense order kept, the scores computed so far are cached), "timeout"
+            (the micro-batcher did not answer within queue_timeout; dense order
+            kept), "unavailable" or "error".
+        """
+        start = time.perf_counter()
+        deadline_ms = self.deadline_ms if deadline_ms is None else deadline_ms
+        deadline = time.monotonic() + deadline_ms / 1000 if deadline_ms else None
+
+        def info(outcome: str, scored: int = 0) -> dict:
+            return {
+                "outcome": outcome,
+                "scored": scored,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            }
+
         if not results:
-            return results
+            return results, info("reranked")
 
         if self.model is None:
             logger.warning("Reranker model not available, returning original results")
-            return results
+            return results, info("unavailable")
 
         try:
-            # Prepare query-document pairs
-            pairs = [[query, result.conversation.context] for result in results]
-
-            # Get cross-encoder scores
-            scores = self.model.predict(pairs, batch_size=self.batch_size)
+            # Prune a wide pool with the cheap first stage
+            candidates = self._prune(query, results)
+
+            # Get cross-encoder scores (only for pairs missing from the cache)
+            scores = self._score(query, candidates, deadline)
+            n_scored = sum(score is not None for score in scores)
+
+            if n_scored < len(scores):
+                # Out of budget: keep the dense order rather than mixing scored
+                # and unscored candidates
+                self.deadline_hits += 1
+                log_metric("rerank_deadline_hit", 1)
+                logger.warning(
+                    f"Rerank deadline of {deadline_ms:.0f}ms hit "
+                    f"({n_scored}/{len(scores)} pairs scored), keeping dense order"
+                )
+                dense_order = results[:top_k] if top_k is not None else results
+                return dense_order, info("deadline", n_scored)
 
             # Normalize scores to 0-1 for display/consistency
-            scores = [float(s) for s in scores]
             min_score = min(scores)
             max_score = max(scores)
             if max_score > min_score:
@@ -99,7 +306,7 @@ class RerankerService:
                 norm_scores = [0.5 for _ in scores]
 
             # Combine results with new scores
-            scored_results = list(zip(results, norm_scores))
+            scored_results = list(zip(candidates, norm_scores))
 
             # Sort by cross-encoder score (higher is better)
             scored_results.sort(key=lambda x: x[1], reverse=True)
@@ -119,13 +326,190 @@ class RerankerService:
             if top_k is not None:
                 reranked = reranked[:top_k]
 
-            logger.debug(f"Reranked {len(results)} results, returning top {len(reranked)}")
-            return reranked
+            logger.debug(f"Reranked {len(candidates)} results, returning top {len(reranked)}")
+            return reranked, info("reranked", n_scored)
+
+        except TimeoutError:
+            self.queue_timeouts += 1
+            log_metric("rerank_queue_timeout", 1)
+            logger.warning(
+                f"No batched rerank scores within {self.queue_timeout}s, keeping dense order"
+            )
+            return (results[:top_k] if top_k is not None else results), info("timeout")
 
         except Exception as e:
             logger.error(f"Reranking failed: {e}")
+            return results, info("error")
+
+    def _prune(self, query: str, results: list[SearchResult]) -> list[SearchResult]:
+        """Keep the cascade_keep best candidates according to the first-stage scorer."""
+        if self.first_stage is None or len(results) <= self.cascade_keep:
             return results
 
+        scores = self.first_stage.score(query, results)
+        order = sorted(range(len(results)), key=lambda i: scores[i], reverse=True)
+        self.pairs_pruned += len(results) - self.cascade_keep
+        return [results[i] for i in order[: self.cascade_keep]]
+
+    def _score(
+        self,
+        query: str,
+        results: list[SearchResult],
+        deadline: float | None = None,
+    ) -> list[float | None]:
+        """
+        Score query-document pairs, reusing cached raw scores when available.
+
+        Pairs left unscored when the deadline (time.monotonic()) passes are None.
+        """
+        normalized = normalize_query(query)
+        keys = [
+            make_cache_key(
+                self.model_name, self.backend, self.max_length, normalized, result.conversation.id
+            )
+            for result in results
+        ]
+        scores: list[float | None] = [self.score_cache.get(key) for key in keys]
+
+        missing = [i for i, score in enumerate(scores) if score is None]
+        if missing:
+
+            def cache_late(late: list[float]) -> None:
+                for i, score in zip(missing, late):
+                    self.score_cache.set(keys[i], score)
+
+            predicted = self._predict(
+                [[query, results[i].conversation.context] for i in missing], deadline, cache_late
+            )
+            for i, score in zip(missing, predicted):
+                if score is not None:
+                    scores[i] = score
+                    self.score_cache.set(keys[i], score)
+                    self.pairs_scored += 1
+
+        return scores
+
+    def _predict(
+        self,
+        pairs: list[list[str]],
+        deadline: float | None = None,
+        on_late: Callable[[list[float]], None] | None = None,
+    ) -> list[float | None]:
+        """
+        Score pairs, through the micro-batcher when enabled.
+
+        Pairs the batcher did not score before the deadline are None. A wait
+        cut short by queue_timeout instead raises TimeoutError; scores of a
+        batch that was already running are then passed to on_late.
+        """
+        if self.batcher is None:
+            return self._predict_now(pairs, deadline)
+
+        timeout = self.queue_timeout
+        if deadline is not None:
+            remaining = max(deadline - time.monotonic(), 0.0)
+            timeout = remaining if timeout is None else min(timeout, remaining)
+
+        try:
+            return self.batcher.submit(pairs, timeout=timeout, on_late=on_late)
+        except RerankQueueFull:
+            logger.debug("Rerank queue full, scoring inline")
+            return self._predict_now(pairs, deadline)
+        except TimeoutError:
+            if deadline is not None and time.monotonic() >= deadline:
+                return [None] * len(pairs)
+            raise
+
+    def _predict_now(
+        self, pairs: list[list[str]], deadline: float | None = None
+    ) -> list[float | None]:
+        """
+        Score pairs in length-sorted batches and return scores in input order.
+
+        Documents are cut to the token budget and pairs sorted by length so each
+        batch pads to similar lengths instead of to the longest Reddit thread.
+        With a deadline, each batch is shrunk to what the remaining budget fits
+        at the observed cost per pair; pairs not scored in time are left as
+        None. A batch cannot be interrupted, so the very first call (no cost
+        observed yet) may still overrun.
+        """
+        max_chars = self.max_length * _MAX_CHARS_PER_TOKEN
+        pairs = [[query, document[:max_chars]] for query, document in pairs]
+        order = sorted(range(len(pairs)), key=lambda i: len(pairs[i][0]) + len(pairs[i][1]))
+
+        scores: list[float | None] = [None] * len(pairs)
+        batches = 0
+        offset = 0
+        start = time.perf_counter()
+        while offset < len(order):
+            size = self._batch_budget(deadline)
+            if size == 0:
+                break
+            batch = order[offset : offset + size]
+            batch_start = time.perf_counter()
+            batch_scores = self.model.predict([pairs[i] for i in batch], batch_size=len(batch))
+            self._observe_cost(len(batch), (time.perf_counter() - batch_start) * 1000)
+            for i, score in zip(batch, batch_scores):
+                scores[i] = float(score)
+            batches += 1
+            offset += len(batch)
+        duration = (time.perf_counter() - start) * 1000
+
+        with self._timing_lock:
+            self._predict_calls += 1
+            self._predict_ms += duration
+            self.last_predict = {
+                "pairs": len(pairs),
+                "batches": batches,
+                "duration_ms": round(duration, 2),
+            }
+        return scores
+
+    def _batch_budget(self, deadline: float | None) -> int:
+        """Pairs the next batch may hold (0 once the budget is spent)."""
+        if deadline is None:
+            return self.batch_size
+        remaining_ms = (deadline - time.monotonic()) * 1000
+        if remaining_ms <= 0:
+            return 0
+        if self._ms_per_pair is None:
+            return self.batch_size
+        return min(self.batch_size, int(remaining_ms / self._ms_per_pair))
+
+    def _observe_cost(self, n_pairs: int, duration_ms: float) -> None:
+        """Update the moving average of the model cost per pair."""
+        per_pair = duration_ms / n_pairs
+        with self._timing_lock:
+            if self._ms_per_pair is None:
+                self._ms_per_pair = per_pair
+            else:
+                self._ms_per_pair = 0.8 * self._ms_per_pair + 0.2 * per_pair
+
+    def clear_score_cache(self) -> None:
+        """Drop cached scores (e.g. after the documents were re-indexed)."""
+        self.score_cache.clear()
+
+    def get_stats(self) -> dict:
+        """Get reranker statistics."""
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "available": self.is_available(),
+            "pairs_scored": self.pairs_scored,
+            "pairs_pruned": self.pairs_pruned,
+            "cascade_keep": self.cascade_keep,
+            "deadline_ms": self.deadline_ms,
+            "deadline_hits": self.deadline_hits,
+            "queue_timeouts": self.queue_timeouts,
+            "max_length": self.max_length,
+            "predict_calls": self._predict_calls,
+            "predict_ms_total": round(self._predict_ms, 2),
+            "predict_ms_per_pair": round(self._predict_ms / max(self.pairs_scored, 1), 3),
+            "last_predict": self.last_predict,
+            "micro_batching": self.batcher.get_stats() if self.batcher else None,
+            "score_cache": {**self.score_cache.get_stats(), **self.score_cache.backend.get_stats()},
+        }
+
     def score_pair(self, query: str, document: str) -> float:
         """
         Score a single query-document pair.
@@ -152,6 +536,128 @@ class RerankerService:
         return self.model is not None
 
 
+@dataclass
+class RerankDecision:
+    """Outcome of the adaptive rerank policy for one request."""
+
+    action: str  # "full", "shrink" or "skip"
+    n_candidates: int  # candidates sent to the cross-encoder (0 when skipped)
+    reason: str
+    margin: float = 0.0
+    entropy: float = 0.0
+    n_confident: int = 0
+
+    def to_dict(self) -> dict:
+        """Serialize for response metadata."""
+        data = asdict(self)
+        data["margin"] = round(self.margin, 4)
+        data["entropy"] = round(self.entropy, 4)
+        return data
+
+
+class RerankPolicy:
+    """
+    Decides from the dense score distribution whether the cross-encoder is worth running.
+
+    - skip: a single confident candidate, or a clear top-1 margin with a peaked
+      (low entropy) distribution - dense order is kept.
+    - shrink: only candidates within score_window of the best one are reranked.
+    - full: every candidate is reranked.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        *,
+        min_score: float = 0.5,
+        skip_margin: float = 0.1,
+        max_skip_entropy: float = 0.5,
+        score_window: float = 0.1,
+        temperature: float = 0.05,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            enabled: When False, every request gets a full rerank.
+            min_score: Dense score a candidate needs to count as confident.
+            skip_margin: Min top-1 minus top-2 score gap to skip reranking.
+            max_skip_entropy: Max normalized entropy (0-1) to skip reranking.
+            score_window: Candidates within this gap of the top score are reranked.
+            temperature: Softmax temperature for the entropy of dense scores.
+        """
+        self.enabled = enabled
+        self.min_score = min_score
+        self.skip_margin = skip_margin
+        self.max_skip_entropy = max_skip_entropy
+        self.score_window = score_window
+        self.temperature = temperature
+
+        self._decisions = {"full": 0, "shrink": 0, "skip": 0}
+
+    def decide(
+        self, scores: list[float], top_k: int | None = None, fused: bool = False
+    ) -> RerankDecision:
+        """
+        Choose how much of the candidate list to rerank.
+
+        Args:
+            scores: Dense similarity scores, in retrieval order.
+            top_k: Number of results the caller will keep.
+            fused: Scores come from rank fusion (hybrid search), not cosine
+                similarity: the thresholds do not apply and every candidate is reranked.
+
+        Returns:
+            RerankDecision (candidates are the first n_candidates results).
+        """
+        ordered = sorted(scores, reverse=True)
+        n = len(ordered)
+        top_k = top_k or n
+
+        if n <= 1:
+            decision = RerankDecision("skip", 0, "single candidate")
+        elif not self.enabled:
+            decision = RerankDecision("full", n, "policy disabled")
+        elif fused:
+            decision = RerankDecision("full", n, "fused scores")
+        else:
+            decision = self._decide(ordered, top_k)
+
+        self._decisions[decision.action] += 1
+        return decision
+
+    def _decide(self, ordered: list[float], top_k: int) -> RerankDecision:
+        """Apply the thresholds to scores sorted in descending order."""
+        n = len(ordered)
+        margin = ordered[0] - ordered[1]
+        entropy = self._normalized_entropy(ordered)
+        n_confident = sum(score >= self.min_score for score in ordered)
+        stats = {"margin": margin, "entropy": entropy, "n_confident": n_confident}
+
+        if n_confident <= 1 and margin >= self.skip_margin:
+            return RerankDecision("skip", 0, "single confident candidate", **stats)
+        if margin >= self.skip_margin and entropy <= self.max_skip_entropy:
+            return RerankDecision("skip", 0, "decisive top-1", **stats)
+
+        n_window = sum(score >= ordered[0] - self.score_window for score in ordered)
+        n_candidates = min(n, max(n_window, top_k))
+        if n_candidates < n:
+            return RerankDecision("shrink", n_candidates, "close scores at the top", **stats)
+        return RerankDecision("full", n, "flat score distribution", **stats)
+
+    def _normalized_entropy(self, scores: list[float]) -> float:
+        """Entropy of softmax(scores / temperature), scaled to 0-1."""
+        top = scores[0]
+        weights = [math.exp((score - top) / self.temperature) for score in scores]
+        total = sum(weights)
+        entropy = -sum(w / total * math.log(w / total) for w in weights if w > 0)
+        return entropy / math.log(len(scores))
+
+    def get_stats(self) -> dict:
+        """Get decision counts."""
+        return {"enabled": self.enabled, "decisions": dict(self._decisions)}
+
+
 class HybridSearchReranker:
     """
     Combines dense vector search with BM25 sparse search,
@@ -189,6 +695,9 @@ class HybridSearchReranker:
         """
         Combine dense and sparse search results using reciprocal rank fusion.
 
+        Fusion runs on id and weight arrays; only the fused order is turned
+        back into SearchResult objects.
+
         Args:
             dense_results: Results from dense vector search.
             sparse_results: Results from sparse (BM25) search.
@@ -196,46 +705,28 @@ class HybridSearchReranker:
         Returns:
             Combined and ranked results.
         """
-        k = 60  # RRF constant
-
-        # Build score maps
-        combined_scores: dict[str, float] = {}
-        result_map: dict[str, SearchResult] = {}
-
-        # Process dense results
-        for rank, result in enumerate(dense_results, 1):
-            doc_id = str(result.conversation.id)
-            rrf_score = self.dense_weight / (k + rank)
-            combined_scores[doc_id] = combined_scores.get(doc_id, 0) + rrf_score
-            result_map[doc_id] = result
-
-        # Process sparse results
-        for rank, result in enumerate(sparse_results, 1):
-            doc_id = str(result.conversation.id)
-            rrf_score = self.sparse_weight / (k + rank)
-            combined_scores[doc_id] = combined_scores.get(doc_id, 0) + rrf_score
-            if doc_id not in result_map:
-                result_map[doc_id] = result
-
-        # Sort by combined score
-        sorted_ids = sorted(
-            combined_scores.keys(),
-            key=lambda x: combined_scores[x],
-            reverse=True,
+        results = [*dense_results, *sparse_results]
+        if not results:
+            return []
+
+        ids = np.fromiter((r.conversation.id for r in results), dtype=np.int64, count=len(results))
+        weights = np.concatenate(
+            [
+                self.dense_weight / (RRF_K + np.arange(1, len(dense_results) + 1)),
+                self.sparse_weight / (RRF_K + np.arange(1, len(sparse_results) + 1)),
+            ]
         )
+        unique_ids, first, inverse = np.unique(ids, return_index=True, return_inverse=True)
+        fused = np.bincount(inverse, weights=weights, minlength=len(unique_ids))
 
-        # Build final results
-        combined_results = []
-        for rank, doc_id in enumerate(sorted_ids, 1):
-            result = result_map[doc_id]
-            combined_result = SearchResult(
-                conversation=result.conversation,
-                score=combined_scores[doc_id],
-                rank=rank,
-            )
-            combined_results.append(combined_result)
+        # Best fused score first; ties keep first-seen order (dense before sparse)
+        order = np.lexsort((first, -fused))
 
-        return combined_results
+        # model_copy skips validation: only score and rank change
+        return [
+            results[first[i]].model_copy(update={"score": float(fused[i]), "rank": rank})
+            for rank, i in enumerate(order, 1)
+        ]
 
     def search_and_rerank(
         self,
@@ -278,6 +769,19 @@ _reranker: RerankerService | None = None
 def get_reranker(
     model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
     device: str = "cpu",
+    *,
+    score_cache_size: int = 50000,
+    score_cache_ttl: int = 3600,
+    backend: str = "torch",
+    onnx_path: str | None = None,
+    batch_size: int = 32,
+    max_length: int = 256,
+    micro_batching: bool = False,
+    batch_window_ms: float = 2.0,
+    max_queue: int = 64,
+    cascade_keep: int = 0,
+    cascade_dense_weight: float = 0.5,
+    deadline_ms: float = 0,
 ) -> RerankerService:
     """
     Get or create the global reranker instance.
@@ -285,11 +789,38 @@ def get_reranker(
     Args:
         model_name: Model name for cross-encoder.
         device: Device to run on.
+        score_cache_size: Max cached (query, conversation) scores (0 disables).
+        score_cache_ttl: Score cache TTL in seconds.
+        backend: "torch" or "onnx".
+        onnx_path: Directory of the exported ONNX model.
+        batch_size: Batch size for inference.
+        max_length: Token budget per (query, document) pair.
+        micro_batching: Merge pairs of concurrent requests into shared forward passes.
+        batch_window_ms: How long the batcher waits for more requests.
+        max_queue: Max requests waiting for the batcher.
+        cascade_keep: Candidates kept by the first-stage scorer (0 disables).
+        cascade_dense_weight: Dense score weight of the first-stage scorer.
+        deadline_ms: Default per-request rerank budget in milliseconds (0 disables).
 
     Returns:
         RerankerService instance.
     """
     global _reranker
     if _reranker is None:
-        _reranker = RerankerService(model_name=model_name, device=device)
+        _reranker = RerankerService(
+            model_name=model_name,
+            device=device,
+            score_cache_size=score_cache_size,
+            score_cache_ttl=score_cache_ttl,
+            batch_size=batch_size,
+            backend=backend,
+            onnx_path=onnx_path,
+            max_length=max_length,
+            micro_batching=micro_batching,
+            batch_window_ms=batch_window_ms,
+            max_queue=max_queue,
+            cascade_keep=cascade_keep,
+            cascade_dense_weight=cascade_dense_weight,
+            deadline_ms=deadline_ms,
+        )
     return _reranker
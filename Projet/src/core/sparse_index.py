@@ -0,0 +1,303 @@
+"""
+Sparse Index Module.
+BM25 inverted index over conversation contexts, stored as CSR arrays
+that are memory-mapped at query time.
+"""
+
+import contextlib
+import json
+import os
+import re
+import shutil
+import time
+import unicodedata
+from collections import Counter
+from collections.abc import Iterable
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+
+_TOKEN_RE = re.compile(r"\w+")
+_MIN_TOKEN_LENGTH = 2
+
+# Files of a saved index
+_ARRAYS = ("indptr", "doc_indices", "term_freqs", "doc_lengths", "doc_ids")
+_META_FILE = "meta.json"
+_VOCABULARY_FILE = "vocabulary.json"
+# Names the version subdirectory readers load; swapped atomically by save()
+_CURRENT_FILE = "CURRENT"
+
+
+def tokenize(text: str) -> list[str]:
+    """Split text into lowercased BM25 terms."""
+    text = unicodedata.normalize("NFKC", text).casefold()
+    return [token for token in _TOKEN_RE.findall(text) if len(token) >= _MIN_TOKEN_LENGTH]
+
+
+def _write_synced(path: Path, text: str) -> None:
+    """Write a text file and flush it to disk."""
+    with path.open("w", encoding="utf-8") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _fsync_dir(directory: Path) -> None:
+    """Flush directory entries to disk (not supported on every platform)."""
+    with contextlib.suppress(OSError):
+        fd = os.open(directory, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+
+def _current_version(directory: Path) -> str | None:
+    """Name of the version subdirectory CURRENT points to, if any."""
+    try:
+        return (directory / _CURRENT_FILE).read_text(encoding="utf-8").strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _resolve(directory: str | Path) -> Path | None:
+    """Directory holding the current index files, or None if no index was saved."""
+    directory = Path(directory)
+    version = _current_version(directory)
+    if version is not None:
+        return directory / version
+    # Layout written before versioned saves
+    if (directory / _META_FILE).exists():
+        return directory
+    return None
+
+
+class BM25Index:
+    """
+    BM25 inverted index with array-backed postings.
+
+    Postings are stored term by term (CSR layout): the documents containing
+    term t are doc_indices[indptr[t]:indptr[t + 1]], with matching term_freqs.
+    """
+
+    def __init__(
+        self,
+        vocabulary: dict[str, int],
+        arrays: dict[str, np.ndarray],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ):
+        """
+        Initialize from built or loaded arrays.
+
+        Args:
+            vocabulary: Term -> term id.
+            arrays: indptr, doc_indices, term_freqs, doc_lengths and doc_ids arrays.
+            k1: Term frequency saturation.
+            b: Document length normalization.
+        """
+        self.vocabulary = vocabulary
+        self.indptr = arrays["indptr"]
+        self.doc_indices = arrays["doc_indices"]
+        self.term_freqs = arrays["term_freqs"]
+        self.doc_lengths = arrays["doc_lengths"]
+        self.doc_ids = arrays["doc_ids"]
+        self.k1 = k1
+        self.b = b
+
+        # Query-independent parts of the BM25 formula
+        n_docs = len(self.doc_ids)
+        doc_freqs = np.diff(self.indptr).astype(np.float32)
+        self.idf = np.log1p((n_docs - doc_freqs + 0.5) / (doc_freqs + 0.5)).astype(np.float32)
+        avg_length = float(np.mean(self.doc_lengths)) if n_docs else 1.0
+        self.length_norm = (k1 * (1 - b + b * self.doc_lengths / max(avg_length, 1.0))).astype(
+            np.float32
+        )
+
+    @property
+    def n_docs(self) -> int:
+        """Number of indexed documents."""
+        return len(self.doc_ids)
+
+    @classmethod
+    def build(
+        cls,
+        documents: Iterable[tuple[int, str]],
+        k1: float = 1.5,
+        b: float = 0.75,
+    ) -> "BM25Index":
+        """
+        Build an index.
+
+        Args:
+            documents: (conversation id, text) pairs.
+            k1: Term frequency saturation.
+            b: Document length normalization.
+
+        Returns:
+            BM25Index held in memory.
+        """
+        vocabulary: dict[str, int] = {}
+        term_ids: list[int] = []
+        doc_indices: list[int] = []
+        term_freqs: list[int] = []
+        doc_lengths: list[int] = []
+        doc_ids: list[int] = []
+
+        for doc_index, (doc_id, text) in enumerate(documents):
+            tokens = tokenize(text)
+            doc_ids.append(doc_id)
+            doc_lengths.append(len(tokens))
+            for term, freq in Counter(tokens).items():
+                term_ids.append(vocabulary.setdefault(term, len(vocabulary)))
+                doc_indices.append(doc_index)
+                term_freqs.append(freq)
+
+        # Group postings by term (stable sort keeps documents in order)
+        term_array = np.asarray(term_ids, dtype=np.int64)
+        order = np.argsort(term_array, kind="stable")
+        indptr = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_array, minlength=len(vocabulary)), out=indptr[1:])
+
+        arrays = {
+            "indptr": indptr,
+            "doc_indices": np.asarray(doc_indices, dtype=np.int32)[order],
+            "term_freqs": np.asarray(term_freqs, dtype=np.float32)[order],
+            "doc_lengths": np.asarray(doc_lengths, dtype=np.float32),
+            "doc_ids": np.asarray(doc_ids, dtype=np.int64),
+        }
+        logger.info(
+            f"Built BM25 index: {len(doc_ids)} documents, {len(vocabulary)} terms, "
+            f"{len(order)} postings"
+        )
+        return cls(vocabulary, arrays, k1=k1, b=b)
+
+    def save(self, directory: str | Path) -> None:
+        """
+        Write the index as .npy arrays plus JSON vocabulary.
+
+        Each save writes a new version subdirectory and fsyncs it before an
+        atomic rename swaps the CURRENT pointer to it, so workers that still
+        memory-map the previous version never see its files rewritten. The
+        previous version is kept for readers that resolved it just before
+        the swap; older ones are removed.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        previous = _current_version(directory)
+
+        version = f"v{time.time_ns()}"
+        target = directory / version
+        target.mkdir()
+        for name in _ARRAYS:
+            with (target / f"{name}.npy").open("wb") as f:
+                np.save(f, np.asarray(getattr(self, name)))
+                f.flush()
+                os.fsync(f.fileno())
+        _write_synced(target / _VOCABULARY_FILE, json.dumps(self.vocabulary, ensure_ascii=False))
+        _write_synced(target / _META_FILE, json.dumps({"k1": self.k1, "b": self.b}))
+        _fsync_dir(target)
+
+        pointer = directory / f"{_CURRENT_FILE}.tmp"
+        _write_synced(pointer, version)
+        pointer.replace(directory / _CURRENT_FILE)
+        _fsync_dir(directory)
+
+        for old in directory.glob("v*"):
+            if old.is_dir() and old.name not in (version, previous):
+                shutil.rmtree(old, ignore_errors=True)
+        logger.info(f"Saved BM25 index to {target}")
+
+    @classmethod
+    def load(cls, directory: str | Path, mmap: bool = True) -> "BM25Index":
+        """
+        Load a saved index.
+
+        Args:
+            directory: Directory written by save().
+            mmap: Memory-map the postings instead of reading them into RAM.
+
+        Returns:
+            BM25Index.
+
+        Raises:
+            FileNotFoundError: If no index was saved in directory.
+        """
+        resolved = _resolve(directory)
+        if resolved is None:
+            raise FileNotFoundError(f"No BM25 index at {directory}")
+        directory = resolved
+        mmap_mode = "r" if mmap else None
+        arrays = {name: np.load(directory / f"{name}.npy", mmap_mode=mmap_mode) for name in _ARRAYS}
+        vocabulary = json.loads((directory / _VOCABULARY_FILE).read_text(encoding="utf-8"))
+        meta = json.loads((directory / _META_FILE).read_text())
+        return cls(vocabulary, arrays, k1=meta["k1"], b=meta["b"])
+
+    def search(self, query: str, n_results: int = 10) -> list[tuple[int, float]]:
+        """
+        Score documents for a query.
+
+        Args:
+            query: Query text.
+            n_results: Max results.
+
+        Returns:
+            (conversation id, BM25 score) pairs, best first.
+        """
+        term_ids = {self.vocabulary[t] for t in tokenize(query) if t in self.vocabulary}
+        if not term_ids or n_results <= 0:
+            return []
+
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term_id in term_ids:
+            start, end = self.indptr[term_id], self.indptr[term_id + 1]
+            docs = self.doc_indices[start:end]
+            freqs = self.term_freqs[start:end]
+            # A document appears once per term, so fancy-index accumulation is safe
+            scores[docs] += (
+                self.idf[term_id] * freqs * (self.k1 + 1) / (freqs + self.length_norm[docs])
+            )
+
+        n_matches = int(np.count_nonzero(scores))
+        n = min(n_results, n_matches)
+        if n == 0:
+            return []
+
+        top = np.argpartition(-scores, n - 1)[:n]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.doc_ids[i]), float(scores[i])) for i in top]
+
+    def get_stats(self) -> dict:
+        """Get index statistics."""
+        return {
+            "documents": self.n_docs,
+            "terms": len(self.vocabulary),
+            "postings": len(self.doc_indices),
+        }
+
+
+# Global sparse index instance
+_sparse_index: BM25Index | None = None
+
+
+def get_sparse_index(directory: str | Path, reload: bool = False) -> BM25Index | None:
+    """
+    Get the global BM25 index, loading it from disk on first use.
+
+    Args:
+        directory: Index directory.
+        reload: Load again (e.g. after re-indexing).
+
+    Returns:
+        BM25Index, or None if no index was built.
+    """
+    global _sparse_index
+    if _sparse_index is None or reload:
+        if _resolve(directory) is None:
+            logger.warning(f"No BM25 index at {directory} (run the indexing script)")
+            return None
+        _sparse_index = BM25Index.load(directory)
+        logger.info(f"BM25 index loaded: {_sparse_index.get_stats()}")
+    return _sparse_index
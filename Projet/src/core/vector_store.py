@@ -158,6 +158,40 @@ class VectorStoreService:
             logger.error(f"Search failed: {e!s}")
             return []
 
+    def get_by_ids(self, conversation_ids: list[int]) -> list[Conversation]:
+        """
+        Fetch conversations by ID
+
+        Args:
+            conversation_ids: Conversation IDs
+
+        Returns:
+            Conversations found, in the order of conversation_ids
+        """
+        if not conversation_ids:
+            return []
+
+        try:
+            results = self.collection.get(
+                ids=[f"conv_{conv_id}" for conv_id in conversation_ids],
+                include=["metadatas", "documents"],
+            )
+
+            by_id = {}
+            for metadata, document in zip(results["metadatas"], results["documents"]):
+                by_id[metadata["id"]] = Conversation(
+                    id=metadata["id"],
+                    context=metadata["context"],
+                    response=metadata["response"],
+                    full_text=document,
+                )
+
+            return [by_id[conv_id] for conv_id in conversation_ids if conv_id in by_id]
+
+        except Exception as e:
+            logger.error(f"Get by IDs failed: {e!s}")
+            return []
+
     def count(self) -> int:
         """
         Get total number of documents
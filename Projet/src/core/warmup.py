@@ -0,0 +1,212 @@
+"""
+Cache Warm-up Module.
+Records served queries and replays the most frequent ones to refill
+the response cache after a deploy.
+"""
+
+import json
+import threading
+from collections import Counter
+from collections.abc import Callable
+from pathlib import Path
+
+from loguru import logger
+
+from src.core.cache import CacheService, InMemoryCache
+
+
+class QueryLog:
+    """
+    JSON-lines log of chat queries, bounded in size.
+    Each line holds the parameters that make up the response cache key and
+    a count. Once the file reaches 2 * max_entries lines it is compacted to
+    the max_entries most frequent queries, so it never grows unbounded and
+    reading it stays cheap.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = 1000):
+        """
+        Initialize query log.
+
+        Args:
+            path: Log file path (created on first write).
+            max_entries: Distinct queries kept when the log is compacted.
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._lines: int | None = None
+
+    def record(self, message: str, use_llm: bool, n_results: int) -> None:
+        """Append a served query to the log, compacting it when full."""
+        line = json.dumps(
+            {"message": message, "use_llm": use_llm, "n_results": n_results},
+            ensure_ascii=False,
+        )
+        try:
+            with self._lock:
+                if self._lines is None:
+                    self._lines = self._count_lines()
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write(line + "\n")
+                self._lines += 1
+                if self._lines >= 2 * self.max_entries:
+                    self._compact()
+        except OSError as e:
+            logger.warning(f"Failed to record query: {e}")
+
+    def top_queries(self, n: int) -> list[dict]:
+        """
+        Get the n most frequent queries.
+
+        Args:
+            n: Number of queries to return.
+
+        Returns:
+            List of query dicts (message, use_llm, n_results), most frequent first.
+        """
+        return [
+            {"message": message, "use_llm": use_llm, "n_results": n_results}
+            for (message, use_llm, n_results), _ in self._counts().most_common(n)
+        ]
+
+    def _counts(self) -> Counter:
+        """Query counts read from the file."""
+        counts: Counter = Counter()
+        if not self.path.exists():
+            return counts
+
+        with self.path.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                    key = (entry["message"], entry["use_llm"], entry["n_results"])
+                    counts[key] += int(entry.get("count", 1))
+                except (ValueError, KeyError, TypeError):
+                    continue
+        return counts
+
+    def _count_lines(self) -> int:
+        """Number of lines in the file."""
+        if not self.path.exists():
+            return 0
+        with self.path.open(encoding="utf-8") as f:
+            return sum(1 for _ in f)
+
+    def _compact(self) -> None:
+        """Rewrite the file with the most frequent queries (written atomically)."""
+        top = self._counts().most_common(self.max_entries)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp_path.open("w", encoding="utf-8") as f:
+            for (message, use_llm, n_results), count in top:
+                entry = {"message": message, "use_llm": use_llm, "n_results": n_results}
+                f.write(json.dumps({**entry, "count": count}, ensure_ascii=False) + "\n")
+        tmp_path.replace(self.path)
+        self._lines = len(top)
+
+
+class CacheWarmer:
+    """
+    Restores and refills the response cache at startup.
+    Tracks readiness so health probes can hold traffic until warm-up ends.
+    """
+
+    def __init__(self):
+        self._ready = threading.Event()
+        self._ready.set()
+        self.status = "idle"
+        self.warmed = 0
+
+    def is_ready(self) -> bool:
+        """Check if no warm-up is in progress."""
+        return self._ready.is_set()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Wait for an in-progress warm-up to finish."""
+        return self._ready.wait(timeout)
+
+    def replay(
+        self,
+        answer: Callable[[dict], object],
+        query_log: QueryLog,
+        top_n: int,
+    ) -> int:
+        """
+        Replay the most frequent logged queries through the pipeline.
+
+        Args:
+            answer: Function running one query dict through the chat pipeline.
+            query_log: Log to read historical queries from.
+            top_n: Number of queries to replay.
+
+        Returns:
+            Number of queries replayed successfully.
+        """
+        queries = query_log.top_queries(top_n)
+        logger.info(f"Warming cache with {len(queries)} frequent queries")
+
+        self.warmed = 0
+        for query in queries:
+            try:
+                answer(query)
+                self.warmed += 1
+            except Exception as e:
+                logger.warning(f"Warm-up query failed: {e}")
+
+        logger.info(f"Cache warm-up complete ({self.warmed}/{len(queries)} queries)")
+        return self.warmed
+
+    def start(
+        self,
+        answer: Callable[[dict], object],
+        query_log: QueryLog,
+        top_n: int,
+    ) -> threading.Thread:
+        """Run replay in a background thread, marking the service not ready meanwhile."""
+        self._ready.clear()
+        self.status = "running"
+
+        def run() -> None:
+            try:
+                self.replay(answer, query_log, top_n)
+                self.status = "done"
+            except Exception as e:
+                logger.error(f"Cache warm-up failed: {e}")
+                self.status = "failed"
+            finally:
+                self._ready.set()
+
+        thread = threading.Thread(target=run, name="cache-warmup", daemon=True)
+        thread.start()
+        return thread
+
+    def get_stats(self) -> dict:
+        """Get warm-up statistics."""
+        return {"status": self.status, "ready": self.is_ready(), "warmed": self.warmed}
+
+
+def save_cache_snapshot(cache: CacheService, path: str | Path) -> int:
+    """Snapshot the cache if it is backed by process memory."""
+    if isinstance(cache.backend, InMemoryCache):
+        return cache.backend.save_snapshot(path)
+    return 0
+
+
+def load_cache_snapshot(cache: CacheService, path: str | Path) -> int:
+    """Reload a snapshot into the cache if it is backed by process memory."""
+    if isinstance(cache.backend, InMemoryCache):
+        return cache.backend.load_snapshot(path)
+    return 0
+
+
+# Global cache warmer instance
+_cache_warmer: CacheWarmer | None = None
+
+
+def get_cache_warmer() -> CacheWarmer:
+    """Get or create the global cache warmer."""
+    global _cache_warmer
+    if _cache_warmer is None:
+        _cache_warmer = CacheWarmer()
+    return _cache_warmer
@@ -3,21 +3,54 @@ Chatbot Service - Professional Reddit RAG Chatbot
 Main business logic with reranking, caching, conversation memory, and monitoring
 """
 
+import contextlib
+import copy
+import hashlib
+import threading
 import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
+import numpy as np
+
 from src.config.logging_config import get_logger, log_metric
 from src.config.settings import settings
-from src.core.cache import CacheService, get_cache_service, make_cache_key
+from src.core.cache import (
+    CacheService,
+    IndexEpoch,
+    InMemoryCache,
+    get_cache_service,
+    make_cache_key,
+    normalize_query,
+)
 from src.core.conversation_memory import (
     ConversationMemory,
     SummarizingMemory,
     get_conversation_memory,
 )
 from src.core.embeddings import EmbeddingService
-from src.core.llm_handler import LLMService
-from src.core.reranker import RerankerService, get_reranker
+from src.core.llm_chain import LLMProviderChain, create_llm_service
+from src.core.llm_dispatcher import (
+    LLMDispatcher,
+    LLMOverloaded,
+    Priority,
+    get_llm_queue_stats,
+    llm_priority,
+)
+from src.core.llm_handler import SYSTEM_PROMPT, LLMService
+from src.core.llm_health import get_llm_health_monitor
+from src.core.prompt_builder import BuiltPrompt, PromptBuilder, TokenCounter
+from src.core.reranker import (
+    HybridSearchReranker,
+    RerankDecision,
+    RerankerService,
+    RerankPolicy,
+    get_reranker,
+)
+from src.core.sparse_index import get_sparse_index
 from src.core.vector_store import VectorStoreService
+from src.core.warmup import QueryLog
 from src.models.schemas import ChatRequest, ChatResponse, SearchResult
 from src.utils.text_processor import TextProcessor
 from src.utils.validators import validate_input
@@ -44,14 +77,17 @@ class ChatbotService:
         self,
         embedding_service: EmbeddingService | None = None,
         vector_store: VectorStoreService | None = None,
-        llm_service: LLMService | None = None,
+        llm_service: LLMService | LLMDispatcher | LLMProviderChain | None = None,
         reranker: RerankerService | None = None,
         cache_service: CacheService | None = None,
         conversation_memory: ConversationMemory | None = None,
+        query_log: QueryLog | None = None,
     ):
         self.embedding_service = embedding_service or EmbeddingService()
         self.vector_store = vector_store or VectorStoreService()
-        self.llm_service = llm_service or LLMService()
+        self.llm_service = llm_service or create_llm_service()
+        # Availability is refreshed in the background, never on the request path
+        get_llm_health_monitor().watch(self.llm_service)
         self.text_processor = TextProcessor()
 
         # Reranker (cross-encoder for improved relevance)
@@ -62,6 +98,20 @@ class ChatbotService:
                 self.reranker = get_reranker(
                     model_name=settings.RERANKER_MODEL,
                     device=settings.RERANKER_DEVICE,
+                    score_cache_size=settings.RERANKER_SCORE_CACHE_SIZE,
+                    score_cache_ttl=settings.RERANKER_SCORE_CACHE_TTL,
+                    backend=settings.RERANKER_BACKEND,
+                    onnx_path=settings.RERANKER_ONNX_PATH,
+                    batch_size=settings.RERANKER_BATCH_SIZE,
+                    max_length=settings.RERANKER_MAX_LENGTH,
+                    micro_batching=settings.RERANKER_MICRO_BATCHING,
+                    batch_window_ms=settings.RERANKER_BATCH_WINDOW_MS,
+                    max_queue=settings.RERANKER_MAX_QUEUE,
+                    cascade_keep=(
+                        settings.RERANKER_CASCADE_KEEP if settings.RERANKER_CASCADE_ENABLED else 0
+                    ),
+                    cascade_dense_weight=settings.RERANKER_CASCADE_DENSE_WEIGHT,
+                    deadline_ms=settings.RERANKER_DEADLINE_MS,
                 )
             except Exception as e:
                 logger.warning(f"Failed to initialize reranker: {e}")
@@ -69,13 +119,61 @@ class ChatbotService:
         else:
             self.reranker = None
 
-        # Cache service
-        self.cache = cache_service or get_cache_service(
-            backend_type=settings.CACHE_BACKEND,
-            redis_url=settings.REDIS_URL,
-            enabled=settings.ENABLE_CACHING,
+        # Hybrid search: BM25 results fused with dense ones (reciprocal rank fusion)
+        self.sparse_index = (
+            get_sparse_index(settings.SPARSE_INDEX_DIR) if settings.HYBRID_SEARCH_ENABLED else None
+        )
+        self.hybrid = HybridSearchReranker(
+            dense_weight=settings.HYBRID_DENSE_WEIGHT,
+            sparse_weight=settings.HYBRID_SPARSE_WEIGHT,
+        )
+        # BM25 lookups run here while the request thread does the dense search
+        # (created on the first hybrid search, see _sparse_executor)
+        self._sparse_pool: ThreadPoolExecutor | None = None
+        self._sparse_pool_lock = threading.Lock()
+
+        # Adaptive reranking: skip or shrink the cross-encoder pass when the
+        # dense score distribution already makes the order clear
+        self.rerank_policy = RerankPolicy(
+            enabled=settings.RERANKER_ADAPTIVE,
+            min_score=settings.MIN_SIMILARITY_SCORE,
+            skip_margin=settings.RERANKER_SKIP_MARGIN,
+            max_skip_entropy=settings.RERANKER_SKIP_MAX_ENTROPY,
+            score_window=settings.RERANKER_SCORE_WINDOW,
+        )
+
+        # LLM prompts are fitted to MAX_CONTEXT_LENGTH input tokens
+        self.prompt_builder = PromptBuilder(
+            TokenCounter(settings.PROMPT_TOKENIZER),
+            max_input_tokens=settings.MAX_CONTEXT_LENGTH,
         )
 
+        # Cache service
+        self.cache = cache_service or get_response_cache()
+
+        # Index version: response keys are namespaced by it and index-dependent
+        # stage caches are dropped when it changes, so re-indexing invalidates at once
+        self.index_epoch = IndexEpoch(settings.INDEX_EPOCH_FILE)
+        self._epoch = self.index_epoch.current()
+
+        # Query log feeding cache warm-up after restarts
+        if query_log is None and settings.QUERY_LOG_ENABLED:
+            query_log = QueryLog(settings.QUERY_LOG_FILE, settings.QUERY_LOG_MAX_ENTRIES)
+        self.query_log = query_log
+
+        # Stage caches: query -> embedding, embedding -> candidates (the reranker
+        # keeps its own (query, doc) -> score cache). Kept in process memory since they hold arrays and model objects.
+        self.stage_caches = {
+            stage: CacheService(
+                backend=InMemoryCache(
+                    max_size=settings.STAGE_CACHE_MAX_SIZE,
+                    default_ttl=settings.STAGE_CACHE_TTL,
+                ),
+                enabled=settings.STAGE_CACHE_ENABLED,
+            )
+            for stage in ("embedding", "retrieval")
+        }
+
         # Conversation memory with summarization
         base_memory = conversation_memory or get_conversation_memory(
             max_sessions=settings.MEMORY_MAX_SESSIONS,
@@ -98,13 +196,19 @@ class ChatbotService:
             f"memory=enabled)"
         )
 
-    def chat(self, request: ChatRequest, session_id: str | None = None) -> ChatResponse:
+    def chat(
+        self,
+        request: ChatRequest,
+        session_id: str | None = None,
+        record_query: bool = True,
+    ) -> ChatResponse:
         """
         Main chat function with reranking, caching, and conversation memory.
 
         Args:
             request: Chat request with user message and parameters
             session_id: Optional session ID for conversation continuity
+            record_query: Whether to append the query to the warm-up query log
 
         Returns:
             ChatResponse with message, sources, and metadata
@@ -123,123 +227,411 @@ class ChatbotService:
             # Store user message in memory
             self.memory.add_message(session_id, "user", request.message)
 
-            # 3. Check cache for identical query
-            cache_key = make_cache_key(
-                request.message,
-                use_llm=request.use_llm,
-                n_results=request.n_results,
+            if record_query and self.query_log is not None:
+                self.query_log.record(request.message, request.use_llm, request.n_results)
+
+            # 3. Serve from cache; concurrent misses for the same query are
+            # coalesced so only one caller runs the pipeline below, and stale
+            # entries are served immediately while refreshed in the background
+            cache_key = self._response_cache_key(request)
+            response_data, cache_status = self.cache.fetch(
+                cache_key,
+                lambda: self._compute_response(request, session_id),
+                ttl=settings.CACHE_TTL,
+                stale_ttl=settings.CACHE_STALE_TTL,
             )
-            cached_response = self.cache.get(cache_key)
-            if cached_response is not None:
+
+            # The payload may be shared with other callers: copy before personalising
+            response_data = copy.deepcopy(response_data)
+            duration = (time.time() - start_time) * 1000
+            metadata = response_data["metadata"]
+            metadata["duration_ms"] = round(duration, 2)
+            metadata["cache_hit"] = cache_status in ("hit", "stale")
+            metadata["stale"] = cache_status == "stale"
+            metadata["coalesced"] = cache_status == "coalesced"
+            metadata["session_id"] = session_id
+
+            if cache_status == "hit":
                 logger.info("Cache hit - returning cached response")
-                duration = (time.time() - start_time) * 1000
-                cached_response["metadata"]["duration_ms"] = round(duration, 2)
-                cached_response["metadata"]["cache_hit"] = True
-                cached_response["metadata"]["session_id"] = session_id
+            elif cache_status == "stale":
+                logger.info("Stale cache hit - returning cached response, refreshing in background")
+            elif cache_status == "coalesced":
+                logger.info("Coalesced with in-flight request - reusing its response")
 
-                # Store assistant response in memory
-                self.memory.add_message(session_id, "assistant", cached_response["message"])
+            # Store assistant response in memory
+            self.memory.add_message(session_id, "assistant", response_data["message"])
 
-                return ChatResponse(**cached_response)
+            logger.info(f"Chat completed in {duration:.2f}ms ({cache_status})")
+            return ChatResponse(**response_data)
 
-            # 4. Search similar conversations
-            search_results = self._search_similar(
-                query=request.message, n_results=request.n_results
-            )
+        except Exception as e:
+            logger.error(f"Chat failed: {e!s}")
+            duration = (time.time() - start_time) * 1000
+            log_metric("chat_error", 1, {"error_type": type(e).__name__})
+            raise
 
-            # 5. Rerank results with cross-encoder
-            if self.reranker and self.reranker.is_available() and search_results:
-                rerank_start = time.time()
-                search_results = self.reranker.rerank(
-                    query=request.message,
-                    results=search_results,
-                    top_k=settings.RERANKER_TOP_K,
-                )
-                rerank_duration = (time.time() - rerank_start) * 1000
-                logger.info(f"Reranked results in {rerank_duration:.2f}ms")
-                log_metric("rerank_duration_ms", rerank_duration)
-
-            # 6. Build conversation context from memory
-            memory_context = self.summarizing_memory.get_context(
-                session_id=session_id,
-                include_summary=True,
-            )
+    def replay_query(self, query: dict) -> ChatResponse:
+        """
+        Answer a logged query in a throwaway session (cache warm-up).
 
-            # 7. Generate response
-            if request.use_llm and self.llm_service.is_available():
-                # Merge conversation_history from request with memory context
-                history = request.conversation_history
-                if not history and memory_context:
-                    # Use memory-based context if no explicit history provided
-                    pass  # memory_context will be injected via _generate_with_llm
+        Args:
+            query: Query dict with message, use_llm and n_results
 
-                response_text = self._generate_with_llm(
-                    query=request.message,
-                    context=search_results,
-                    history=request.conversation_history,
-                    memory_context=memory_context,
-                    temperature=request.temperature,
-                    max_tokens=request.max_tokens,
-                )
-            else:
-                response_text = self._generate_simple(search_results)
+        Returns:
+            ChatResponse for the query
+        """
+        session_id = self.memory.create_session()
+        try:
+            return self.chat(ChatRequest(**query), session_id=session_id, record_query=False)
+        finally:
+            self.memory.delete_session(session_id)
 
-            # 8. Store assistant response in memory
-            self.memory.add_message(session_id, "assistant", response_text)
+    def chat_stream(
+        self,
+        request: ChatRequest,
+        session_id: str | None = None,
+    ) -> Iterator[dict]:
+        """
+        Streaming variant of chat().
 
-            # 9. Build response
-            duration = (time.time() - start_time) * 1000
+        Input is validated and the session set up before returning, so
+        invalid requests fail here rather than mid-stream.
 
-            response = ChatResponse(
-                message=response_text,
-                sources=search_results[:3],
-                metadata={
-                    "duration_ms": round(duration, 2),
-                    "method": "llm" if request.use_llm else "simple",
-                    "n_sources": len(search_results),
-                    "model": settings.LLM_MODEL if request.use_llm else "retrieval",
-                    "reranked": bool(self.reranker and self.reranker.is_available()),
-                    "cache_hit": False,
-                    "session_id": session_id,
-                    "timestamp": datetime.utcnow().isoformat(),
-                },
+        Args:
+            request: Chat request with user message and parameters
+            session_id: Optional session ID for conversation continuity
+
+        Returns:
+            Iterator of events {"event": name, "data": payload}: one "sources"
+            event, "token" events carrying response text, then a "done" event
+            with the full message and metadata
+        """
+        validate_input(request.message, max_length=1000)
+        logger.info(f"Processing streaming chat request: '{request.message[:50]}...'")
+
+        session = self.memory.get_or_create_session(session_id)
+        session_id = session.session_id
+        self.memory.add_message(session_id, "user", request.message)
+
+        if self.query_log is not None:
+            self.query_log.record(request.message, request.use_llm, request.n_results)
+
+        return self._stream_events(request, session_id)
+
+    def _stream_events(self, request: ChatRequest, session_id: str) -> Iterator[dict]:
+        """
+        Produce the events of chat_stream(); caching and memory apply to the final text.
+
+        The response cache is used as in chat(): stale entries are streamed
+        while refreshed in the background, and a miss for a query another
+        request is already answering waits for that answer instead of
+        running the pipeline again.
+        """
+        start_time = time.time()
+        first_content_ms = None
+        cache_key = self._response_cache_key(request)
+        cache_args = {"ttl": settings.CACHE_TTL, "stale_ttl": settings.CACHE_STALE_TTL}
+
+        cached = self.cache.peek(
+            cache_key, lambda: self._compute_response(request, session_id), **cache_args
+        )
+        if cached is not None:
+            response_data, cache_status = cached
+            logger.info(f"Cache {cache_status} - streaming cached response")
+            yield from self._replay_events(response_data)
+        else:
+            with self.cache.claim(cache_key, **cache_args) as (shared, store):
+                if shared is not None:
+                    response_data, cache_status = shared, "coalesced"
+                    logger.info("Coalesced with in-flight request - streaming its response")
+                    yield from self._replay_events(response_data)
+                else:
+                    cache_status = "miss"
+                    search_results, rerank_decision, rerank_info = self._retrieve(request)
+                    yield {
+                        "event": "sources",
+                        "data": {"sources": [result.dict() for result in search_results[:3]]},
+                    }
+
+                    prompt = None
+                    if request.use_llm and self.llm_service.is_available():
+                        prompt = self._build_prompt(request, session_id, search_results)
+
+                        # Progressive response: the best match is shown while the LLM
+                        # prefills, then replaced by the first token
+                        if settings.STREAM_PREVIEW_ENABLED:
+                            yield {
+                                "event": "preview",
+                                "data": {"text": self._generate_simple(search_results)},
+                            }
+                            first_content_ms = (time.time() - start_time) * 1000
+
+                    chunks = []
+                    # Closed with this generator (client gone) to end the LLM call at once
+                    with contextlib.closing(
+                        self._stream_text(request, prompt, search_results)
+                    ) as text_stream:
+                        for chunk in text_stream:
+                            if first_content_ms is None:
+                                first_content_ms = (time.time() - start_time) * 1000
+                            chunks.append(chunk)
+                            yield {"event": "token", "data": {"text": chunk}}
+
+                    response_data = self._build_response(
+                        request,
+                        session_id,
+                        response_text="".join(chunks),
+                        search_results=search_results,
+                        rerank_decision=rerank_decision,
+                        rerank_info=rerank_info,
+                        prompt=prompt,
+                        start_time=start_time,
+                    )
+                    store(response_data)
+
+        # The payload may be shared with other callers: copy before personalising
+        response_data = copy.deepcopy(response_data)
+        duration = (time.time() - start_time) * 1000
+        metadata = response_data["metadata"]
+        metadata["duration_ms"] = round(duration, 2)
+        metadata["cache_hit"] = cache_status in ("hit", "stale")
+        metadata["stale"] = cache_status == "stale"
+        metadata["coalesced"] = cache_status == "coalesced"
+        metadata["session_id"] = session_id
+        metadata["streamed"] = True
+        if first_content_ms is not None:
+            metadata["first_content_ms"] = round(first_content_ms, 2)
+            log_metric("stream_first_content_ms", first_content_ms)
+
+        self.memory.add_message(session_id, "assistant", response_data["message"])
+
+        logger.info(f"Streaming chat completed in {duration:.2f}ms ({cache_status})")
+        yield {"event": "done", "data": {"message": response_data["message"], "metadata": metadata}}
+
+    @staticmethod
+    def _replay_events(response_data: dict) -> Iterator[dict]:
+        """Events of a response that was computed before (cache or another request)."""
+        yield {"event": "sources", "data": {"sources": response_data["sources"]}}
+        yield {"event": "token", "data": {"text": response_data["message"]}}
+
+    def _stream_text(
+        self,
+        request: ChatRequest,
+        prompt: BuiltPrompt | None,
+        search_results: list[SearchResult],
+    ) -> Iterator[str]:
+        """Response text chunks: LLM tokens, or the best match in one chunk."""
+        if prompt is None:
+            yield self._generate_simple(search_results)
+            return
+
+        stream = self.llm_service.generate_stream(
+            query=prompt.query,
+            context=self._llm_context(prompt),
+            history=prompt.history,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+        )
+
+        started = False
+        try:
+            for chunk in stream:
+                started = True
+                yield chunk
+        except Exception as e:
+            # Once tokens were sent the answer cannot be swapped: let the caller report it
+            if started:
+                raise
+            if isinstance(e, LLMOverloaded):
+                if not settings.LLM_OVERLOAD_FALLBACK:
+                    raise
+                log_metric("llm_overload_fallback", 1)
+            logger.warning(f"LLM streaming failed: {e!s}, falling back to simple")
+            yield self._generate_simple(search_results)
+        finally:
+            # Frees the provider's concurrency slot even if the client went away
+            close = getattr(stream, "close", None)
+            if close is not None:
+                close()
+
+    def _response_cache_key(self, request: ChatRequest) -> str:
+        """
+        Response cache key for a request.
+
+        The query is normalized so trivial variants share an entry; the key
+        is namespaced by the index epoch and covers the models that shape
+        the answer.
+        """
+        epoch = self._sync_index_epoch()
+        return make_cache_key(
+            normalize_query(request.message),
+            use_llm=request.use_llm,
+            n_results=request.n_results,
+            models=[settings.EMBEDDING_MODEL, settings.RERANKER_MODEL, settings.LLM_MODEL],
+            namespace=f"idx{epoch}",
+        )
+
+    def _sync_index_epoch(self) -> int:
+        """Drop index-dependent stage caches if the index was rebuilt."""
+        epoch = self.index_epoch.current()
+        if epoch != self._epoch:
+            logger.info(f"Index epoch changed ({self._epoch} -> {epoch}), clearing stage caches")
+            self.stage_caches["retrieval"].clear()
+            if self.reranker is not None:
+                self.reranker.clear_score_cache()
+            if self.sparse_index is not None:
+                self.sparse_index = get_sparse_index(settings.SPARSE_INDEX_DIR, reload=True)
+            self._epoch = epoch
+        return epoch
+
+    def _compute_response(self, request: ChatRequest, session_id: str) -> dict:
+        """
+        Run the full RAG pipeline for a cache miss.
+
+        Args:
+            request: Chat request
+            session_id: Session of the caller computing the response
+
+        Returns:
+            Serialized ChatResponse, ready to be cached
+        """
+        start_time = time.time()
+
+        # 4-5. Search and rerank
+        search_results, rerank_decision, rerank_info = self._retrieve(request)
+
+        # 6-7. Generate response (LLM prompt fitted to the token budget)
+        prompt = None
+        if request.use_llm and self.llm_service.is_available():
+            prompt = self._build_prompt(request, session_id, search_results)
+            response_text = self._generate_with_llm(
+                prompt,
+                search_results,
+                temperature=request.temperature,
+                max_tokens=request.max_tokens,
             )
+        else:
+            response_text = self._generate_simple(search_results)
+
+        # 8-9. Build response and log metrics
+        return self._build_response(
+            request,
+            session_id,
+            response_text=response_text,
+            search_results=search_results,
+            rerank_decision=rerank_decision,
+            rerank_info=rerank_info,
+            prompt=prompt,
+            start_time=start_time,
+        )
 
-            # 10. Cache the response
-            self.cache.set(cache_key, response.dict(), ttl=settings.CACHE_TTL)
+    def _retrieve(
+        self, request: ChatRequest
+    ) -> tuple[list[SearchResult], RerankDecision | None, dict]:
+        """
+        Retrieval half of the pipeline: search, then rerank.
 
-            # 11. Log metrics
-            log_metric(
-                "chat_duration_ms", duration, {"method": "llm" if request.use_llm else "simple"}
+        Returns:
+            Tuple of (results, rerank decision or None, rerank info)
+        """
+        # 4. Search similar conversations
+        search_results = self._search_similar(query=request.message, n_results=request.n_results)
+
+        # 5. Rerank results with cross-encoder, unless dense retrieval is decisive
+        rerank_decision = None
+        rerank_info: dict = {}
+        if self.reranker and self.reranker.is_available() and search_results:
+            # Hybrid results carry RRF scores, which the thresholds were not tuned for
+            rerank_decision = self.rerank_policy.decide(
+                [result.score for result in search_results],
+                top_k=settings.RERANKER_TOP_K,
+                fused=self.sparse_index is not None,
             )
-            log_metric("sources_retrieved", len(search_results))
+            log_metric("rerank_decision", 1, {"action": rerank_decision.action})
 
-            logger.info(f"Chat completed in {duration:.2f}ms")
-            return response
+            if rerank_decision.action == "skip":
+                logger.info(f"Rerank skipped ({rerank_decision.reason})")
+                search_results = search_results[: settings.RERANKER_TOP_K]
+                rerank_info = {"outcome": "skipped"}
+            else:
+                search_results, rerank_info = self.reranker.rerank_with_info(
+                    query=request.message,
+                    results=search_results[: rerank_decision.n_candidates],
+                    top_k=settings.RERANKER_TOP_K,
+                )
+                logger.info(
+                    f"Rerank {rerank_info['outcome']} for {rerank_decision.n_candidates} "
+                    f"results in {rerank_info['duration_ms']:.2f}ms"
+                )
+                log_metric("rerank_duration_ms", rerank_info["duration_ms"])
 
-        except Exception as e:
-            logger.error(f"Chat failed: {e!s}")
-            duration = (time.time() - start_time) * 1000
-            log_metric("chat_error", 1, {"error_type": type(e).__name__})
-            raise
+        return search_results, rerank_decision, rerank_info
+
+    def _build_response(
+        self,
+        request: ChatRequest,
+        session_id: str,
+        *,
+        response_text: str,
+        search_results: list[SearchResult],
+        rerank_decision: RerankDecision | None,
+        rerank_info: dict,
+        prompt: BuiltPrompt | None = None,
+        start_time: float,
+    ) -> dict:
+        """Serialize the response of a computed (not cached) request and log its metrics."""
+        duration = (time.time() - start_time) * 1000
+
+        response = ChatResponse(
+            message=response_text,
+            sources=search_results[:3],
+            metadata={
+                "duration_ms": round(duration, 2),
+                "method": "llm" if request.use_llm else "simple",
+                "n_sources": len(search_results),
+                "model": settings.LLM_MODEL if request.use_llm else "retrieval",
+                "reranked": rerank_info.get("outcome") == "reranked",
+                "rerank": {**rerank_decision.to_dict(), **rerank_info} if rerank_decision else None,
+                "prompt": prompt.to_dict() if prompt else None,
+                "cache_hit": False,
+                "session_id": session_id,
+                "timestamp": datetime.utcnow().isoformat(),
+            },
+        )
+
+        log_metric("chat_duration_ms", duration, {"method": "llm" if request.use_llm else "simple"})
+        log_metric("sources_retrieved", len(search_results))
+
+        return response.dict()
+
+    def _sparse_executor(self) -> ThreadPoolExecutor:
+        """Thread pool of the BM25 lookups, created when a sparse index is first searched."""
+        with self._sparse_pool_lock:
+            if self._sparse_pool is None:
+                self._sparse_pool = ThreadPoolExecutor(
+                    max_workers=settings.HYBRID_SEARCH_WORKERS, thread_name_prefix="sparse-search"
+                )
+            return self._sparse_pool
 
     def _search_similar(self, query: str, n_results: int = 5) -> list[SearchResult]:
         """Search for similar conversations."""
         try:
-            processed_query = self.text_processor.clean_text(query)
-            query_embedding = self.embedding_service.embed_text(processed_query)
-
             # When reranker is enabled, fetch more candidates for better reranking
-            fetch_n = n_results
-            if self.reranker and self.reranker.is_available():
-                fetch_n = max(n_results * 3, 15)
-
-            results = self.vector_store.search(
-                query_embedding=query_embedding,
-                n_results=fetch_n,
-                min_score=settings.MIN_SIMILARITY_SCORE,
+            fetch_n = self._fetch_size(n_results)
+
+            # Sparse and dense retrieval are independent: overlap them so hybrid
+            # latency is max(dense, sparse) rather than their sum
+            sparse_future = (
+                self._sparse_executor().submit(self._search_sparse, query, fetch_n)
+                if self.sparse_index is not None
+                else None
             )
 
+            results = self._search_dense(query, fetch_n)
+
+            if sparse_future is not None:
+                results = self.hybrid.combine_scores(results, sparse_future.result())[:fetch_n]
+
             logger.debug(f"Found {len(results)} similar conversations")
             return results
 
@@ -247,6 +639,69 @@ class ChatbotService:
             logger.error(f"Search failed: {e!s}")
             raise
 
+    def _search_dense(self, query: str, n_results: int) -> list[SearchResult]:
+        """Embedding + vector search, both through the stage caches."""
+        processed_query = self.text_processor.clean_text(query)
+        query_embedding = self.stage_caches["embedding"].get_or_set(
+            make_cache_key(settings.EMBEDDING_MODEL, processed_query),
+            lambda: self.embedding_service.embed_text(processed_query),
+        )
+
+        def search() -> dict | None:
+            results = self.vector_store.search(
+                query_embedding=query_embedding,
+                n_results=n_results,
+                min_score=settings.MIN_SIMILARITY_SCORE,
+            )
+            return {"n_results": n_results, "results": results} if results else None
+
+        # Candidates are shared by every n_results (and either generation mode)
+        # up to the size they were fetched at; a larger request refills the entry
+        key = self._embedding_key(query_embedding)
+        candidates = self.stage_caches["retrieval"].get_or_set(key, search)
+        if (
+            candidates is not None
+            and candidates["n_results"] < n_results
+            and len(candidates["results"]) >= candidates["n_results"]
+        ):
+            candidates = search()
+            if candidates is not None:
+                self.stage_caches["retrieval"].set(key, candidates)
+        return candidates["results"][:n_results] if candidates else []
+
+    def _search_sparse(self, query: str, n_results: int) -> list[SearchResult]:
+        """BM25 search over conversation contexts."""
+        hits = self.sparse_index.search(query, n_results=n_results)
+        conversations = {
+            conv.id: conv for conv in self.vector_store.get_by_ids([conv_id for conv_id, _ in hits])
+        }
+
+        results = []
+        for conv_id, score in hits:
+            if conv_id in conversations:
+                results.append(
+                    SearchResult(
+                        conversation=conversations[conv_id], score=score, rank=len(results) + 1
+                    )
+                )
+        return results
+
+    def _fetch_size(self, n_results: int) -> int:
+        """Number of candidates to retrieve for n_results final results."""
+        if self.reranker and self.reranker.is_available():
+            # The rerank cascade prunes a wider pool, so recall can grow
+            # without multiplying cross-encoder cost
+            if settings.RERANKER_CASCADE_ENABLED:
+                return max(n_results * 3, 15, settings.RERANKER_CASCADE_POOL)
+            return max(n_results * 3, 15)
+        return n_results
+
+    @staticmethod
+    def _embedding_key(embedding: np.ndarray) -> str:
+        """Cache key for a query embedding, namespaced by the embedding model."""
+        digest = hashlib.sha256(np.asarray(embedding, dtype=np.float32).tobytes()).hexdigest()
+        return f"{settings.EMBEDDING_MODEL}:{digest}"
+
     def _generate_simple(self, search_results: list[SearchResult]) -> str:
         """Generate simple response (best match)."""
         if not search_results:
@@ -256,30 +711,40 @@ class ChatbotService:
         logger.debug(f"Using best match (score: {best_match.score:.3f})")
         return best_match.conversation.response
 
+    def _build_prompt(
+        self, request: ChatRequest, session_id: str, search_results: list[SearchResult]
+    ) -> BuiltPrompt:
+        """Fit query, examples, memory and history into the prompt token budget."""
+        memory_context = self.summarizing_memory.get_context(
+            session_id=session_id,
+            include_summary=True,
+        )
+        prompt = self.prompt_builder.build(
+            system=SYSTEM_PROMPT,
+            query=request.message,
+            examples=self._format_examples(search_results),
+            memory=memory_context,
+            history=request.conversation_history,
+        )
+
+        if prompt.truncated:
+            logger.debug(f"Prompt cut to budget: {', '.join(prompt.truncated)}")
+        log_metric("prompt_tokens", prompt.tokens["total"])
+        return prompt
+
     def _generate_with_llm(
         self,
-        query: str,
-        context: list[SearchResult],
-        history: list | None = None,
-        memory_context: str = "",
+        prompt: BuiltPrompt,
+        search_results: list[SearchResult],
         temperature: float = 0.7,
         max_tokens: int = 500,
     ) -> str:
-        """Generate response using LLM with conversation memory context."""
+        """Generate response using LLM, falling back to the best match on failure."""
         try:
-            context_text = self._build_context(context)
-
-            # Inject memory context into the prompt if available
-            if memory_context:
-                context_text = (
-                    f"Previous conversation:\n{memory_context}\n\n"
-                    f"Relevant Reddit conversations:\n{context_text}"
-                )
-
             response = self.llm_service.generate(
-                query=query,
-                context=context_text,
-                history=history or [],
+                query=prompt.query,
+                context=self._llm_context(prompt),
+                history=prompt.history,
                 temperature=temperature,
                 max_tokens=max_tokens,
             )
@@ -287,13 +752,32 @@ class ChatbotService:
             logger.debug(f"Generated LLM response ({len(response)} chars)")
             return response
 
+        except LLMOverloaded as e:
+            if not settings.LLM_OVERLOAD_FALLBACK:
+                raise
+            logger.warning(f"LLM overloaded: {e!s}, falling back to simple")
+            log_metric("llm_overload_fallback", 1)
+            return self._generate_simple(search_results)
+
         except Exception as e:
             logger.warning(f"LLM generation failed: {e!s}, falling back to simple")
-            return self._generate_simple(context)
+            return self._generate_simple(search_results)
+
+    def _llm_context(self, prompt: BuiltPrompt) -> str:
+        """Context passed to the LLM: retrieved examples, plus memory when available."""
+        context_text = "\n\n".join(prompt.examples)
+
+        # Inject memory context into the prompt if available
+        if prompt.memory:
+            context_text = (
+                f"Previous conversation:\n{prompt.memory}\n\n"
+                f"Relevant Reddit conversations:\n{context_text}"
+            )
+        return context_text
 
-    def _build_context(self, search_results: list[SearchResult]) -> str:
-        """Build context string from search results."""
-        context_parts = []
+    def _format_examples(self, search_results: list[SearchResult]) -> list[str]:
+        """Format the top search results as prompt examples, best first."""
+        examples = []
 
         for i, result in enumerate(search_results[:3], 1):
             conv = result.conversation
@@ -301,33 +785,52 @@ class ChatbotService:
                 score_label = f"{result.score:.0%}"
             else:
                 score_label = f"{result.score:.3f}"
-            context_parts.append(
+            examples.append(
                 f"Example {i} (relevance: {score_label}):\nQ: {conv.context}\nA: {conv.response}"
             )
 
-        return "\n\n".join(context_parts)
+        return examples
 
-    def _summarize_with_llm(self, text: str) -> str | None:
+    def _summarize_with_llm(self, text: str, previous_summary: str | None = None) -> str | None:
         """
         Summarize conversation history using the LLM.
-        Used by SummarizingMemory when the history exceeds the threshold.
+        Used by SummarizingMemory (in its background worker) when the history
+        exceeds the threshold; new messages are folded into the previous summary.
         """
         if not self.llm_service.is_available():
             return None
 
-        try:
-            summary = self.llm_service.generate(
-                query="Summarize the following conversation in 2-3 concise sentences:",
-                context=text,
-                history=[],
-                temperature=0.3,
-                max_tokens=150,
+        if previous_summary:
+            query = (
+                "Update this conversation summary with the new messages, in 2-3 concise sentences:"
             )
+            text = f"Summary so far:\n{previous_summary}\n\nNew messages:\n{text}"
+        else:
+            query = "Summarize the following conversation in 2-3 concise sentences:"
+
+        try:
+            # Interactive requests get LLM slots first
+            with llm_priority(Priority.BACKGROUND):
+                summary = self.llm_service.generate(
+                    query=query,
+                    context=text,
+                    history=[],
+                    temperature=0.3,
+                    max_tokens=150,
+                )
             return summary
         except Exception as e:
             logger.warning(f"Failed to summarize conversation: {e}")
             return None
 
+    def close(self) -> None:
+        """Stop the background workers of the service (BM25 pool, summarizer)."""
+        with self._sparse_pool_lock:
+            if self._sparse_pool is not None:
+                self._sparse_pool.shutdown(wait=False, cancel_futures=True)
+                self._sparse_pool = None
+        self.summarizing_memory.close()
+
     def get_stats(self) -> dict:
         """Get chatbot statistics including cache and memory info."""
         try:
@@ -336,11 +839,21 @@ class ChatbotService:
                 "embedding_model": settings.EMBEDDING_MODEL,
                 "llm_model": settings.LLM_MODEL,
                 "llm_available": self.llm_service.is_available(),
+                "llm_stats": self.llm_service.get_stats(),
+                "llm_queue_stats": get_llm_queue_stats(),
+                "llm_health": get_llm_health_monitor().get_stats(),
                 "reranker_enabled": bool(self.reranker and self.reranker.is_available()),
                 "reranker_model": settings.RERANKER_MODEL if self.reranker else None,
                 "cache_enabled": self.cache.enabled,
                 "cache_stats": self.cache.get_stats(),
+                "stage_cache_stats": {
+                    stage: cache.get_stats() for stage, cache in self.stage_caches.items()
+                },
+                "reranker_stats": self.reranker.get_stats() if self.reranker else None,
+                "rerank_policy_stats": self.rerank_policy.get_stats(),
+                "sparse_index_stats": self.sparse_index.get_stats() if self.sparse_index else None,
                 "memory_stats": self.memory.get_stats(),
+                "summary_stats": self.summarizing_memory.get_stats(),
             }
 
             logger.debug(f"Stats: {stats}")
@@ -375,6 +888,19 @@ class ChatbotService:
         return health
 
 
+def get_response_cache() -> CacheService:
+    """Get the shared chat response cache configured from settings."""
+    return get_cache_service(
+        backend_type=settings.CACHE_BACKEND,
+        redis_url=settings.REDIS_URL,
+        enabled=settings.ENABLE_CACHING,
+        single_flight=settings.CACHE_SINGLE_FLIGHT,
+        lock_timeout=settings.CACHE_LOCK_TIMEOUT,
+        sqlite_path=settings.CACHE_SQLITE_PATH,
+        max_size=settings.CACHE_MAX_SIZE,
+    )
+
+
 # Singleton instance with lazy initialization
 _chatbot_service: ChatbotService | None = None
 
@@ -385,3 +911,11 @@ def get_chatbot_service() -> ChatbotService:
     if _chatbot_service is None:
         _chatbot_service = ChatbotService()
     return _chatbot_service
+
+
+def close_chatbot_service() -> None:
+    """Close the chatbot service singleton, if it was created."""
+    global _chatbot_service
+    if _chatbot_service is not None:
+        _chatbot_service.close()
+        _chatbot_service = None
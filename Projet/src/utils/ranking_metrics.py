@@ -0,0 +1,67 @@
+"""
+Ranking Metrics - Professional Reddit RAG Chatbot
+Agreement between two scorings of the same candidates (e.g. torch vs ONNX reranker)
+"""
+
+import numpy as np
+
+
+def kendall_tau(reference: list[float], candidate: list[float]) -> float:
+    """
+    Kendall rank correlation (tau-b, tie-aware) between two scorings.
+
+    Args:
+        reference: Reference scores.
+        candidate: Scores to compare, same order of items.
+
+    Returns:
+        Correlation in [-1, 1] (1.0 for fewer than two items).
+    """
+    a = np.asarray(reference, dtype=np.float64)
+    b = np.asarray(candidate, dtype=np.float64)
+    if a.shape != b.shape:
+        raise ValueError("Score lists must have the same length")
+    if len(a) < 2:
+        return 1.0
+
+    i, j = np.triu_indices(len(a), k=1)
+    da = np.sign(a[i] - a[j])
+    db = np.sign(b[i] - b[j])
+
+    concordance = float(np.sum(da * db))
+    # Pairs not tied in each scoring
+    n_a = np.count_nonzero(da)
+    n_b = np.count_nonzero(db)
+    if n_a == 0 or n_b == 0:
+        return 1.0 if n_a == n_b else 0.0
+    return concordance / float(np.sqrt(n_a * n_b))
+
+
+def ndcg_at_k(reference: list[float], candidate: list[float], k: int) -> float:
+    """
+    NDCG@k of the candidate ordering, using reference ranks as graded relevance.
+
+    The item ranked first by the reference gets gain n, the last gets 1.
+
+    Args:
+        reference: Reference scores.
+        candidate: Scores to compare, same order of items.
+        k: Cut-off.
+
+    Returns:
+        NDCG in [0, 1].
+    """
+    a = np.asarray(reference, dtype=np.float64)
+    b = np.asarray(candidate, dtype=np.float64)
+    if a.shape != b.shape:
+        raise ValueError("Score lists must have the same length")
+    if len(a) == 0:
+        return 1.0
+
+    gains = np.empty(len(a))
+    gains[np.argsort(-a, kind="stable")] = np.arange(len(a), 0, -1)
+    discounts = 1.0 / np.log2(np.arange(2, min(k, len(a)) + 2))
+
+    ideal = np.sort(gains)[::-1][: len(discounts)]
+    actual = gains[np.argsort(-b, kind="stable")][: len(discounts)]
+    return float(np.dot(actual, discounts) / np.dot(ideal, discounts))
@@ -4,7 +4,9 @@ Pytest configuration and shared fixtures.
 
 import json
 import os
+import shutil
 import sys
+import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -14,6 +16,19 @@ import pytest
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+# Keep test runs out of the real logs/ and data/ directories. Set before
+# src.config.settings is first imported, which reads them once.
+TEST_DATA_DIR = Path(tempfile.mkdtemp(prefix="rag-chatbot-tests-"))
+os.environ["LOGS_DIR"] = str(TEST_DATA_DIR / "logs")
+os.environ["DATA_DIR"] = str(TEST_DATA_DIR)
+os.environ["VECTOR_DB_DIR"] = str(TEST_DATA_DIR / "vector_db")
+os.environ["LOG_FILE"] = str(TEST_DATA_DIR / "logs" / "app.log")
+os.environ["CHROMA_PERSIST_DIRECTORY"] = str(TEST_DATA_DIR / "vector_db" / "chroma_db")
+os.environ["SPARSE_INDEX_DIR"] = str(TEST_DATA_DIR / "vector_db" / "bm25")
+os.environ["INDEX_EPOCH_FILE"] = str(TEST_DATA_DIR / "vector_db" / "index_epoch")
+os.environ["CACHE_SQLITE_PATH"] = str(TEST_DATA_DIR / "cache.sqlite3")
+os.environ["QUERY_LOG_FILE"] = str(TEST_DATA_DIR / "query_log.jsonl")
+
 
 # =============================================================================
 # Environment Fixtures
@@ -26,6 +41,8 @@ def set_test_environment():
     os.environ["ENVIRONMENT"] = "test"
     os.environ["DEBUG"] = "false"
     os.environ["LOG_LEVEL"] = "WARNING"
+    yield
+    shutil.rmtree(TEST_DATA_DIR, ignore_errors=True)
 
 
 # =============================================================================
@@ -2,6 +2,9 @@
 Integration tests for the FastAPI application.
 """
 
+import asyncio
+import threading
+import time
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -31,6 +34,17 @@ def mock_chatbot_service():
             },
         },
     )
+    mock_service.chat_stream.return_value = iter(
+        [
+            {"event": "sources", "data": {"sources": []}},
+            {"event": "token", "data": {"text": "This is "}},
+            {"event": "token", "data": {"text": "a test response."}},
+            {
+                "event": "done",
+                "data": {"message": "This is a test response.", "metadata": {"streamed": True}},
+            },
+        ]
+    )
     mock_service.health_check.return_value = {
         "status": "healthy",
         "embedding_service": "healthy",
@@ -98,6 +112,64 @@ class TestChatEndpoint:
         response = client.post("/api/v1/chat/", json={})
         assert response.status_code == 422
 
+    @pytest.mark.integration
+    def test_chat_endpoint_llm_overloaded(self, client, mock_chatbot_service):
+        """Test an overloaded LLM is reported as 503 with Retry-After."""
+        from src.core.llm_dispatcher import LLMOverloaded
+
+        mock_chatbot_service.chat.side_effect = LLMOverloaded("queue full")
+        response = client.post("/api/v1/chat/", json={"message": "Hello"})
+        assert response.status_code == 503
+        assert "Retry-After" in response.headers
+
+    @pytest.mark.integration
+    def test_chat_stream_endpoint(self, client):
+        """Test streaming endpoint sends SSE events in order."""
+        response = client.post("/api/v1/chat/stream", json={"message": "Hello"})
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+
+        events = [
+            line.removeprefix("event: ")
+            for line in response.text.splitlines()
+            if line.startswith("event: ")
+        ]
+        assert events == ["sources", "token", "token", "done"]
+
+    @pytest.mark.integration
+    async def test_chat_stream_closed_on_client_disconnect(self, mock_chatbot_service):
+        """Test the event stream is closed, releasing its LLM slot, when the client leaves."""
+        from api.routes.chat import chat_stream
+        from src.models.schemas import ChatRequest
+
+        closed = threading.Event()
+
+        def events():
+            try:
+                while True:
+                    yield {"event": "token", "data": {"text": "token "}}
+                    time.sleep(0.01)
+            finally:
+                closed.set()
+
+        mock_chatbot_service.chat_stream.return_value = events()
+        with patch("api.routes.chat.get_chatbot_service", return_value=mock_chatbot_service):
+            response = await chat_stream(ChatRequest(message="Hello"))
+
+        first_chunk = asyncio.Event()
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                first_chunk.set()
+
+        async def receive():
+            await first_chunk.wait()
+            return {"type": "http.disconnect"}
+
+        await response({"type": "http", "asgi": {"spec_version": "2.0"}}, receive, send)
+
+        assert closed.is_set()
+
     @pytest.mark.integration
     def test_chat_stats_endpoint(self, client):
         """Test chat stats endpoint."""
@@ -126,6 +198,37 @@ class TestHealthEndpoints:
         response = client.get("/api/v1/health/live")
         assert response.status_code == 200
 
+    @pytest.mark.integration
+    def test_ready_endpoint_waits_for_cache_warmup(self, client):
+        """Test readiness is withheld while the cache is warming up."""
+        from src.core.warmup import CacheWarmer
+
+        warmer = CacheWarmer()
+        warmer._ready.clear()
+        with patch("api.routes.health.get_cache_warmer", return_value=warmer):
+            response = client.get("/api/v1/health/ready")
+
+        assert response.json() == {"ready": False, "reason": "Cache warm-up in progress"}
+
+    @pytest.mark.integration
+    def test_health_reports_cached_llm_providers(self, client):
+        """Test /health includes the monitor's cached per-provider state."""
+        from src.core.llm_health import LLMHealthMonitor
+
+        service = MagicMock(provider="ollama", model="model")
+        service.refresh_availability.return_value = True
+        monitor = LLMHealthMonitor(interval=0)
+        monitor.watch(service)
+        monitor.probe_all()
+        service.refresh_availability.reset_mock()
+
+        with patch("api.routes.health.get_llm_health_monitor", return_value=monitor):
+            response = client.get("/api/v1/health/")
+
+        providers = response.json()["components"]["llm_service"]["providers"]
+        assert providers["ollama/model"]["available"] is True
+        service.refresh_availability.assert_not_called()
+
 
 class TestAPIDocumentation:
     """Tests for API documentation endpoints."""
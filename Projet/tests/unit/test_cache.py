@@ -0,0 +1,395 @@
+"""
+Unit tests for the caching module.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.core.cache import (
+    CacheService,
+    IndexEpoch,
+    InMemoryCache,
+    SingleFlight,
+    SQLiteCache,
+    make_cache_key,
+    normalize_query,
+)
+
+
+class TestSingleFlight:
+    """Tests for SingleFlight request coalescing."""
+
+    @pytest.mark.unit
+    def test_concurrent_calls_share_one_computation(self):
+        """Test concurrent callers for a key run the function once."""
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+        results = []
+
+        def compute():
+            calls.append(1)
+            release.wait(timeout=2)
+            return "value"
+
+        def worker():
+            results.append(flight.do("key", compute))
+
+        threads = [threading.Thread(target=worker) for _ in range(5)]
+        for t in threads:
+            t.start()
+        time.sleep(0.1)
+        release.set()
+        for t in threads:
+            t.join(timeout=2)
+
+        assert len(calls) == 1
+        assert [value for value, _ in results] == ["value"] * 5
+        assert sum(1 for _, shared in results if shared) == 4
+        assert flight.in_flight == 0
+
+    @pytest.mark.unit
+    def test_errors_propagate_to_waiters(self):
+        """Test waiters receive the leader's exception."""
+        flight = SingleFlight()
+
+        def fail():
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            flight.do("key", fail)
+        assert flight.in_flight == 0
+
+
+class TestCacheService:
+    """Tests for CacheService."""
+
+    @pytest.fixture
+    def cache(self):
+        """Create cache service with in-memory backend."""
+        return CacheService(backend=InMemoryCache())
+
+    @pytest.mark.unit
+    def test_get_or_set_caches_value(self, cache):
+        """Test factory result is cached."""
+        assert cache.get_or_set("k", lambda: {"a": 1}) == {"a": 1}
+        assert cache.fetch("k", lambda: {"a": 2}) == ({"a": 1}, "hit")
+
+    @pytest.mark.unit
+    def test_concurrent_misses_are_coalesced(self, cache):
+        """Test a stampede on one key computes once and counts saved work."""
+        calls = []
+        statuses = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.2)
+            return {"answer": 42}
+
+        def worker():
+            statuses.append(cache.fetch("hot", factory)[1])
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=2)
+
+        assert len(calls) == 1
+        assert statuses.count("miss") == 1
+        assert cache.get_stats()["coalesced"] == 7
+
+    @pytest.mark.unit
+    def test_waits_for_lock_held_by_other_worker(self):
+        """Test a caller waits for the value when another worker holds the lock."""
+        backend = InMemoryCache()
+        backend.acquire_lock = lambda key, ttl=30.0: None
+        cache = CacheService(backend=backend, lock_timeout=1.0)
+
+        threading.Timer(0.1, backend.set, args=("k", "remote")).start()
+        value, status = cache.fetch("k", lambda: "local")
+
+        assert value == "remote"
+        assert status == "coalesced"
+
+    @pytest.mark.unit
+    def test_claim_hands_stored_value_to_waiters(self, cache):
+        """Test a caller computing a value itself still coalesces fetch() misses."""
+        results = []
+
+        with cache.claim("k") as (value, store):
+            assert value is None
+            waiter = threading.Thread(target=lambda: results.append(cache.fetch("k", lambda: 2)))
+            waiter.start()
+            time.sleep(0.1)
+            store(1)
+        waiter.join(timeout=2)
+
+        assert results == [(1, "coalesced")]
+        assert cache.peek("k", lambda: 3) == (1, "hit")
+
+    @pytest.mark.unit
+    def test_abandoned_claim_lets_waiters_compute(self, cache):
+        """Test waiters compute the value when the claiming caller leaves without it."""
+        results = []
+
+        with cache.claim("k"):
+            waiter = threading.Thread(target=lambda: results.append(cache.fetch("k", lambda: 2)))
+            waiter.start()
+            time.sleep(0.1)
+        waiter.join(timeout=2)
+
+        assert results == [(2, "miss")]
+
+    @pytest.mark.unit
+    def test_disabled_cache_always_computes(self):
+        """Test disabled cache calls the factory every time."""
+        cache = CacheService(enabled=False)
+        assert cache.fetch("k", lambda: 1) == (1, "miss")
+        assert cache.fetch("k", lambda: 2) == (2, "miss")
+
+
+class TestStaleWhileRevalidate:
+    """Tests for soft/hard TTL handling in CacheService."""
+
+    @pytest.mark.unit
+    def test_stale_value_served_and_refreshed_once(self, monkeypatch):
+        """Test a stale entry is returned immediately and refreshed in the background."""
+        cache = CacheService(backend=InMemoryCache())
+        cache.fetch("k", lambda: "v1", ttl=10, stale_ttl=60)
+
+        # Move past the soft TTL but stay within the hard TTL
+        now = time.time()
+        monkeypatch.setattr("src.core.cache.time.time", lambda: now + 30)
+
+        refreshed = threading.Event()
+        calls = []
+
+        def factory():
+            calls.append(1)
+            time.sleep(0.05)
+            refreshed.set()
+            return "v2"
+
+        first = cache.fetch("k", factory, ttl=10, stale_ttl=60)
+        second = cache.fetch("k", factory, ttl=10, stale_ttl=60)
+
+        assert first == ("v1", "stale")
+        assert second == ("v1", "stale")
+        assert refreshed.wait(timeout=2)
+        time.sleep(0.05)
+        assert len(calls) == 1
+        assert cache.fetch("k", factory, ttl=10, stale_ttl=60) == ("v2", "hit")
+        assert cache.get_stats()["stale_served"] == 2
+
+    @pytest.mark.unit
+    def test_hard_expiry_is_a_miss(self, monkeypatch):
+        """Test entries past the hard TTL are recomputed synchronously."""
+        cache = CacheService(backend=InMemoryCache())
+        cache.fetch("k", lambda: "v1", ttl=10, stale_ttl=60)
+
+        now = time.time()
+        monkeypatch.setattr("src.core.cache.time.time", lambda: now + 120)
+
+        assert cache.fetch("k", lambda: "v2", ttl=10, stale_ttl=60) == ("v2", "miss")
+
+    @pytest.mark.unit
+    def test_get_unwraps_envelope(self):
+        """Test plain get returns the wrapped value."""
+        cache = CacheService(backend=InMemoryCache())
+        cache.get_or_set("k", lambda: {"a": 1}, ttl=10, stale_ttl=60)
+        assert cache.get("k") == {"a": 1}
+
+    @pytest.mark.unit
+    def test_set_with_stale_ttl_is_served_stale(self, monkeypatch):
+        """Test values written with set(stale_ttl=...) get the same soft expiry as fetch."""
+        cache = CacheService(backend=InMemoryCache())
+        cache.set("k", "v1", ttl=10, stale_ttl=60)
+
+        now = time.time()
+        monkeypatch.setattr("src.core.cache.time.time", lambda: now + 30)
+
+        assert cache.fetch("k", lambda: "v2", ttl=10, stale_ttl=60) == ("v1", "stale")
+
+
+class TestInMemoryCache:
+    """Tests for InMemoryCache."""
+
+    @pytest.mark.unit
+    def test_concurrent_access_keeps_lru_consistent(self):
+        """Test threads reading and evicting at once never corrupt the LRU order."""
+        cache = InMemoryCache(max_size=50)
+        errors = []
+
+        def worker(offset):
+            try:
+                for i in range(2000):
+                    key = f"k{(i * 7 + offset) % 200}"
+                    cache.set(key, i)
+                    cache.get(f"k{(i + offset) % 200}")
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=10)
+
+        assert errors == []
+        assert len(cache._cache) <= 50
+        assert set(cache._access_times) == set(cache._cache)
+
+
+class TestInMemoryCacheSnapshot:
+    """Tests for InMemoryCache snapshot persistence."""
+
+    @pytest.mark.unit
+    def test_snapshot_round_trip_skips_expired(self, tmp_path, monkeypatch):
+        """Test live entries survive a restart and expired ones are dropped."""
+        cache = InMemoryCache()
+        cache.set("live", {"message": "hi"}, ttl=3600)
+        cache.set("short", "soon gone", ttl=5)
+        cache.set("opaque", object(), ttl=3600)
+
+        path = tmp_path / "snapshot.json"
+        assert cache.save_snapshot(path) == 2
+
+        now = time.time()
+        monkeypatch.setattr("src.core.cache.time.time", lambda: now + 60)
+
+        restored = InMemoryCache()
+        assert restored.load_snapshot(path) == 1
+        assert restored.get("live") == {"message": "hi"}
+        assert restored.get("short") is None
+
+    @pytest.mark.unit
+    def test_load_missing_snapshot(self, tmp_path):
+        """Test loading a missing snapshot is a no-op."""
+        assert InMemoryCache().load_snapshot(tmp_path / "missing.json") == 0
+
+
+class TestSQLiteCache:
+    """Tests for the SQLite disk-backed cache."""
+
+    @pytest.fixture
+    def db_path(self, tmp_path):
+        """Temporary database path."""
+        return tmp_path / "cache.sqlite3"
+
+    @pytest.mark.unit
+    def test_set_and_get(self, db_path):
+        """Test values round-trip through JSON."""
+        cache = SQLiteCache(path=db_path)
+        assert cache.set("k", {"message": "hi", "sources": []})
+        assert cache.get("k") == {"message": "hi", "sources": []}
+        assert cache.exists("k")
+        assert cache.delete("k")
+        assert cache.get("k") is None
+
+    @pytest.mark.unit
+    def test_shared_between_instances(self, db_path):
+        """Test two workers opening the same file see each other's writes."""
+        SQLiteCache(path=db_path).set("k", "shared")
+        assert SQLiteCache(path=db_path).get("k") == "shared"
+
+    @pytest.mark.unit
+    def test_ttl_expiry(self, db_path, monkeypatch):
+        """Test expired entries are not returned."""
+        cache = SQLiteCache(path=db_path)
+        cache.set("k", "v", ttl=5)
+
+        now = time.time()
+        monkeypatch.setattr("src.core.cache.time.time", lambda: now + 10)
+        assert cache.get("k") is None
+
+    @pytest.mark.unit
+    def test_size_bounded_eviction(self, db_path):
+        """Test least recently used entries are evicted beyond max_size."""
+        cache = SQLiteCache(path=db_path, max_size=50)
+        for i in range(SQLiteCache._EVICT_EVERY):
+            cache.set(f"k{i}", i)
+
+        assert cache.get_stats()["size"] == 50
+        assert cache.get("k0") is None
+        assert cache.get(f"k{SQLiteCache._EVICT_EVERY - 1}") == SQLiteCache._EVICT_EVERY - 1
+
+    @pytest.mark.unit
+    def test_lock_is_exclusive_across_instances(self, db_path):
+        """Test only one worker holds a key's lock at a time."""
+        first, second = SQLiteCache(path=db_path), SQLiteCache(path=db_path)
+
+        token = first.acquire_lock("k")
+        assert token is not None
+        assert second.acquire_lock("k") is None
+
+        first.release_lock("k", token)
+        assert second.acquire_lock("k") is not None
+
+    @pytest.mark.unit
+    def test_usable_from_threads(self, db_path):
+        """Test each thread gets its own connection."""
+        cache = SQLiteCache(path=db_path)
+        errors = []
+
+        def worker(n):
+            try:
+                cache.set(f"k{n}", n)
+                assert cache.get(f"k{n}") == n
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=2)
+
+        assert errors == []
+
+
+class TestCacheKeys:
+    """Tests for query normalization and index-epoch namespacing."""
+
+    @pytest.mark.unit
+    def test_normalize_query_variants(self):
+        """Test trivial variants of a query normalize to the same form."""
+        expected = "what phone should i buy"
+        assert normalize_query("What phone should I buy?") == expected
+        assert normalize_query("  what   PHONE should\ti buy ?! ") == expected
+        assert normalize_query("\uff37hat phone should I buy...") == expected
+
+    @pytest.mark.unit
+    def test_normalize_query_keeps_inner_punctuation(self):
+        """Test only trailing sentence punctuation is trimmed."""
+        assert normalize_query("C++ vs. Rust?") == "c++ vs. rust"
+        assert normalize_query("???") == "???"
+
+    @pytest.mark.unit
+    def test_normalize_query_keeps_distinct_questions_apart(self):
+        """Test symbols and leading punctuation still tell questions apart."""
+        assert len({normalize_query(q) for q in ("C++", "C#", "C")}) == 3
+        assert normalize_query("?") != normalize_query("!!")
+        assert normalize_query("¿Qué teléfono?") == "¿qué teléfono"
+
+    @pytest.mark.unit
+    def test_make_cache_key_namespace(self):
+        """Test namespaces prefix the key and separate generations."""
+        key = make_cache_key("q", namespace="idx1")
+        assert key.startswith("idx1:")
+        assert key != make_cache_key("q", namespace="idx2")
+        assert key.split(":", 1)[1] == make_cache_key("q")
+
+    @pytest.mark.unit
+    def test_index_epoch_bump(self, tmp_path):
+        """Test bumps are seen by other readers of the same file."""
+        path = tmp_path / "index_epoch"
+        writer = IndexEpoch(path)
+        reader = IndexEpoch(path, check_interval=0)
+
+        assert reader.current() == 0
+        assert writer.bump() == 1
+        assert writer.bump() == 2
+        assert reader.current() == 2
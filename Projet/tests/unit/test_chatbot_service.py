@@ -2,6 +2,9 @@
 Unit Tests - Chatbot Service
 """
 
+import contextlib
+import threading
+import time
 from unittest.mock import Mock, patch
 
 import numpy as np
@@ -28,6 +31,11 @@ class TestChatbotService:
         cache_service.enabled = True
         cache_service.get.return_value = None
         cache_service.set.return_value = None
+        cache_service.fetch.side_effect = lambda key, factory, **kwargs: (factory(), "miss")
+        cache_service.peek.return_value = None
+        cache_service.claim.side_effect = lambda key, **kwargs: contextlib.nullcontext(
+            (None, lambda value: cache_service.set(key, value))
+        )
         cache_service.get_stats.return_value = {}
         memory.get_or_create_session.return_value = Mock(session_id="test-session")
         memory.add_message.return_value = None
@@ -103,6 +111,211 @@ class TestChatbotService:
         assert "Pixel" in response.message
         llm_service.generate.assert_called_once()
 
+    def test_llm_prompt_fitted_to_token_budget(self, chatbot_service, mock_services):
+        """Test long examples are cut to the prompt budget and counted in metadata"""
+        embedding_service, vector_store, llm_service, _cache, _memory = mock_services
+
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        long_answer = "Pixel phones have great cameras. " * 200
+        vector_store.search.return_value = [
+            SearchResult(
+                conversation=Conversation(id=i, context="What phone?", response=long_answer),
+                score=0.9,
+                rank=i,
+            )
+            for i in range(1, 4)
+        ]
+        llm_service.is_available.return_value = True
+        llm_service.generate.return_value = "Get a Pixel."
+        chatbot_service.prompt_builder.max_input_tokens = 500
+
+        response = chatbot_service.chat(ChatRequest(message="What phone?", use_llm=True))
+
+        prompt = response.metadata["prompt"]
+        assert prompt["tokens"]["total"] <= 500
+        assert "examples" in prompt["truncated"]
+        context = llm_service.generate.call_args.kwargs["context"]
+        assert context.rstrip().endswith(".")
+
+    def test_chat_stream_sends_sources_then_tokens(self, chatbot_service, mock_services):
+        """Test streaming yields sources, the best-match preview, then tokens, and caches the text"""
+        embedding_service, vector_store, llm_service, cache, memory = mock_services
+
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        conv = Conversation(id=1, context="What phone?", response="I recommend Pixel")
+        vector_store.search.return_value = [SearchResult(conversation=conv, score=0.95, rank=1)]
+
+        llm_service.is_available.return_value = True
+        llm_service.generate_stream.return_value = iter(["Get ", "a ", "Pixel."])
+
+        request = ChatRequest(message="What phone should I buy?", use_llm=True)
+        events = list(chatbot_service.chat_stream(request))
+
+        assert [e["event"] for e in events] == [
+            "sources",
+            "preview",
+            "token",
+            "token",
+            "token",
+            "done",
+        ]
+        assert events[0]["data"]["sources"][0]["conversation"]["id"] == 1
+        assert events[1]["data"]["text"] == "I recommend Pixel"
+        done = events[-1]["data"]
+        assert done["message"] == "Get a Pixel."
+        assert done["metadata"]["streamed"] is True
+        assert done["metadata"]["cache_hit"] is False
+        assert done["metadata"]["first_content_ms"] <= done["metadata"]["duration_ms"]
+
+        cached = cache.set.call_args.args[1]
+        assert cached["message"] == "Get a Pixel."
+        memory.add_message.assert_called_with("test-session", "assistant", "Get a Pixel.")
+
+    def test_chat_stream_with_mock_provider(self, chatbot_service, mock_services):
+        """Test the whole LLM streaming path offline with the mock provider"""
+        from src.core.llm_handler import LLMService
+
+        embedding_service, vector_store, _llm, _cache, _memory = mock_services
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        conv = Conversation(id=1, context="What phone?", response="I recommend Pixel")
+        vector_store.search.return_value = [SearchResult(conversation=conv, score=0.95, rank=1)]
+
+        with (
+            patch("src.config.settings.settings.MOCK_LLM_TTFT_MS", 0.0),
+            patch("src.config.settings.settings.MOCK_LLM_TOKENS_PER_SEC", 0.0),
+        ):
+            chatbot_service.llm_service = LLMService(provider="mock")
+
+        request = ChatRequest(message="What phone?", use_llm=True, max_tokens=30)
+        events = list(chatbot_service.chat_stream(request))
+
+        tokens = [e["data"]["text"] for e in events if e["event"] == "token"]
+        assert len(tokens) == 30
+        assert events[-1]["data"]["message"] == "".join(tokens)
+        assert "Pixel" in events[-1]["data"]["message"]
+
+    def test_chat_stream_cache_hit(self, chatbot_service, mock_services):
+        """Test a cached response is streamed without retrieval or generation"""
+        _embedding_service, vector_store, llm_service, cache, _memory = mock_services
+
+        cache.peek.return_value = (
+            {"message": "Cached answer", "sources": [], "metadata": {"method": "llm"}},
+            "hit",
+        )
+
+        events = list(chatbot_service.chat_stream(ChatRequest(message="Hello", use_llm=True)))
+
+        assert [e["event"] for e in events] == ["sources", "token", "done"]
+        assert events[-1]["data"]["message"] == "Cached answer"
+        assert events[-1]["data"]["metadata"]["cache_hit"] is True
+        vector_store.search.assert_not_called()
+        llm_service.generate_stream.assert_not_called()
+
+    def test_chat_stream_coalesces_concurrent_misses(self, chatbot_service, mock_services):
+        """Test concurrent streams of the same query run the LLM once"""
+        from src.core.cache import CacheService, InMemoryCache
+
+        embedding_service, vector_store, llm_service, _cache, _memory = mock_services
+        chatbot_service.cache = CacheService(backend=InMemoryCache())
+
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        conv = Conversation(id=1, context="What phone?", response="I recommend Pixel")
+        vector_store.search.return_value = [SearchResult(conversation=conv, score=0.95, rank=1)]
+
+        def slow_stream(**_kwargs):
+            time.sleep(0.2)
+            yield "Get a Pixel."
+
+        llm_service.is_available.return_value = True
+        llm_service.generate_stream.side_effect = slow_stream
+
+        done = []
+
+        def stream():
+            events = list(chatbot_service.chat_stream(ChatRequest(message="Phone?", use_llm=True)))
+            done.append(events[-1]["data"])
+
+        threads = [threading.Thread(target=stream) for _ in range(2)]
+        for t in threads:
+            t.start()
+            time.sleep(0.05)
+        for t in threads:
+            t.join(timeout=5)
+
+        assert llm_service.generate_stream.call_count == 1
+        assert [d["message"] for d in done] == ["Get a Pixel."] * 2
+        assert sorted(d["metadata"]["coalesced"] for d in done) == [False, True]
+
+    def test_chat_stream_closed_early_releases_llm_slot(self, chatbot_service, mock_services):
+        """Test closing an abandoned stream frees the provider's concurrency slot"""
+        from src.core.llm_dispatcher import ConcurrencyLimiter, LLMDispatcher
+
+        embedding_service, vector_store, llm_service, _cache, _memory = mock_services
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        conv = Conversation(id=1, context="What phone?", response="I recommend Pixel")
+        vector_store.search.return_value = [SearchResult(conversation=conv, score=0.95, rank=1)]
+
+        def endless_stream(*_args):
+            while True:
+                yield "token "
+
+        llm_service.is_available.return_value = True
+        llm_service.generate_stream.side_effect = endless_stream
+        limiter = ConcurrencyLimiter("ollama", max_concurrent=1, max_queue=0)
+        chatbot_service.llm_service = LLMDispatcher(llm_service, limiter)
+
+        events = chatbot_service.chat_stream(ChatRequest(message="Phone?", use_llm=True))
+        assert next(e for e in events if e["event"] == "token")
+        assert limiter.get_stats()["active"] == 1
+
+        events.close()
+        assert limiter.get_stats()["active"] == 0
+
+    def test_chat_stream_falls_back_before_first_token(self, chatbot_service, mock_services):
+        """Test a provider failing before any token falls back to the best match"""
+        embedding_service, vector_store, llm_service, _cache, _memory = mock_services
+
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        conv = Conversation(id=1, context="What phone?", response="I recommend Pixel")
+        vector_store.search.return_value = [SearchResult(conversation=conv, score=0.95, rank=1)]
+
+        def failing_stream(**_kwargs):
+            raise ConnectionError("provider down")
+            yield
+
+        llm_service.is_available.return_value = True
+        llm_service.generate_stream.side_effect = failing_stream
+
+        events = list(chatbot_service.chat_stream(ChatRequest(message="Phone?", use_llm=True)))
+
+        assert events[-1]["data"]["message"] == "I recommend Pixel"
+
+    def test_chat_stream_overload_honors_fallback_setting(self, chatbot_service, mock_services):
+        """Test an overloaded LLM stream raises when LLM_OVERLOAD_FALLBACK is off"""
+        from src.core.llm_dispatcher import LLMOverloaded
+
+        embedding_service, vector_store, llm_service, _cache, _memory = mock_services
+
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        conv = Conversation(id=1, context="What phone?", response="I recommend Pixel")
+        vector_store.search.return_value = [SearchResult(conversation=conv, score=0.95, rank=1)]
+
+        def overloaded_stream(**_kwargs):
+            raise LLMOverloaded("queue full")
+            yield
+
+        llm_service.is_available.return_value = True
+        llm_service.generate_stream.side_effect = overloaded_stream
+
+        with (
+            patch("src.services.chatbot_service.settings.LLM_OVERLOAD_FALLBACK", False),
+            pytest.raises(LLMOverloaded),
+        ):
+            list(chatbot_service.chat_stream(ChatRequest(message="Phone?", use_llm=True)))
+
+        events = list(chatbot_service.chat_stream(ChatRequest(message="Phone?", use_llm=True)))
+        assert events[-1]["data"]["message"] == "I recommend Pixel"
+
     def test_chat_empty_message(self):
         """Test chat with empty message raises validation error"""
         with pytest.raises(ValidationError):
@@ -123,6 +336,207 @@ class TestChatbotService:
             "couldn't find" in response.message.lower() or "no relevant" in response.message.lower()
         )
 
+    def test_stage_caches_reused_across_request_variants(self, chatbot_service, mock_services):
+        """Test a new n_results/use_llm combination reuses embedding and retrieval"""
+        embedding_service, vector_store, _llm_service, _cache, _memory = mock_services
+
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        conv = Conversation(id=1, context="What phone?", response="I recommend Pixel")
+        vector_store.search.return_value = [SearchResult(conversation=conv, score=0.95, rank=1)]
+
+        chatbot_service.chat(ChatRequest(message="What phone should I buy?", n_results=5))
+        chatbot_service.chat(ChatRequest(message="What phone should I buy?", n_results=3))
+        chatbot_service.chat(
+            ChatRequest(message="What phone should I buy?", n_results=3, use_llm=True)
+        )
+
+        embedding_service.embed_text.assert_called_once()
+        vector_store.search.assert_called_once()
+        stage_stats = chatbot_service.get_stats()["stage_cache_stats"]
+        assert stage_stats["embedding"]["hits"] == 2
+        assert stage_stats["retrieval"]["hits"] == 2
+
+    def test_retrieval_cache_refilled_for_larger_requests(self, chatbot_service, mock_services):
+        """Test a cold miss fetches only n_results and a larger request refills the entry"""
+        embedding_service, vector_store, _llm_service, _cache, _memory = mock_services
+
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        convs = [Conversation(id=i, context="What phone?", response="Pixel") for i in range(5)]
+        vector_store.search.side_effect = lambda query_embedding, n_results, min_score: [
+            SearchResult(conversation=conv, score=0.9, rank=i + 1)
+            for i, conv in enumerate(convs[:n_results])
+        ]
+
+        for n_results in (3, 5, 3):
+            chatbot_service.chat(
+                ChatRequest(message="What phone should I buy?", n_results=n_results)
+            )
+
+        assert [c.kwargs["n_results"] for c in vector_store.search.call_args_list] == [3, 5]
+
+    def test_chat_coalesced_response(self, chatbot_service, mock_services):
+        """Test a coalesced miss reuses the shared response without recomputing"""
+        embedding_service, _vector_store, _llm_service, cache_service, memory = mock_services
+
+        shared = {
+            "message": "I recommend Pixel",
+            "sources": [],
+            "metadata": {"method": "simple", "session_id": "leader-session"},
+        }
+        cache_service.fetch.side_effect = None
+        cache_service.fetch.return_value = (shared, "coalesced")
+
+        request = ChatRequest(message="What phone should I buy?", use_llm=False)
+        response = chatbot_service.chat(request)
+
+        assert response.message == "I recommend Pixel"
+        assert response.metadata["coalesced"] is True
+        assert response.metadata["cache_hit"] is False
+        assert response.metadata["session_id"] == "test-session"
+        # The shared payload must not be mutated for other waiters
+        assert shared["metadata"]["session_id"] == "leader-session"
+        embedding_service.embed_text.assert_not_called()
+        memory.add_message.assert_called_with("test-session", "assistant", "I recommend Pixel")
+
+    def test_response_cache_key_normalized_and_epoch_scoped(
+        self, chatbot_service, mock_services, tmp_path
+    ):
+        """Test query variants share a key and re-indexing changes it"""
+        from src.core.cache import IndexEpoch
+
+        chatbot_service.index_epoch = IndexEpoch(tmp_path / "index_epoch", check_interval=0)
+        chatbot_service.stage_caches["retrieval"].set("candidates", ["cached"])
+
+        key = chatbot_service._response_cache_key(ChatRequest(message="What phone?"))
+        assert key == chatbot_service._response_cache_key(ChatRequest(message=" what  PHONE "))
+
+        IndexEpoch(tmp_path / "index_epoch").bump()
+
+        assert chatbot_service._response_cache_key(ChatRequest(message="What phone?")) != key
+        assert chatbot_service.stage_caches["retrieval"].get("candidates") is None
+
+    def test_rerank_policy_decision_in_metadata(self, chatbot_service, mock_services):
+        """Test a decisive dense top-1 skips the cross-encoder and is recorded"""
+        embedding_service, vector_store, _llm_service, _cache, _memory = mock_services
+
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        vector_store.search.return_value = [
+            SearchResult(
+                conversation=Conversation(id=i, context=f"q{i}", response=f"a{i}"),
+                score=score,
+                rank=i + 1,
+            )
+            for i, score in enumerate([0.9, 0.55, 0.54, 0.52])
+        ]
+        chatbot_service.reranker = Mock()
+        chatbot_service.reranker.is_available.return_value = True
+        chatbot_service.rerank_policy.enabled = True
+        chatbot_service.sparse_index = None
+
+        response = chatbot_service.chat(ChatRequest(message="What phone?", use_llm=False))
+
+        chatbot_service.reranker.rerank.assert_not_called()
+        assert response.metadata["reranked"] is False
+        assert response.metadata["rerank"]["action"] == "skip"
+        assert [s.conversation.id for s in response.sources] == [0, 1, 2]
+
+    def test_rerank_deadline_outcome_in_metadata(self, chatbot_service, mock_services):
+        """Test a rerank that ran out of budget is reported, not hidden"""
+        embedding_service, vector_store, _llm_service, _cache, _memory = mock_services
+
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        dense = [
+            SearchResult(
+                conversation=Conversation(id=i, context=f"q{i}", response=f"a{i}"),
+                score=0.7 - i * 0.005,
+                rank=i + 1,
+            )
+            for i in range(6)
+        ]
+        vector_store.search.return_value = dense
+        chatbot_service.reranker = Mock()
+        chatbot_service.reranker.is_available.return_value = True
+        chatbot_service.reranker.rerank_with_info.return_value = (
+            dense[:3],
+            {"outcome": "deadline", "scored": 2, "duration_ms": 1500.0},
+        )
+
+        response = chatbot_service.chat(ChatRequest(message="What phone?", use_llm=False))
+
+        assert response.metadata["reranked"] is False
+        assert response.metadata["rerank"]["outcome"] == "deadline"
+        assert response.metadata["rerank"]["action"] == "full"
+
+    def test_hybrid_search_fuses_sparse_results(self, chatbot_service, mock_services):
+        """Test BM25 hits are fused with dense results when hybrid search is on"""
+        from src.core.sparse_index import BM25Index
+
+        embedding_service, vector_store, _llm_service, _cache, _memory = mock_services
+
+        dense_conv = Conversation(id=1, context="Dense match", response="a1")
+        sparse_conv = Conversation(id=2, context="Which phone should I buy", response="a2")
+        embedding_service.embed_text.return_value = np.array([0.1, 0.2, 0.3])
+        vector_store.search.return_value = [
+            SearchResult(conversation=dense_conv, score=0.9, rank=1)
+        ]
+        vector_store.get_by_ids.return_value = [sparse_conv]
+        chatbot_service.sparse_index = BM25Index.build(
+            [(1, dense_conv.context), (2, sparse_conv.context)]
+        )
+
+        results = chatbot_service._search_similar("What phone should I buy?", n_results=5)
+
+        assert {r.conversation.id for r in results} == {1, 2}
+        vector_store.get_by_ids.assert_called_once_with([2])
+
+    def test_sparse_pool_only_with_sparse_index(self, chatbot_service, mock_services):
+        """Test the BM25 thread pool exists only once a sparse index is searched"""
+        _embedding_service, _vector_store, _llm_service, _cache, _memory = mock_services
+
+        with patch.object(chatbot_service, "_search_dense", return_value=[]):
+            chatbot_service._search_similar("query", n_results=5)
+            assert chatbot_service._sparse_pool is None
+
+            chatbot_service.sparse_index = Mock()
+            with patch.object(chatbot_service, "_search_sparse", return_value=[]):
+                chatbot_service._search_similar("query", n_results=5)
+        pool = chatbot_service._sparse_pool
+        assert pool is not None
+
+        chatbot_service.close()
+        assert chatbot_service._sparse_pool is None
+        assert pool._shutdown
+
+    def test_hybrid_search_overlaps_dense_and_sparse(self, chatbot_service, mock_services):
+        """Test dense and sparse retrieval run concurrently, not one after the other"""
+        _embedding_service, _vector_store, _llm_service, _cache, _memory = mock_services
+
+        delay = 0.2
+        dense = [
+            SearchResult(
+                conversation=Conversation(id=1, context="c1", response="a1"), score=0.9, rank=1
+            )
+        ]
+
+        def slow(results):
+            def search(*_args):
+                time.sleep(delay)
+                return results
+
+            return search
+
+        chatbot_service.sparse_index = Mock()
+        with (
+            patch.object(chatbot_service, "_search_dense", side_effect=slow(dense)),
+            patch.object(chatbot_service, "_search_sparse", side_effect=slow(dense)),
+        ):
+            start = time.perf_counter()
+            results = chatbot_service._search_similar("query", n_results=5)
+            elapsed = time.perf_counter() - start
+
+        assert [r.conversation.id for r in results] == [1]
+        assert elapsed < 1.75 * delay
+
     def test_get_stats(self, chatbot_service, mock_services):
         """Test getting statistics"""
         _embedding_service, vector_store, llm_service, _cache, _memory = mock_services
@@ -0,0 +1,134 @@
+"""
+Unit Tests - Conversation Memory
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.core.conversation_memory import ConversationMemory, SummarizingMemory
+
+
+def fill(memory: ConversationMemory, session_id: str, n: int, start: int = 0) -> None:
+    """Add n numbered messages to a session."""
+    for i in range(start, start + n):
+        memory.add_message(session_id, "user" if i % 2 == 0 else "assistant", f"message {i}")
+
+
+@pytest.mark.unit
+class TestSummarizingMemory:
+    """Test suite for SummarizingMemory"""
+
+    @pytest.fixture
+    def base_memory(self):
+        """Memory with one session"""
+        memory = ConversationMemory()
+        memory.create_session("s1")
+        return memory
+
+    def test_get_context_does_not_wait_for_summary(self, base_memory):
+        """Test the request path returns at once while the summarizer runs"""
+        release = threading.Event()
+
+        def slow_summarizer(text, previous):
+            release.wait(5)
+            return "They talked about phones."
+
+        memory = SummarizingMemory(base_memory, slow_summarizer, summary_threshold=4, keep_recent=2)
+        fill(base_memory, "s1", 6)
+
+        start = time.perf_counter()
+        context = memory.get_context("s1")
+        assert time.perf_counter() - start < 0.5
+        assert "summary" not in context
+        assert memory.get_stats()["pending"] == 1
+
+        release.set()
+        assert memory.wait(timeout=5)
+        context = memory.get_context("s1")
+        assert context.startswith("[Previous conversation summary: They talked about phones.]")
+        assert [m.content for m in base_memory.get_session("s1").messages] == [
+            "message 4",
+            "message 5",
+        ]
+
+    def test_summary_is_incremental(self, base_memory):
+        """Test new messages are folded into the previous summary"""
+        calls = []
+
+        def summarizer(text, previous):
+            calls.append((text, previous))
+            return f"summary {len(calls)}"
+
+        memory = SummarizingMemory(base_memory, summarizer, summary_threshold=4, keep_recent=2)
+        fill(base_memory, "s1", 6)
+        memory.get_context("s1")
+        assert memory.wait(timeout=5)
+
+        fill(base_memory, "s1", 4, start=6)
+        memory.get_context("s1")
+        assert memory.wait(timeout=5)
+
+        assert calls[0][1] is None
+        assert "message 0" in calls[0][0]
+        assert calls[1][1] == "summary 1"
+        assert "message 0" not in calls[1][0]
+        assert "message 4" in calls[1][0]
+        assert "summary 2" in memory.get_context("s1")
+
+    def test_failed_summary_keeps_messages(self, base_memory):
+        """Test messages are kept when the summarizer returns nothing"""
+        memory = SummarizingMemory(
+            base_memory, lambda text, previous: None, summary_threshold=4, keep_recent=2
+        )
+        fill(base_memory, "s1", 6)
+
+        memory.get_context("s1")
+        assert memory.wait(timeout=5)
+
+        assert base_memory.get_session("s1").message_count == 6
+        assert memory.get_stats()["failed"] == 1
+
+    def test_failed_summary_backs_off(self, base_memory):
+        """Test a failing session is not retried on the next request"""
+        calls = []
+
+        def failing(text, previous):
+            calls.append(text)
+
+        memory = SummarizingMemory(
+            base_memory, failing, summary_threshold=4, keep_recent=2, retry_backoff=0.2
+        )
+        fill(base_memory, "s1", 6)
+
+        memory.get_context("s1")
+        assert memory.wait(timeout=5)
+        memory.get_context("s1")
+        assert memory.wait(timeout=5)
+        assert len(calls) == 1
+        assert memory.get_stats()["backing_off"] == 1
+
+        time.sleep(0.25)
+        memory.get_context("s1")
+        assert memory.wait(timeout=5)
+        assert len(calls) == 2
+
+    def test_summary_dropped_with_session(self, base_memory):
+        """Test summaries of deleted or evicted sessions are not kept"""
+        base_memory.max_sessions = 2
+        memory = SummarizingMemory(
+            base_memory, lambda text, previous: "summary", summary_threshold=4, keep_recent=2
+        )
+        for session_id in ("s1", "s2"):
+            base_memory.get_or_create_session(session_id)
+            fill(base_memory, session_id, 6)
+            memory.get_context(session_id)
+        assert memory.wait(timeout=5)
+        assert memory.get_stats()["summaries"] == 2
+
+        base_memory.delete_session("s1")
+        base_memory.create_session("s3")
+        base_memory.create_session("s4")
+
+        assert memory.get_stats()["summaries"] == 0
@@ -0,0 +1,242 @@
+"""
+Unit tests for the LLM provider chain.
+"""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.core.llm_chain import CircuitBreaker, LLMProviderChain, parse_provider_chain
+from src.core.llm_dispatcher import LLMOverloaded
+
+
+def make_service(provider: str, response: str = "ok", available: bool = True) -> MagicMock:
+    """Build a fake LLMService."""
+    service = MagicMock()
+    service.provider = provider
+    service.model = "model"
+    service.is_available.return_value = available
+    service.refresh_availability.return_value = available
+    service.generate.return_value = response
+    service.generate_stream.side_effect = lambda *args: iter(response.split(" "))
+    service.agenerate = AsyncMock(return_value=response)
+    return service
+
+
+class TestCircuitBreaker:
+    """Tests for CircuitBreaker."""
+
+    @pytest.mark.unit
+    def test_opens_after_threshold_and_probes_once(self):
+        """Test the breaker opens, then lets a single probe through after the timeout."""
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+        assert not breaker.allow()
+
+        now = time.monotonic()
+        with patch("src.core.llm_chain.time.monotonic", return_value=now + 11):
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            assert breaker.allow()
+            assert not breaker.allow()
+
+            breaker.record_failure()
+            assert breaker.state == CircuitBreaker.OPEN
+
+    @pytest.mark.unit
+    def test_released_probe_can_be_retried(self):
+        """Test a probe that ended without an outcome frees the half-open slot."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        assert not breaker.allow()
+
+        breaker.release_probe()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.allow()
+
+    @pytest.mark.unit
+    def test_success_closes(self):
+        """Test a successful probe closes the breaker."""
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+        assert breaker.allow()
+        breaker.record_success()
+        assert breaker.state == CircuitBreaker.CLOSED
+
+
+class TestLLMProviderChain:
+    """Tests for LLMProviderChain."""
+
+    @pytest.mark.unit
+    def test_falls_back_on_error(self):
+        """Test the next provider answers when the first one fails."""
+        groq = make_service("groq")
+        groq.generate.side_effect = ConnectionError("down")
+        ollama = make_service("ollama", response="fallback")
+        chain = LLMProviderChain([groq, ollama])
+
+        assert chain.generate("q", "ctx") == "fallback"
+
+        stats = chain.get_stats()["providers"]
+        assert stats["groq/model"]["failures"] == 1
+        assert stats["ollama/model"]["requests"] == 1
+        assert stats["ollama/model"]["latency_p50_ms"] is not None
+
+    @pytest.mark.unit
+    def test_overloaded_provider_falls_back_without_tripping(self):
+        """Test a full queue moves on to the next provider but is not a failure."""
+        groq = make_service("groq")
+        groq.generate.side_effect = LLMOverloaded("queue full")
+        chain = LLMProviderChain([groq, make_service("ollama", response="fallback")])
+
+        for _ in range(5):
+            assert chain.generate("q", "ctx") == "fallback"
+
+        stats = chain.get_stats()["providers"]["groq/model"]
+        assert stats["state"] == CircuitBreaker.CLOSED
+        assert stats["failures"] == 0
+
+    @pytest.mark.unit
+    async def test_all_overloaded_raises_overloaded(self):
+        """Test overload is reported as such when every provider's queue is full."""
+        groq = make_service("groq")
+        ollama = make_service("ollama")
+        for service in (groq, ollama):
+            service.generate.side_effect = LLMOverloaded("queue full")
+            service.generate_stream.side_effect = LLMOverloaded("queue full")
+            service.agenerate = AsyncMock(side_effect=LLMOverloaded("queue full"))
+        chain = LLMProviderChain([groq, ollama])
+
+        with pytest.raises(LLMOverloaded):
+            chain.generate("q", "ctx")
+        with pytest.raises(LLMOverloaded):
+            list(chain.generate_stream("q", "ctx"))
+        with pytest.raises(LLMOverloaded):
+            await chain.agenerate("q", "ctx")
+
+        ollama.generate.side_effect = ConnectionError("down")
+        with pytest.raises(RuntimeError) as excinfo:
+            chain.generate("q", "ctx")
+        assert not isinstance(excinfo.value, LLMOverloaded)
+
+    @pytest.mark.unit
+    def test_overloaded_probe_does_not_block_provider(self):
+        """Test a half-open provider whose probe was overloaded is probed again."""
+        groq = make_service("groq")
+        groq.generate.side_effect = [LLMOverloaded("queue full"), "recovered"]
+        chain = LLMProviderChain(
+            [groq, make_service("ollama", response="fallback")], reset_timeout=0
+        )
+        chain.providers[0].breaker.trip()
+
+        assert chain.generate("q", "ctx") == "fallback"
+        assert chain.generate("q", "ctx") == "recovered"
+        assert chain.get_stats()["providers"]["groq/model"]["state"] == CircuitBreaker.CLOSED
+
+    @pytest.mark.unit
+    async def test_cancelled_probe_does_not_block_provider(self):
+        """Test a half-open probe cancelled as a hedging loser frees its slot."""
+
+        async def slow(*args):
+            await asyncio.sleep(1)
+            return "slow"
+
+        groq = make_service("groq")
+        groq.agenerate = AsyncMock(side_effect=slow)
+        ollama = make_service("ollama", response="fast")
+        chain = LLMProviderChain([groq, ollama], reset_timeout=0, hedging=True, hedge_min_samples=1)
+        chain.providers[0].stats.record_success("latency", 20.0)
+        chain.providers[0].breaker.trip()
+
+        assert await chain.agenerate("q", "ctx") == "fast"
+        await asyncio.sleep(0)
+
+        assert chain.providers[0].breaker.allow()
+
+    @pytest.mark.unit
+    def test_open_breaker_skips_provider(self):
+        """Test a provider with an open breaker is not called."""
+        groq = make_service("groq")
+        groq.generate.side_effect = ConnectionError("down")
+        ollama = make_service("ollama")
+        chain = LLMProviderChain([groq, ollama], failure_threshold=2, reset_timeout=60)
+
+        for _ in range(3):
+            chain.generate("q", "ctx")
+
+        assert groq.generate.call_count == 2
+        assert chain.get_stats()["providers"]["groq/model"]["state"] == "open"
+
+    @pytest.mark.unit
+    def test_unavailable_provider_probed_after_reset(self):
+        """Test a provider down at startup is re-checked once its breaker half-opens."""
+        ollama = make_service("ollama", available=False)
+        chain = LLMProviderChain([ollama], reset_timeout=0)
+
+        assert chain.is_available()
+        with pytest.raises(RuntimeError):
+            chain.generate("q", "ctx")
+        ollama.refresh_availability.assert_called_once()
+
+    @pytest.mark.unit
+    def test_no_probe_on_request_path(self):
+        """Test requests do not re-check availability when a monitor refreshes it."""
+        ollama = make_service("ollama", available=False)
+        groq = make_service("groq", response="from groq")
+        chain = LLMProviderChain([ollama, groq], reset_timeout=0, probe_on_request=False)
+
+        assert chain.generate("q", "ctx") == "from groq"
+        ollama.refresh_availability.assert_not_called()
+
+    @pytest.mark.unit
+    def test_stream_falls_back_before_first_token(self):
+        """Test streaming switches provider when the first fails before any token."""
+        groq = make_service("groq")
+        groq.generate_stream.side_effect = ConnectionError("down")
+        ollama = make_service("ollama", response="hello world")
+        chain = LLMProviderChain([groq, ollama])
+
+        assert "".join(chain.generate_stream("q", "ctx")) == "helloworld"
+        assert chain.get_stats()["providers"]["ollama/model"]["ttft_p50_ms"] is not None
+
+    @pytest.mark.unit
+    def test_hedged_request_wins_when_primary_is_slow(self):
+        """Test a backup request is sent after the primary's latency percentile."""
+        groq = make_service("groq")
+        groq.generate.side_effect = lambda *args: time.sleep(0.5) or "slow"
+        ollama = make_service("ollama", response="fast")
+        chain = LLMProviderChain([groq, ollama], hedging=True, hedge_min_samples=1)
+        chain.providers[0].stats.record_success("latency", 20.0)
+
+        start = time.perf_counter()
+        assert chain.generate("q", "ctx") == "fast"
+
+        assert time.perf_counter() - start < 0.4
+        assert chain.get_stats()["hedges"] == 1
+        assert chain.get_stats()["hedge_wins"] == 1
+
+    @pytest.mark.unit
+    async def test_agenerate_falls_back(self):
+        """Test async generation falls back to the next provider."""
+        groq = make_service("groq")
+        groq.agenerate = AsyncMock(side_effect=TimeoutError("slow"))
+        ollama = make_service("ollama", response="async fallback")
+        chain = LLMProviderChain([groq, ollama])
+
+        assert await chain.agenerate("q", "ctx") == "async fallback"
+
+    @pytest.mark.unit
+    def test_parse_provider_chain(self):
+        """Test provider/model entries, with slashes in model names."""
+        assert parse_provider_chain(
+            ["ollama/llama3.1:8b", "groq/meta-llama/llama-4", "openai"]
+        ) == [
+            ("ollama", "llama3.1:8b"),
+            ("groq", "meta-llama/llama-4"),
+            ("openai", None),
+        ]
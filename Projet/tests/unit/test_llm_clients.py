@@ -0,0 +1,50 @@
+"""
+Unit tests for the async LLM client registry.
+"""
+
+import pytest
+
+from src.core.llm_clients import AsyncLLMClients
+
+
+class TestAsyncLLMClients:
+    """Tests for AsyncLLMClients."""
+
+    @pytest.mark.unit
+    def test_client_created_once_per_provider(self):
+        """Test the same long-lived client is returned on every call."""
+        clients = AsyncLLMClients(timeout=30, max_connections=8)
+
+        first = clients.get("ollama")
+
+        assert clients.get("ollama") is first
+        assert clients.get_stats()["clients"] == ["ollama"]
+        assert clients.get_stats()["max_connections"] == 8
+
+    @pytest.mark.unit
+    def test_pool_settings_applied(self):
+        """Test timeouts and pool limits reach the underlying HTTP client."""
+        clients = AsyncLLMClients(timeout=30, connect_timeout=2, max_keepalive_connections=4)
+
+        http_client = clients.get("ollama")._client
+
+        assert http_client.timeout.read == 30
+        assert http_client.timeout.connect == 2
+        assert http_client._transport._pool._max_keepalive_connections == 4
+
+    @pytest.mark.unit
+    def test_unknown_provider_rejected(self):
+        """Test an unsupported provider raises ValueError."""
+        with pytest.raises(ValueError):
+            AsyncLLMClients().get("unknown")
+
+    @pytest.mark.unit
+    async def test_aclose_closes_and_forgets_clients(self):
+        """Test aclose closes connection pools; the next get builds a new client."""
+        clients = AsyncLLMClients()
+        client = clients.get("ollama")
+
+        await clients.aclose()
+
+        assert client._client.is_closed
+        assert clients.get("ollama") is not client
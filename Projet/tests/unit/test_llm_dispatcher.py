@@ -0,0 +1,133 @@
+"""
+Unit tests for the LLM dispatcher.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.core.llm_dispatcher import (
+    ConcurrencyLimiter,
+    LLMDispatcher,
+    LLMOverloaded,
+    Priority,
+    llm_priority,
+)
+
+
+class TestConcurrencyLimiter:
+    """Tests for ConcurrencyLimiter."""
+
+    @pytest.mark.unit
+    def test_queue_full_rejects_immediately(self):
+        """Test callers beyond the queue are rejected without waiting."""
+        limiter = ConcurrencyLimiter("ollama", max_concurrent=1, max_queue=0, timeout=5)
+        limiter.acquire()
+
+        start = time.perf_counter()
+        with pytest.raises(LLMOverloaded):
+            limiter.acquire()
+        assert time.perf_counter() - start < 0.5
+        assert limiter.get_stats()["rejected"] == 1
+
+    @pytest.mark.unit
+    def test_wait_times_out(self):
+        """Test a queued caller gives up after the timeout."""
+        limiter = ConcurrencyLimiter("ollama", max_concurrent=1, max_queue=1, timeout=0.05)
+        limiter.acquire()
+
+        with pytest.raises(LLMOverloaded):
+            limiter.acquire()
+
+        limiter.release()
+        assert limiter.acquire() < 0.05
+        assert limiter.get_stats()["timeouts"] == 1
+
+    @pytest.mark.unit
+    def test_interactive_served_before_background(self):
+        """Test a freed slot goes to the highest priority waiter."""
+        limiter = ConcurrencyLimiter("ollama", max_concurrent=1, max_queue=4, timeout=5)
+        limiter.acquire()
+        order = []
+
+        def worker(priority):
+            limiter.acquire(priority)
+            order.append(priority)
+            limiter.release()
+
+        threads = []
+        for priority in (Priority.BACKGROUND, Priority.INTERACTIVE):
+            thread = threading.Thread(target=worker, args=(priority,))
+            thread.start()
+            threads.append(thread)
+            while limiter.get_stats()["queued"] < len(threads):
+                time.sleep(0.001)
+
+        limiter.release()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        assert order == [Priority.INTERACTIVE, Priority.BACKGROUND]
+        stats = limiter.get_stats()
+        assert stats["active"] == 0
+        assert stats["queue_p95_ms"] > 0
+
+    @pytest.mark.unit
+    async def test_async_waiters_share_slots(self):
+        """Test async callers wait for a slot without blocking the loop."""
+        limiter = ConcurrencyLimiter("groq", max_concurrent=2, max_queue=8, timeout=5)
+        running = 0
+        peak = 0
+
+        async def call():
+            nonlocal running, peak
+            await limiter.aacquire()
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.01)
+            running -= 1
+            limiter.release()
+
+        await asyncio.gather(*(call() for _ in range(6)))
+
+        assert peak == 2
+        assert limiter.get_stats()["calls"] == 6
+
+
+class TestLLMDispatcher:
+    """Tests for LLMDispatcher."""
+
+    @pytest.mark.unit
+    def test_calls_hold_a_slot(self):
+        """Test generate and streams release their slot when done."""
+        service = MagicMock()
+        service.generate.return_value = "ok"
+        service.generate_stream.return_value = iter(["a", "b"])
+        limiter = ConcurrencyLimiter("ollama", max_concurrent=1, max_queue=0)
+        dispatcher = LLMDispatcher(service, limiter)
+
+        assert dispatcher.generate("q", "ctx") == "ok"
+        stream = dispatcher.generate_stream("q", "ctx")
+        assert next(stream) == "a"
+        with pytest.raises(LLMOverloaded):
+            dispatcher.generate("q", "ctx")
+        assert list(stream) == ["b"]
+        assert limiter.get_stats()["active"] == 0
+
+    @pytest.mark.unit
+    async def test_priority_from_context(self):
+        """Test calls use the priority set with llm_priority."""
+        service = MagicMock()
+        service.agenerate = AsyncMock(return_value="ok")
+        limiter = MagicMock()
+        limiter.aacquire = AsyncMock(return_value=0.0)
+        dispatcher = LLMDispatcher(service, limiter)
+
+        with llm_priority(Priority.BACKGROUND):
+            assert await dispatcher.agenerate("q", "ctx") == "ok"
+
+        limiter.aacquire.assert_awaited_once_with(Priority.BACKGROUND)
+        limiter.release.assert_called_once()
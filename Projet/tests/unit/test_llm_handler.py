@@ -3,7 +3,8 @@ Unit tests for LLMService.
 """
 
 import sys
-from unittest.mock import MagicMock, patch
+import time
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
 
@@ -46,6 +47,35 @@ class TestLLMService:
         response = service.generate("What is AI?", "")
         assert isinstance(response, str)
 
+    @pytest.mark.unit
+    def test_generate_stream_yields_chunks(self, service, mock_ollama):
+        """Test generate_stream yields provider chunks, skipping empty ones."""
+        mock_ollama.chat.return_value = iter(
+            [{"message": {"content": part}} for part in ("Hello", "", " world")]
+        )
+
+        chunks = list(service.generate_stream("Hi?", "context"))
+
+        assert chunks == ["Hello", " world"]
+        assert mock_ollama.chat.call_args.kwargs["stream"] is True
+
+    @pytest.mark.unit
+    async def test_agenerate_uses_async_client(self, mock_ollama):
+        """Test agenerate awaits the provider's shared async client."""
+        from src.core.llm_handler import LLMService
+
+        async_client = MagicMock()
+        async_client.chat = AsyncMock(return_value={"message": {"content": "Async response"}})
+        registry = MagicMock()
+        registry.get.return_value = async_client
+
+        service = LLMService(provider="ollama", async_clients=registry)
+        response = await service.agenerate("What is AI?", "context")
+
+        assert response == "Async response"
+        registry.get.assert_called_once_with("ollama")
+        mock_ollama.chat.assert_not_called()
+
     @pytest.mark.unit
     def test_build_prompt_includes_query(self, service):
         """Test that prompt includes the user query."""
@@ -62,6 +92,26 @@ class TestLLMService:
         prompt = service._build_prompt(query, context)
         assert "Artificial Intelligence" in prompt
 
+    @pytest.mark.unit
+    def test_ollama_prompt_prefix_is_stable(self, service, mock_ollama):
+        """Test successive turns share the system and history prefix, with keep_alive."""
+        from src.config.settings import settings
+        from src.models.schemas import ChatMessage
+
+        history = [
+            ChatMessage(role="user" if i % 2 == 0 else "assistant", content=f"message {i}")
+            for i in range(6)
+        ]
+        service.generate("First?", "context A", history=history)
+        first = mock_ollama.chat.call_args.kwargs
+        service.generate("Second?", "context B", history=[*history, history[0], history[1]])
+        second = mock_ollama.chat.call_args.kwargs
+
+        assert first["messages"][:-1] == second["messages"][: len(first["messages"]) - 1]
+        assert "context A" in first["messages"][-1]["content"]
+        assert first["keep_alive"] == settings.OLLAMA_KEEP_ALIVE
+        assert first["options"]["num_ctx"] == settings.OLLAMA_NUM_CTX
+
     @pytest.mark.unit
     def test_check_availability(self, service):
         """Test availability check."""
@@ -94,6 +144,76 @@ class TestLLMServiceProviders:
             assert service._available is True
 
 
+class TestMockProvider:
+    """Tests for the mock LLM provider."""
+
+    @pytest.fixture
+    def service(self):
+        """LLMService on the mock provider, without delays."""
+        from src.core.llm_handler import LLMService
+
+        with (
+            patch("src.config.settings.settings.MOCK_LLM_TTFT_MS", 0.0),
+            patch("src.config.settings.settings.MOCK_LLM_TOKENS_PER_SEC", 0.0),
+        ):
+            return LLMService(provider="mock")
+
+    @pytest.mark.unit
+    def test_available_and_deterministic(self, service):
+        """Test the mock needs nothing and repeats its answers."""
+        assert service.is_available()
+
+        first = service.generate("Which phone?", "Get a Pixel.", max_tokens=20)
+        assert first == service.generate("Which phone?", "Get a Pixel.", max_tokens=20)
+        assert first != service.generate("Which laptop?", "Get a Pixel.", max_tokens=20)
+        assert len(first.split()) == 20
+
+    @pytest.mark.unit
+    async def test_stream_and_async_match_generate(self, service):
+        """Test streamed and async answers are the same text."""
+        expected = service.generate("Which phone?", "Get a Pixel.", max_tokens=10)
+
+        assert "".join(service.generate_stream("Which phone?", "Get a Pixel.", max_tokens=10)) == (
+            expected
+        )
+        assert await service.agenerate("Which phone?", "Get a Pixel.", max_tokens=10) == expected
+
+    @pytest.mark.unit
+    def test_latency_profile(self):
+        """Test time to first token and decode speed."""
+        from src.core.mock_llm import MockLLM
+
+        mock = MockLLM(ttft_ms=50, tokens_per_sec=200)
+        start = time.perf_counter()
+        stream = mock.stream("q", "", max_tokens=11)
+        next(stream)
+        ttft = time.perf_counter() - start
+        list(stream)
+        total = time.perf_counter() - start
+
+        assert ttft >= 0.05
+        assert total >= 0.05 + 10 / 200
+
+    @pytest.mark.unit
+    def test_error_rate(self):
+        """Test seeded failures happen on the same calls and at the configured rate."""
+        from src.core.mock_llm import MockLLM, MockLLMError
+
+        def outcomes(seed):
+            mock = MockLLM(ttft_ms=0, tokens_per_sec=0, error_rate=0.3, seed=seed)
+            results = []
+            for _ in range(200):
+                try:
+                    mock.generate("q", "ctx", max_tokens=5)
+                    results.append(True)
+                except MockLLMError:
+                    results.append(False)
+            return results
+
+        assert outcomes(1) == outcomes(1)
+        assert 40 <= outcomes(1).count(False) <= 80
+
+
 class TestLLMServiceIntegration:
     """Integration tests with real LLM."""
 
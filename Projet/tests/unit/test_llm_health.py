@@ -0,0 +1,115 @@
+"""
+Unit tests for the LLM health monitor.
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.core.llm_chain import LLMProviderChain
+from src.core.llm_health import LLMHealthMonitor
+
+
+def make_service(provider: str, available: bool = True) -> MagicMock:
+    """Build a fake LLMService."""
+    service = MagicMock()
+    service.provider = provider
+    service.model = "model"
+    service.is_available.return_value = available
+    service.refresh_availability.return_value = available
+    return service
+
+
+class TestLLMHealthMonitor:
+    """Tests for LLMHealthMonitor."""
+
+    @pytest.mark.unit
+    def test_watch_expands_chain(self):
+        """Test every provider of a chain is watched."""
+        monitor = LLMHealthMonitor(interval=0)
+        monitor.watch(LLMProviderChain([make_service("ollama"), make_service("groq")]))
+
+        assert set(monitor.get_stats()["providers"]) == {"ollama/model", "groq/model"}
+
+    @pytest.mark.unit
+    def test_generation_latency_kept_apart_from_probes(self):
+        """Test real call latency comes from the chain, not from probes."""
+        chain = LLMProviderChain([make_service("ollama")])
+        chain.providers[0].stats.record_success("latency", 1200.0)
+        monitor = LLMHealthMonitor(interval=0)
+        monitor.watch(chain)
+
+        monitor.probe_all()
+        stats = monitor.get_stats()["providers"]["ollama/model"]
+
+        assert stats["generation"]["latency_p50_ms"] == 1200.0
+        assert stats["probe_p50_ms"] < 1200.0
+
+        monitor.watch(make_service("groq"))
+        assert monitor.get_stats()["providers"]["groq/model"]["generation"] is None
+
+    @pytest.mark.unit
+    def test_probe_records_availability(self):
+        """Test probes refresh availability and record latency and failures."""
+        ollama = make_service("ollama")
+        ollama.refresh_availability.side_effect = [True, False, ConnectionError("refused")]
+        monitor = LLMHealthMonitor(interval=0)
+        monitor.watch(ollama)
+
+        monitor.probe_all()
+        stats = monitor.get_stats()["providers"]["ollama/model"]
+        assert stats["available"] is True
+        assert stats["probe_p50_ms"] is not None
+
+        monitor.probe_all()
+        monitor.probe_all()
+        stats = monitor.get_stats()["providers"]["ollama/model"]
+        assert stats["available"] is False
+        assert stats["consecutive_failures"] == 2
+        assert stats["last_error"] == "refused"
+
+    @pytest.mark.unit
+    def test_get_stats_does_not_probe(self):
+        """Test reading the cached state never calls the provider."""
+        ollama = make_service("ollama")
+        monitor = LLMHealthMonitor(interval=0)
+        monitor.watch(ollama)
+
+        assert monitor.get_stats()["providers"]["ollama/model"]["available"] is None
+        ollama.refresh_availability.assert_not_called()
+
+    @pytest.mark.unit
+    def test_background_thread_probes_on_interval(self):
+        """Test the monitor keeps probing until stopped."""
+        ollama = make_service("ollama")
+        monitor = LLMHealthMonitor(interval=0.01)
+        monitor.watch(ollama)
+
+        monitor.start()
+        time.sleep(0.1)
+        monitor.stop()
+
+        assert ollama.refresh_availability.call_count >= 2
+
+    @pytest.mark.unit
+    def test_watch_starts_monitor_once(self):
+        """Test watching services starts the thread without the API lifespan."""
+        monitor = LLMHealthMonitor(interval=60)
+        monitor.watch(make_service("ollama"))
+        thread = monitor._thread
+
+        monitor.watch(make_service("groq"))
+        monitor.start()
+
+        assert monitor.get_stats()["running"] is True
+        assert monitor._thread is thread
+        monitor.stop()
+
+    @pytest.mark.unit
+    def test_disabled_when_interval_is_zero(self):
+        """Test no thread is started with a zero interval."""
+        monitor = LLMHealthMonitor(interval=0)
+        monitor.start()
+
+        assert monitor.get_stats()["running"] is False
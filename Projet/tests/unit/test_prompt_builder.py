@@ -0,0 +1,76 @@
+"""
+Unit Tests - Prompt Builder
+"""
+
+import pytest
+
+from src.core.prompt_builder import PromptBuilder, TokenCounter, history_window
+from src.models.schemas import ChatMessage
+
+
+@pytest.mark.unit
+class TestPromptBuilder:
+    """Test suite for PromptBuilder"""
+
+    @pytest.fixture
+    def builder(self):
+        """Builder counting one token per character"""
+        return PromptBuilder(
+            TokenCounter(chars_per_token=1), max_input_tokens=100, reserved_tokens=0
+        )
+
+    def test_fit_cuts_between_sentences(self, builder):
+        """Test a head is cut after the last sentence that fits"""
+        text = "First sentence. Second sentence. Third sentence."
+
+        assert builder.fit(text, 40) == "First sentence. Second sentence."
+        assert builder.fit(text, 100) == text
+
+    def test_fit_keeps_end(self, builder):
+        """Test keep_end keeps the most recent sentences"""
+        text = "Old message. Recent message."
+
+        assert builder.fit(text, 20, keep_end=True) == "Recent message."
+
+    def test_fit_falls_back_to_words(self, builder):
+        """Test a single long sentence is cut between words, unless disabled"""
+        text = "one two three four five six"
+
+        assert builder.fit(text, 10) == "one two"
+        assert builder.fit(text, 10, words=False) == ""
+
+    def test_budget_allocated_by_priority(self, builder):
+        """Test query and best example are kept before later examples"""
+        prompt = builder.build(
+            system="S" * 20,
+            query="Which phone?",
+            examples=["Best example. " * 3, "Other example. " * 3],
+            memory="",
+        )
+
+        assert prompt.query == "Which phone?"
+        assert prompt.examples == ["Best example. " * 3, "Other example."]
+        assert prompt.truncated == ["examples"]
+        assert prompt.tokens["total"] <= 100
+        assert prompt.tokens["system"] == 20
+
+    def test_history_dropped_oldest_first(self, builder):
+        """Test whole history messages are kept newest first within the budget"""
+        history = [
+            ChatMessage(role="user", content="x" * 40),
+            ChatMessage(role="assistant", content="recent answer"),
+        ]
+
+        prompt = builder.build(system="", query="q" * 40, examples=[], history=history)
+
+        assert [m.content for m in prompt.history] == ["recent answer"]
+        assert "history" in prompt.truncated
+
+    def test_history_window_is_anchored(self):
+        """Test the window start moves by whole windows, not one message per turn"""
+        history = [ChatMessage(role="user", content=str(i)) for i in range(12)]
+
+        assert history_window(history[:4], 5) == history[:4]
+        assert history_window(history[:9], 5) == history[:9]
+        assert history_window(history[:10], 5) == history[5:10]
+        assert history_window(history[:12], 5) == history[5:12]
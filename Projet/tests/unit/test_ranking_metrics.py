@@ -0,0 +1,52 @@
+"""
+Unit tests for ranking agreement metrics.
+"""
+
+import numpy as np
+import pytest
+
+from src.utils.ranking_metrics import kendall_tau, ndcg_at_k
+
+
+class TestKendallTau:
+    """Tests for kendall_tau."""
+
+    @pytest.mark.unit
+    def test_identical_and_reversed(self):
+        """Test perfect agreement and perfect disagreement."""
+        scores = [0.9, 0.5, 0.2, 0.1]
+        assert kendall_tau(scores, [9, 5, 2, 1]) == pytest.approx(1.0)
+        assert kendall_tau(scores, [1, 2, 5, 9]) == pytest.approx(-1.0)
+
+    @pytest.mark.unit
+    def test_one_swap(self):
+        """Test a single adjacent swap among four items."""
+        assert kendall_tau([4, 3, 2, 1], [4, 3, 1, 2]) == pytest.approx(4 / 6)
+
+    @pytest.mark.unit
+    def test_ties(self):
+        """Test tied pairs are left out of the tau-b normalization."""
+        assert kendall_tau([1, 1, 1], [1, 1, 1]) == pytest.approx(1.0)
+        assert kendall_tau([1, 1, 1], [1, 2, 3]) == pytest.approx(0.0)
+        assert kendall_tau([2, 1, 1], [3, 2, 1]) == pytest.approx(2 / np.sqrt(6))
+
+    @pytest.mark.unit
+    def test_length_mismatch(self):
+        """Test score lists must align."""
+        with pytest.raises(ValueError):
+            kendall_tau([1, 2], [1, 2, 3])
+
+
+class TestNdcgAtK:
+    """Tests for ndcg_at_k."""
+
+    @pytest.mark.unit
+    def test_same_order_is_perfect(self):
+        """Test the reference order scores 1.0."""
+        assert ndcg_at_k([0.9, 0.5, 0.1], [3, 2, 1], k=3) == pytest.approx(1.0)
+
+    @pytest.mark.unit
+    def test_only_top_k_matters(self):
+        """Test swaps below the cut-off are ignored."""
+        assert ndcg_at_k([4, 3, 2, 1], [4, 3, 1, 2], k=2) == pytest.approx(1.0)
+        assert ndcg_at_k([4, 3, 2, 1], [3, 4, 2, 1], k=2) < 1.0
@@ -0,0 +1,115 @@
+"""
+Unit tests for cross-request rerank micro-batching.
+"""
+
+import threading
+import time
+
+import pytest
+
+from src.core.rerank_batcher import RerankBatcher, RerankQueueFull
+
+
+def score_by_suffix(pairs):
+    """Fake predict: score is the number at the end of the document."""
+    return [float(doc.split()[-1]) for _, doc in pairs]
+
+
+class TestRerankBatcher:
+    """Tests for RerankBatcher."""
+
+    @pytest.mark.unit
+    def test_concurrent_requests_share_a_forward_pass(self):
+        """Test requests submitted within the window are scored together."""
+        calls = []
+
+        def predict(pairs):
+            calls.append(len(pairs))
+            return score_by_suffix(pairs)
+
+        batcher = RerankBatcher(predict, max_wait_ms=100)
+        results = {}
+
+        def worker(n):
+            results[n] = batcher.submit([["q", f"doc {n}"], ["q", f"doc {n + 100}"]])
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batcher.close()
+
+        assert results == {n: [float(n), float(n + 100)] for n in range(4)}
+        assert sum(calls) == 8
+        assert len(calls) < 4
+        assert batcher.get_stats()["requests"] == 4
+
+    @pytest.mark.unit
+    def test_batch_size_bounded(self):
+        """Test a batch stops growing at max_batch_pairs."""
+        calls = []
+
+        def predict(pairs):
+            calls.append(len(pairs))
+            return score_by_suffix(pairs)
+
+        batcher = RerankBatcher(predict, max_batch_pairs=2, max_wait_ms=50)
+        threads = [
+            threading.Thread(target=batcher.submit, args=([["q", f"d {n}"], ["q", f"d {n}"]],))
+            for n in range(3)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        batcher.close()
+
+        assert calls == [2, 2, 2]
+
+    @pytest.mark.unit
+    def test_deadline_exceeded(self):
+        """Test a request gives up when its deadline passes."""
+
+        def slow_predict(pairs):
+            time.sleep(0.2)
+            return score_by_suffix(pairs)
+
+        batcher = RerankBatcher(slow_predict, max_wait_ms=0)
+        with pytest.raises(TimeoutError):
+            batcher.submit([["q", "doc 1"]], timeout=0.05)
+        batcher.close()
+
+    @pytest.mark.unit
+    def test_queue_full_rejected(self):
+        """Test submit fails fast when the queue is at capacity."""
+        release = threading.Event()
+
+        def blocked_predict(pairs):
+            release.wait(1)
+            return score_by_suffix(pairs)
+
+        batcher = RerankBatcher(blocked_predict, max_wait_ms=0, max_queue=1)
+        threading.Thread(target=batcher.submit, args=([["q", "doc 1"]],), daemon=True).start()
+        time.sleep(0.05)  # worker is now busy with the first request
+        threading.Thread(target=batcher.submit, args=([["q", "doc 2"]],), daemon=True).start()
+        time.sleep(0.05)  # second request fills the queue
+
+        with pytest.raises(RerankQueueFull):
+            batcher.submit([["q", "doc 3"]])
+        release.set()
+        batcher.close()
+
+        assert batcher.get_stats()["rejected"] == 1
+
+    @pytest.mark.unit
+    def test_predict_error_propagates(self):
+        """Test model errors reach every waiting request."""
+
+        def failing_predict(pairs):
+            raise RuntimeError("model crashed")
+
+        batcher = RerankBatcher(failing_predict, max_wait_ms=0)
+        with pytest.raises(RuntimeError, match="model crashed"):
+            batcher.submit([["q", "doc 1"]])
+        batcher.close()
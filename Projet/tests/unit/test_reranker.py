@@ -0,0 +1,373 @@
+"""
+Unit tests for RerankerService.
+"""
+
+import time
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.models.schemas import Conversation, SearchResult
+
+
+def make_results(n: int) -> list[SearchResult]:
+    """Build n dense search results with decreasing scores."""
+    return [
+        SearchResult(
+            conversation=Conversation(id=i, context=f"question {i}", response=f"answer {i}"),
+            score=1.0 - i * 0.05,
+            rank=i + 1,
+        )
+        for i in range(n)
+    ]
+
+
+class TestRerankerService:
+    """Tests for RerankerService class."""
+
+    @pytest.fixture
+    def model(self):
+        """Fake cross-encoder scoring pairs by the document id suffix."""
+        model = MagicMock()
+        model.predict.side_effect = lambda pairs, **kwargs: [
+            float(doc.split()[-1]) for _, doc in pairs
+        ]
+        return model
+
+    @pytest.fixture
+    def reranker(self, model):
+        """Create RerankerService with a fake model."""
+        with patch("src.core.reranker.RerankerService._load_model"):
+            from src.core.reranker import RerankerService
+
+            service = RerankerService()
+        service.model = model
+        return service
+
+    @pytest.mark.unit
+    def test_rerank_orders_by_cross_encoder_score(self, reranker):
+        """Test results are reordered by model score."""
+        reranked = reranker.rerank("query", make_results(4))
+
+        assert [r.conversation.id for r in reranked] == [3, 2, 1, 0]
+        assert [r.rank for r in reranked] == [1, 2, 3, 4]
+        assert reranked[0].score == 1.0
+
+    @pytest.mark.unit
+    def test_rerank_top_k(self, reranker):
+        """Test top_k limits the output."""
+        assert len(reranker.rerank("query", make_results(5), top_k=2)) == 2
+
+    @pytest.mark.unit
+    def test_score_cache_skips_known_pairs(self, reranker, model):
+        """Test only uncached pairs are sent to the model."""
+        reranker.rerank("query", make_results(3))
+        reranked = reranker.rerank("query", make_results(5))
+
+        assert len(model.predict.call_args_list[1].args[0]) == 2
+        assert [r.conversation.id for r in reranked] == [4, 3, 2, 1, 0]
+        assert reranker.get_stats()["score_cache"]["hits"] == 3
+        assert reranker.get_stats()["pairs_scored"] == 5
+
+    @pytest.mark.unit
+    def test_score_cache_shared_by_near_repeats(self, reranker, model):
+        """Test trivially different queries reuse cached scores."""
+        reranker.rerank("What phone?", make_results(3))
+        reranker.rerank("  what PHONE ", make_results(3))
+
+        assert model.predict.call_count == 1
+
+    @pytest.mark.unit
+    def test_score_cache_bounded(self, model):
+        """Test the score cache never holds more than its size."""
+        with patch("src.core.reranker.RerankerService._load_model"):
+            from src.core.reranker import RerankerService
+
+            reranker = RerankerService(score_cache_size=4)
+        reranker.model = model
+
+        reranker.rerank("query", make_results(10))
+        assert reranker.get_stats()["score_cache"]["size"] == 4
+
+        reranker.clear_score_cache()
+        assert reranker.get_stats()["score_cache"]["size"] == 0
+
+    @pytest.mark.unit
+    def test_pairs_sorted_by_length_and_scores_restored(self, reranker, model):
+        """Test the model sees length-sorted pairs while scores keep input order."""
+        results = [
+            SearchResult(
+                conversation=Conversation(id=i, context=context, response="r"),
+                score=0.9,
+                rank=i + 1,
+            )
+            for i, context in enumerate(["long long long 2", "short 0", "medium one 1"])
+        ]
+
+        reranked = reranker.rerank("query", results)
+
+        sent = [doc for _, doc in model.predict.call_args.args[0]]
+        assert sent == ["short 0", "medium one 1", "long long long 2"]
+        assert [r.conversation.id for r in reranked] == [0, 2, 1]
+        assert reranker.get_stats()["last_predict"]["pairs"] == 3
+
+    @pytest.mark.unit
+    def test_long_documents_cut_to_token_budget(self, reranker, model):
+        """Test documents are cut before tokenization."""
+        reranker.max_length = 4
+        results = [
+            SearchResult(
+                conversation=Conversation(id=0, context="x" * 1000 + " 0", response="r"),
+                score=0.9,
+                rank=1,
+            ),
+            *make_results(2)[1:],
+        ]
+        model.predict.side_effect = lambda pairs, **kwargs: [0.0] * len(pairs)
+
+        reranker.rerank("query", results)
+
+        sent = [doc for _, doc in model.predict.call_args.args[0]]
+        assert max(len(doc) for doc in sent) == 4 * 8
+
+    @pytest.mark.unit
+    def test_micro_batching_scores_through_batcher(self, model):
+        """Test rerank results are identical with the micro-batcher enabled."""
+        with patch("src.core.reranker.RerankerService._load_model"):
+            from src.core.reranker import RerankerService
+
+            service = RerankerService(micro_batching=True, score_cache_size=0)
+        service.model = model
+
+        reranked = service.rerank("query", make_results(4))
+        service.batcher.close()
+
+        assert [r.conversation.id for r in reranked] == [3, 2, 1, 0]
+        assert service.get_stats()["micro_batching"]["batches"] == 1
+
+    @pytest.mark.unit
+    def test_cascade_prunes_pool_before_cross_encoder(self, model):
+        """Test only cascade_keep candidates reach the cross-encoder."""
+        with patch("src.core.reranker.RerankerService._load_model"):
+            from src.core.reranker import RerankerService
+
+            service = RerankerService(cascade_keep=4, score_cache_size=0)
+        service.model = model
+
+        reranked = service.rerank("question", make_results(20), top_k=3)
+
+        assert len(model.predict.call_args.args[0]) == 4
+        assert len(reranked) == 3
+        assert service.get_stats()["pairs_pruned"] == 16
+
+    @pytest.mark.unit
+    def test_deadline_keeps_dense_order_and_caches_partial_scores(self, reranker, model):
+        """Test an expired budget returns dense order and keeps scored batches."""
+
+        def slow_predict(pairs, **kwargs):
+            time.sleep(0.05)
+            return [float(doc.split()[-1]) for _, doc in pairs]
+
+        model.predict.side_effect = slow_predict
+        reranker.batch_size = 2
+        results = make_results(6)
+
+        reranked, info = reranker.rerank_with_info("query", results, top_k=3, deadline_ms=30)
+
+        assert info["outcome"] == "deadline"
+        assert 0 < info["scored"] < 6
+        assert [r.conversation.id for r in reranked] == [0, 1, 2]
+        assert reranker.get_stats()["deadline_hits"] == 1
+        assert reranker.get_stats()["score_cache"]["size"] == info["scored"]
+
+    @pytest.mark.unit
+    def test_deadline_shrinks_batches_to_budget(self, reranker, model):
+        """Test a single batch is cut to what the budget fits once the pair cost is known."""
+
+        def slow_predict(pairs, **kwargs):
+            time.sleep(0.02 * len(pairs))
+            return [float(doc.split()[-1]) for _, doc in pairs]
+
+        model.predict.side_effect = slow_predict
+        reranker.rerank("warm-up", make_results(2))
+
+        _, info = reranker.rerank_with_info("query", make_results(10), deadline_ms=90)
+
+        assert info["outcome"] == "deadline"
+        assert 0 < info["scored"] < 10
+        assert len(model.predict.call_args_list[1].args[0]) < 10
+
+    @pytest.mark.unit
+    def test_queue_timeout_is_not_a_deadline_hit(self, model):
+        """Test a slow micro-batch reports a timeout and its late scores are cached."""
+
+        def slow_predict(pairs, **kwargs):
+            time.sleep(0.2)
+            return [float(doc.split()[-1]) for _, doc in pairs]
+
+        model.predict.side_effect = slow_predict
+        with patch("src.core.reranker.RerankerService._load_model"):
+            from src.core.reranker import RerankerService
+
+            service = RerankerService(micro_batching=True, queue_timeout=0.05)
+        service.model = model
+
+        reranked, info = service.rerank_with_info("query", make_results(4), deadline_ms=0)
+        time.sleep(0.3)
+        service.batcher.close()
+
+        assert info["outcome"] == "timeout"
+        assert [r.conversation.id for r in reranked] == [0, 1, 2, 3]
+        stats = service.get_stats()
+        assert stats["deadline_hits"] == 0
+        assert stats["queue_timeouts"] == 1
+        assert stats["score_cache"]["size"] == 4
+
+    @pytest.mark.unit
+    def test_within_deadline_reranks(self, reranker):
+        """Test a generous budget reranks normally."""
+        reranked, info = reranker.rerank_with_info("query", make_results(4), deadline_ms=5000)
+
+        assert info["outcome"] == "reranked"
+        assert info["scored"] == 4
+        assert reranked[0].conversation.id == 3
+
+    @pytest.mark.unit
+    def test_onnx_backend_falls_back_to_torch(self, tmp_path):
+        """Test a missing ONNX export falls back to the torch model."""
+        with patch("sentence_transformers.CrossEncoder") as cross_encoder:
+            from src.core.reranker import RerankerService
+
+            service = RerankerService(backend="onnx", onnx_path=str(tmp_path))
+
+        assert service.backend == "torch"
+        assert service.model is cross_encoder.return_value
+
+    @pytest.mark.unit
+    def test_rerank_without_model_returns_input(self, reranker):
+        """Test original order is kept when the model is unavailable."""
+        reranker.model = None
+        results = make_results(3)
+        assert reranker.rerank("query", results) == results
+
+
+class TestRerankPolicy:
+    """Tests for the adaptive rerank policy."""
+
+    @pytest.fixture
+    def policy(self):
+        """Policy with default thresholds."""
+        from src.core.reranker import RerankPolicy
+
+        return RerankPolicy(min_score=0.5)
+
+    @pytest.mark.unit
+    def test_skip_on_decisive_top1(self, policy):
+        """Test a clear margin and peaked distribution skip reranking."""
+        decision = policy.decide([0.85, 0.6, 0.58, 0.55, 0.52], top_k=3)
+
+        assert decision.action == "skip"
+        assert decision.n_candidates == 0
+        assert decision.margin == pytest.approx(0.25)
+
+    @pytest.mark.unit
+    def test_shrink_to_competitive_candidates(self, policy):
+        """Test only candidates close to the top are reranked."""
+        scores = [0.8, 0.79, 0.78, 0.77, 0.76] + [0.6] * 10
+        decision = policy.decide(scores, top_k=3)
+
+        assert decision.action == "shrink"
+        assert decision.n_candidates == 5
+
+    @pytest.mark.unit
+    def test_full_on_flat_distribution(self, policy):
+        """Test a flat distribution gets a full rerank."""
+        decision = policy.decide([0.7, 0.69, 0.68, 0.67, 0.66, 0.65], top_k=3)
+
+        assert decision.action == "full"
+        assert decision.n_candidates == 6
+
+    @pytest.mark.unit
+    def test_fused_scores_always_rerank(self, policy):
+        """Test RRF scores never trigger a skip or shrink."""
+        decision = policy.decide([0.0164, 0.0082, 0.0081, 0.008], top_k=3, fused=True)
+
+        assert decision.action == "full"
+        assert decision.n_candidates == 4
+
+    @pytest.mark.unit
+    def test_disabled_policy_always_reranks(self):
+        """Test a disabled policy never skips."""
+        from src.core.reranker import RerankPolicy
+
+        policy = RerankPolicy(enabled=False)
+        assert policy.decide([0.95, 0.5], top_k=1).action == "full"
+        assert policy.get_stats()["decisions"]["full"] == 1
+
+
+class TestLexicalDenseScorer:
+    """Tests for the cascade first-stage scorer."""
+
+    @pytest.mark.unit
+    def test_term_coverage_lifts_lexical_matches(self):
+        """Test a context sharing the query terms beats a slightly better dense match."""
+        from src.core.reranker import LexicalDenseScorer
+
+        results = [
+            SearchResult(
+                conversation=Conversation(id=0, context="weather today", response="r"),
+                score=0.80,
+                rank=1,
+            ),
+            SearchResult(
+                conversation=Conversation(id=1, context="Which phone to buy?", response="r"),
+                score=0.78,
+                rank=2,
+            ),
+        ]
+
+        scores = LexicalDenseScorer(dense_weight=0.3).score("what phone should I buy", results)
+
+        assert scores[1] > scores[0]
+
+
+class TestHybridSearchReranker:
+    """Tests for reciprocal rank fusion."""
+
+    @pytest.mark.unit
+    def test_combine_scores_matches_reference_rrf(self):
+        """Test fused scores and order match the per-document RRF formula."""
+        from src.core.reranker import RRF_K, HybridSearchReranker
+
+        dense = make_results(6)
+        sparse = [dense[4], make_results(8)[7], dense[0]]
+        hybrid = HybridSearchReranker(dense_weight=0.7, sparse_weight=0.3)
+
+        combined = hybrid.combine_scores(dense, sparse)
+
+        expected: dict[int, float] = {}
+        for weight, results in ((0.7, dense), (0.3, sparse)):
+            for rank, result in enumerate(results, 1):
+                conv_id = result.conversation.id
+                expected[conv_id] = expected.get(conv_id, 0.0) + weight / (RRF_K + rank)
+
+        assert [r.conversation.id for r in combined] == sorted(
+            expected, key=expected.get, reverse=True
+        )
+        assert [r.rank for r in combined] == list(range(1, len(expected) + 1))
+        for result in combined:
+            assert result.score == pytest.approx(expected[result.conversation.id])
+
+    @pytest.mark.unit
+    def test_combine_scores_ties_keep_dense_first(self):
+        """Test equal fused scores keep first-seen order and inputs are not mutated."""
+        from src.core.reranker import HybridSearchReranker
+
+        dense = make_results(1)
+        sparse = [make_results(2)[1]]
+
+        combined = HybridSearchReranker().combine_scores(dense, sparse)
+
+        assert [r.conversation.id for r in combined] == [0, 1]
+        assert dense[0].score == 1.0
+        assert HybridSearchReranker().combine_scores([], []) == []
@@ -0,0 +1,73 @@
+"""
+Unit tests for the BM25 sparse index.
+"""
+
+import numpy as np
+import pytest
+
+from src.core.sparse_index import BM25Index, get_sparse_index, tokenize
+
+
+DOCUMENTS = [
+    (10, "What phone should I buy? Pixel or iPhone"),
+    (11, "Best pizza in town"),
+    (12, "My phone battery drains fast"),
+    (13, "Quel téléphone acheter ?"),
+]
+
+
+class TestBM25Index:
+    """Tests for BM25Index."""
+
+    @pytest.fixture
+    def index(self):
+        """Small in-memory index."""
+        return BM25Index.build(DOCUMENTS)
+
+    @pytest.mark.unit
+    def test_tokenize(self):
+        """Test terms are normalized and short tokens dropped."""
+        assert tokenize("Quel TÉLÉPHONE, a ?") == ["quel", "téléphone"]
+
+    @pytest.mark.unit
+    def test_search_ranks_lexical_matches(self, index):
+        """Test documents sharing more query terms rank first."""
+        hits = index.search("which phone to buy", n_results=5)
+
+        assert [doc_id for doc_id, _ in hits] == [10, 12]
+        assert hits[0][1] > hits[1][1] > 0
+
+    @pytest.mark.unit
+    def test_search_unknown_terms(self, index):
+        """Test queries without indexed terms return nothing."""
+        assert index.search("zzz qqq") == []
+
+    @pytest.mark.unit
+    def test_save_and_load_memory_mapped(self, index, tmp_path):
+        """Test a saved index loads memory-mapped and scores identically."""
+        index.save(tmp_path)
+        loaded = BM25Index.load(tmp_path)
+
+        assert isinstance(loaded.doc_indices, np.memmap)
+        assert loaded.search("téléphone") == index.search("téléphone")
+        assert loaded.get_stats() == index.get_stats()
+
+    @pytest.mark.unit
+    def test_save_over_memory_mapped_index(self, index, tmp_path):
+        """Test re-saving leaves an index that is still mapped untouched."""
+        index.save(tmp_path)
+        mapped = BM25Index.load(tmp_path)
+        expected = mapped.search("téléphone")
+
+        rebuilt = BM25Index.build([(42, "téléphone pliable"), (43, "tablette")])
+        rebuilt.save(tmp_path)
+        rebuilt.save(tmp_path)
+
+        assert mapped.search("téléphone") == expected
+        assert [doc_id for doc_id, _ in BM25Index.load(tmp_path).search("téléphone")] == [42]
+        assert len([p for p in tmp_path.iterdir() if p.is_dir()]) == 2
+
+    @pytest.mark.unit
+    def test_get_sparse_index_missing(self, tmp_path):
+        """Test a missing index is reported as None."""
+        assert get_sparse_index(tmp_path / "missing", reload=True) is None
@@ -0,0 +1,81 @@
+"""
+Unit tests for cache warm-up.
+"""
+
+import pytest
+
+from src.core.warmup import CacheWarmer, QueryLog
+
+
+class TestQueryLog:
+    """Tests for QueryLog."""
+
+    @pytest.mark.unit
+    def test_top_queries_by_frequency(self, tmp_path):
+        """Test most frequent queries come first."""
+        log = QueryLog(tmp_path / "queries.jsonl")
+        for _ in range(3):
+            log.record("What phone should I buy?", False, 5)
+        log.record("How do I make friends?", False, 5)
+        log.record("What phone should I buy?", True, 5)
+        log.record("What phone should I buy?", True, 5)
+
+        top = log.top_queries(2)
+
+        assert top == [
+            {"message": "What phone should I buy?", "use_llm": False, "n_results": 5},
+            {"message": "What phone should I buy?", "use_llm": True, "n_results": 5},
+        ]
+
+    @pytest.mark.unit
+    def test_missing_log_is_empty(self, tmp_path):
+        """Test a missing log yields no queries."""
+        assert QueryLog(tmp_path / "none.jsonl").top_queries(10) == []
+
+    @pytest.mark.unit
+    def test_log_compacted_to_most_frequent(self, tmp_path):
+        """Test the file is bounded and keeps the counts of frequent queries."""
+        log = QueryLog(tmp_path / "queries.jsonl", max_entries=2)
+        for _ in range(3):
+            log.record("frequent", False, 5)
+        log.record("rare", False, 5)
+        log.record("other", False, 5)
+
+        lines = (tmp_path / "queries.jsonl").read_text(encoding="utf-8").splitlines()
+        assert len(lines) < 4
+        assert log.top_queries(1) == [{"message": "frequent", "use_llm": False, "n_results": 5}]
+        assert QueryLog(tmp_path / "queries.jsonl")._counts()[("frequent", False, 5)] == 3
+
+
+class TestCacheWarmer:
+    """Tests for CacheWarmer."""
+
+    @pytest.mark.unit
+    def test_background_replay_gates_readiness(self, tmp_path):
+        """Test readiness is withheld until replay finishes."""
+        log = QueryLog(tmp_path / "queries.jsonl")
+        log.record("hello", False, 5)
+        log.record("bonjour", False, 5)
+
+        answered = []
+        warmer = CacheWarmer()
+        thread = warmer.start(lambda query: answered.append(query["message"]), log, top_n=10)
+
+        assert warmer.wait(timeout=2)
+        thread.join(timeout=2)
+        assert warmer.is_ready()
+        assert sorted(answered) == ["bonjour", "hello"]
+        assert warmer.get_stats() == {"status": "done", "ready": True, "warmed": 2}
+
+    @pytest.mark.unit
+    def test_failed_queries_do_not_abort(self, tmp_path):
+        """Test a failing query is skipped."""
+        log = QueryLog(tmp_path / "queries.jsonl")
+        log.record("ok", False, 5)
+        log.record("bad", False, 5)
+
+        def answer(query):
+            if query["message"] == "bad":
+                raise RuntimeError("boom")
+
+        assert CacheWarmer().replay(answer, log, top_n=10) == 1